@@ -0,0 +1,196 @@
+"""
+HTTP 응답 영속 캐시 (GET 200만): url → 본문 + ETag/Last-Modified, SQLite 한 파일.
+
+- day1 SummarizeUrlTool._simple_get, day2 read_url_text, day3 _get_html(http_pool)이 공유
+- 호스트별 TTL: 그 안이면 네트워크 없이 반환, 지나면 If-None-Match / If-Modified-Since 조건부 요청
+  (304면 본문 재사용 + 시각 갱신). 공고 페이지처럼 게시 후 안 바뀌는 곳은 TTL을 길게.
+- 본문 총량 상한(HTTP_CACHE_MAX_MB) 초과 시 마지막 사용 시각(atime)이 오래된 것부터 제거
+- HTTP_CACHE_MODE=replay: 네트워크를 쓰지 않고 캐시만 (없으면 OfflineMiss) → 반복 실행/테스트용
+
+  HTTP_CACHE=0                 비활성
+  HTTP_CACHE_TTL=3600          기본 TTL(초)
+  HTTP_CACHE_HOST_TTL="nipa.kr=86400,bizinfo.go.kr=21600"   호스트(접미사 일치)별 TTL
+"""
+import os, time, sqlite3, threading, urllib.parse
+from typing import Dict, Optional, Callable
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_PATH = os.getenv("HTTP_CACHE_PATH", "data/cache/http.sqlite")
+CACHE_MAX_BYTES = int(float(os.getenv("HTTP_CACHE_MAX_MB", "256")) * 1024 * 1024)
+ENABLED = os.getenv("HTTP_CACHE", "1") == "1"
+MODE = os.getenv("HTTP_CACHE_MODE", "rw")  # rw | replay
+DEFAULT_TTL = float(os.getenv("HTTP_CACHE_TTL", "3600"))
+REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "12"))
+
+def _parse_host_ttl(spec: str) -> Dict[str, float]:
+    out = {}
+    for part in (spec or "").split(","):
+        if "=" in part:
+            host, ttl = part.split("=", 1)
+            try:
+                out[host.strip().lower()] = float(ttl)
+            except ValueError:
+                pass
+    return out
+
+HOST_TTL = _parse_host_ttl(os.getenv("HTTP_CACHE_HOST_TTL", "nipa.kr=86400,bizinfo.go.kr=21600,k-startup.go.kr=21600"))
+
+class OfflineMiss(requests.exceptions.ConnectionError):
+    """replay 모드에서 캐시에 없는 URL"""
+
+def ttl_for(url: str) -> float:
+    host = urllib.parse.urlparse(url).netloc.lower().split(":")[0]
+    best, best_len = DEFAULT_TTL, -1
+    for h, ttl in HOST_TTL.items():
+        if (host == h or host.endswith("." + h)) and len(h) > best_len:
+            best, best_len = ttl, len(h)
+    return best
+
+def _response(url: str, body: bytes, encoding: Optional[str], content_type: str) -> requests.Response:
+    """캐시 본문 → requests.Response (호출 측은 .text / .raise_for_status()를 그대로 쓴다)"""
+    r = requests.Response()
+    r.status_code = 200
+    r.url = url
+    r._content = body
+    r.encoding = encoding
+    r.headers = CaseInsensitiveDict({"Content-Type": content_type} if content_type else {})
+    r.from_cache = True
+    return r
+
+class HttpCache:
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0          # TTL 안 (네트워크 없음)
+        self.revalidated = 0   # 304
+        self.misses = 0        # 200 새로 받음
+        self._lock = threading.Lock()
+        d = os.path.dirname(path)
+        if d: os.makedirs(d, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resp ("
+            " url TEXT PRIMARY KEY, body BLOB NOT NULL, encoding TEXT, ctype TEXT,"
+            " etag TEXT, last_modified TEXT, fetched REAL NOT NULL, atime INTEGER NOT NULL,"
+            " size INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS resp_atime ON resp(atime)")
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM resp").fetchone()[0]
+
+    # ---------- 조회/저장 ----------
+    def lookup(self, url: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, encoding, ctype, etag, last_modified, fetched FROM resp WHERE url=?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE resp SET atime=? WHERE url=?", (int(time.time()), url))
+        body, enc, ctype, etag, lm, fetched = row
+        return {"body": bytes(body), "encoding": enc, "ctype": ctype or "",
+                "etag": etag, "last_modified": lm, "fetched": fetched}
+
+    def store(self, url: str, r: requests.Response) -> None:
+        body = r.content or b""
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM resp WHERE url=?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO resp(url, body, encoding, ctype, etag, last_modified, fetched, atime, size)"
+                " VALUES (?,?,?,?,?,?,?,?,?)",
+                (url, body, r.encoding, r.headers.get("Content-Type", ""), r.headers.get("ETag"),
+                 r.headers.get("Last-Modified"), now, int(now), len(body)),
+            )
+            self._bytes += len(body) - (old[0] if old else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _bump(self, counter: str) -> None:
+        """hits/revalidated/misses += 1 (여러 스레드가 cached_get을 동시에 부른다)"""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def touch(self, url: str) -> None:
+        """304: 본문은 그대로, 받은 시각만 갱신"""
+        with self._lock:
+            self._db.execute("UPDATE resp SET fetched=? WHERE url=?", (time.time(), url))
+
+    def _evict(self) -> None:
+        """오래 안 쓴 것부터 상한의 90%까지 줄인다 (lock 보유 상태에서 호출)."""
+        target = int(self.max_bytes * 0.9)
+        for url, size in self._db.execute("SELECT url, size FROM resp ORDER BY atime").fetchall():
+            if self._bytes <= target:
+                break
+            self._db.execute("DELETE FROM resp WHERE url=?", (url,))
+            self._bytes -= size
+
+    # ---------- 정보 ----------
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT COUNT(*) FROM resp").fetchone()[0]
+            return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses,
+                    "rows": rows, "bytes": self._bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM resp")
+            self._bytes = 0
+
+# ---------------- 프로세스 공용 인스턴스 ----------------
+_CACHE: Optional[HttpCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_cache() -> Optional[HttpCache]:
+    global _CACHE
+    if not ENABLED:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = HttpCache()
+        return _CACHE
+
+def _default_fetch(url: str, headers: Dict[str, str], timeout: float) -> requests.Response:
+    return requests.get(url, headers=headers, timeout=timeout)
+
+def cached_get(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = REQUEST_TIMEOUT,
+               fetch: Optional[Callable[[str, Dict[str, str], float], requests.Response]] = None,
+               ttl: Optional[float] = None) -> requests.Response:
+    """
+    requests.get 대용. fetch(url, headers, timeout)로 실제 요청 방법(세션/호스트 제한)을 바꿀 수 있다.
+    200이 아닌 응답은 저장하지 않고 그대로 반환한다.
+    """
+    fetch = fetch or _default_fetch
+    headers = dict(headers or {})
+    cache = get_cache()
+    if cache is None:
+        return fetch(url, headers, timeout)
+
+    ent = cache.lookup(url)
+    if MODE == "replay":
+        if ent is None:
+            raise OfflineMiss(f"not in HTTP cache (replay mode): {url}")
+        cache._bump("hits")
+        return _response(url, ent["body"], ent["encoding"], ent["ctype"])
+
+    if ent is not None:
+        if time.time() - ent["fetched"] < (ttl_for(url) if ttl is None else ttl):
+            cache._bump("hits")
+            return _response(url, ent["body"], ent["encoding"], ent["ctype"])
+        if ent["etag"]:
+            headers["If-None-Match"] = ent["etag"]
+        if ent["last_modified"]:
+            headers["If-Modified-Since"] = ent["last_modified"]
+
+    r = fetch(url, headers, timeout)
+    if r.status_code == 304 and ent is not None:
+        cache._bump("revalidated")
+        cache.touch(url)
+        return _response(url, ent["body"], ent["encoding"], ent["ctype"])
+    if r.status_code == 200 and "no-store" not in (r.headers.get("Cache-Control") or "").lower():
+        cache._bump("misses")
+        cache.store(url, r)
+    return r
@@ -4,6 +4,8 @@ import time
 import requests
 from typing import Any, Dict, List, Callable, Optional
 
+from day1.instructor.http_cache import cached_get
+
 REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "12"))
 
 def _retry(fn, tries=2, delay=0.8):
@@ -109,7 +111,7 @@ class SummarizeUrlTool:
         return _clean_web_text(text, self.max_chars)
 
     def _simple_get(self, url: str) -> str:
-        r = requests.get(url, timeout=REQUEST_TIMEOUT)
+        r = cached_get(url, timeout=REQUEST_TIMEOUT)
         r.raise_for_status()
         return _clean_web_text(r.text or "", self.max_chars)
 
@@ -0,0 +1,213 @@
+"""
+Day2 RAG 스토어 벤치마크 (오프라인, API 호출 없음).
+
+  python -m day2.instructor.bench search     # 인덱스 크기별 search() p50/p99 지연 (resident vs cold)
+  python -m day2.instructor.bench embed      # 임베딩 처리량(texts/sec): 순차 8개 배치 vs 토큰 예산 동시 배치
+  python -m day2.instructor.bench ann        # 인덱스 종류별 recall@k / 지연 / 메모리 (Flat 기준)
+  python -m day2.instructor.bench lexical    # BM25 인덱스 크기별 빌드 시간 / 질의 p50/p99 / 크기
+  python -m day2.instructor.bench pdf        # data/raw PDF 추출 pages/sec: 백엔드별 순차/쪽 병렬/캐시
+  python -m day2.instructor.bench chunk      # data/raw 코퍼스 chunks/sec, 임베딩 토큰 합: chunk_text vs 구조 청커
+
+임베딩은 embedder.fake_backend(텍스트 해시 기반 결정적 벡터)로 대체한다.
+"""
+import os, io, glob, time, argparse, tempfile
+from typing import List, Dict
+import numpy as np
+
+import faiss
+from day2.instructor import emb_cache, embedder, index_factory, pdf_extract
+from day2.instructor.lexical import LexSegment, LexicalIndex
+from day2.instructor.rag_store import FaissStore
+
+BENCH_DIM = int(os.getenv("BENCH_DIM", "1536"))
+
+# ---------------- fake embedding ----------------
+def _use_fake_embedding(latency_ms: float = 0.0) -> None:
+    embedder.use_backend(embedder.fake_backend(BENCH_DIM, latency_ms=latency_ms))
+    emb_cache.ENABLED = False  # 벤치 벡터가 실제 캐시에 섞이지 않도록
+
+def _fake_chunks(n: int) -> List[Dict]:
+    return [{
+        "id": f"bench-{i}",
+        "text": f"bench chunk {i} 헬스케어 AI 규제 문서 조각",
+        "source": f"bench://doc{i // 20}",
+        "page": i % 20 + 1,
+        "kind": "bench",
+        "title": f"doc{i // 20}",
+    } for i in range(n)]
+
+def _pct(xs: List[float], p: float) -> float:
+    return float(np.percentile(np.array(xs, dtype="float64"), p))
+
+# ---------------- search latency ----------------
+def bench_search(sizes: List[int], queries: int = 200, k: int = 6) -> None:
+    _use_fake_embedding()
+    print("| ntotal | mode | p50 (ms) | p99 (ms) |")
+    print("|---:|---|---:|---:|")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as d:
+            FaissStore(d, resident=False).upsert(_fake_chunks(n))
+            qs = [f"질의 {i}" for i in range(queries)]
+            for mode, resident in (("cold", False), ("resident", True)):
+                store = FaissStore(d, resident=resident)
+                store.search(qs[0], k=k)  # warm-up (resident 로딩)
+                lat = []
+                for q in qs:
+                    t0 = time.perf_counter()
+                    store.search(q, k=k)
+                    lat.append((time.perf_counter() - t0) * 1000.0)
+                print(f"| {n} | {mode} | {_pct(lat, 50):.2f} | {_pct(lat, 99):.2f} |")
+
+# ---------------- embedding throughput ----------------
+def bench_embed(n_texts: int = 2000, latency_ms: float = 40.0, per_token_ms: float = 0.002) -> None:
+    emb_cache.ENABLED = False
+    backend = embedder.fake_backend(BENCH_DIM, latency_ms=latency_ms, per_token_ms=per_token_ms)
+    rng = np.random.default_rng(0)
+    texts = [("헬스케어 AI 규제 " * int(rng.integers(5, 60))) + str(i) for i in range(n_texts)]
+    configs = [
+        ("sequential, 8/batch", embedder.EmbeddingExecutor(backend, concurrency=1, max_tokens=10**9, max_items=8)),
+        ("token-packed, 1 in flight", embedder.EmbeddingExecutor(backend, concurrency=1)),
+        (f"token-packed, {embedder.CONCURRENCY} in flight", embedder.EmbeddingExecutor(backend)),
+    ]
+    print(f"fake backend: {latency_ms:.0f} ms/request + {per_token_ms} ms/token, {n_texts} texts")
+    print("| executor | requests | sec | texts/sec |")
+    print("|---|---:|---:|---:|")
+    for name, ex in configs:
+        t0 = time.perf_counter()
+        out = ex.embed(texts)
+        dt = time.perf_counter() - t0
+        assert len(out) == n_texts
+        print(f"| {name} | {ex.stats()['requests']} | {dt:.2f} | {n_texts / dt:.0f} |")
+
+# ---------------- ANN recall vs latency ----------------
+def _clustered(n: int, dim: int, n_clusters: int = 64, seed: int = 0) -> np.ndarray:
+    """실제 임베딩처럼 군집 구조가 있는 정규화 벡터."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype("float32")
+    X = centers[rng.integers(0, n_clusters, n)] + 0.6 * rng.standard_normal((n, dim)).astype("float32")
+    faiss.normalize_L2(X)
+    return X
+
+def bench_ann(n: int = 20000, dim: int = 384, queries: int = 200, k: int = 10) -> None:
+    X = _clustered(n, dim)
+    Q = _clustered(queries, dim, seed=1)
+    flat = index_factory.build_index(X, "flat")
+    _, gt = flat.search(Q, k)
+
+    def _run(index) -> tuple:
+        lat, hit = [], 0
+        for i in range(queries):
+            t0 = time.perf_counter()
+            _, I = index.search(Q[i : i + 1], k)
+            lat.append((time.perf_counter() - t0) * 1000.0)
+            hit += len(set(I[0].tolist()) & set(gt[i].tolist()))
+        return hit / (queries * k), _pct(lat, 50), _pct(lat, 99)
+
+    print(f"n={n}, dim={dim}, queries={queries}, k={k}")
+    print("| index | knob | recall@k | p50 (ms) | p99 (ms) | MB |")
+    print("|---|---|---:|---:|---:|---:|")
+    sweeps = {"ivf": ("nprobe", (1, 4, 16, 64)), "ivfpq": ("nprobe", (4, 16, 64)),
+              "opq": ("nprobe", (16, 64)), "hnsw": ("efSearch", (16, 64, 256))}
+    for spec in ("flat", "sqfp16", "sq8", "ivf", "hnsw", "ivfpq", "opq"):
+        t0 = time.perf_counter()
+        index = index_factory.build_index(X, spec)
+        build_s = time.perf_counter() - t0
+        mb = index_factory.index_nbytes(index) / 2**20
+        knob, vals = sweeps.get(spec, ("-", (None,)))
+        for v in vals:
+            if knob == "nprobe": index_factory.tune(index, nprobe=v)
+            if knob == "efSearch": index_factory.tune(index, ef_search=v)
+            r, p50, p99 = _run(index)
+            label = f"{knob}={v}" if v else f"build {build_s:.1f}s"
+            print(f"| {spec} | {label} | {r:.3f} | {p50:.3f} | {p99:.3f} | {mb:.1f} |")
+
+# ---------------- lexical (BM25) ----------------
+_SYL = "가나다라마바사아자차카타파하공고지원사업클라우드데이터인공지능예산기관과제"
+
+def _fake_korean(n: int, words: int = 60, seed: int = 0) -> List[str]:
+    rng = np.random.default_rng(seed)
+    vocab = ["".join(rng.choice(list(_SYL), size=int(rng.integers(2, 5)))) for _ in range(20000)]
+    zipf = np.minimum(rng.zipf(1.3, size=(n, words)), len(vocab)) - 1
+    return [" ".join(vocab[j] for j in row) + f" {i * 7}" for i, row in enumerate(zipf)]
+
+def bench_lexical(sizes: List[int], queries: int = 200, k: int = 50, seg_size: int = 100000) -> None:
+    print("| ntotal | parts | build (s) | p50 (ms) | p99 (ms) | MB |")
+    print("|---:|---:|---:|---:|---:|---:|")
+    for n in sizes:
+        texts = _fake_korean(n)
+        t0 = time.perf_counter()
+        parts = [(s, LexSegment.build(texts[s : s + seg_size])) for s in range(0, n, seg_size)]
+        build_s = time.perf_counter() - t0
+        lex = LexicalIndex(parts, n)
+        mb = sum(a.nbytes for _, seg in parts for a in (seg.term, seg.off, seg.doc, seg.tf, seg.dl)) / 2**20
+        rng = np.random.default_rng(1)
+        qs = [" ".join(texts[int(i)].split()[:3]) for i in rng.integers(0, n, size=queries)]
+        lat = []
+        for q in qs:
+            t0 = time.perf_counter()
+            lex.search(q, k)
+            lat.append((time.perf_counter() - t0) * 1000.0)
+        print(f"| {n} | {len(parts)} | {build_s:.1f} | {_pct(lat, 50):.2f} | {_pct(lat, 99):.2f} | {mb:.1f} |")
+
+# ---------------- PDF extraction ----------------
+def bench_pdf(paths: List[str], workers: int = pdf_extract.PDF_WORKERS) -> None:
+    print(f"files={len(paths)}, workers={workers}")
+    print("| backend | mode | pages | sec | pages/sec |")
+    print("|---|---|---:|---:|---:|")
+    with tempfile.TemporaryDirectory() as d:
+        pdf_extract.CACHE_DIR = d
+        for backend in pdf_extract.available_backends():
+            modes = (("serial", 1, False), (f"parallel x{workers}", workers, False),
+                     ("cold+cache", workers, True), ("cached", workers, True))
+            for label, w, cache in modes:
+                t0 = time.perf_counter()
+                pages = sum(len(pdf_extract.extract_pages(p, backend=backend, workers=w, use_cache=cache))
+                            for p in paths)
+                sec = time.perf_counter() - t0
+                print(f"| {backend} | {label} | {pages} | {sec:.2f} | {pages / max(sec, 1e-9):.1f} |")
+
+# ---------------- chunking ----------------
+def bench_chunk(paths: List[str], repeat: int = 5) -> None:
+    from day2.instructor.ingest import read_document, chunk_text
+    from day2.instructor.chunker import iter_chunks, MIN_TOKENS
+    docs = [read_document(p)[1] for p in paths]
+    docs = [d for d in docs if d]
+    chars = sum(len(d) for d in docs)
+    print(f"docs={len(docs)}, chars={chars}, repeat={repeat}")
+    print("| chunker | chunks | chunks/sec | embedded tokens | avg tokens | chunks < min |")
+    print("|---|---:|---:|---:|---:|---:|")
+    runs = (("chars 800/100", lambda d: chunk_text(d, 800, 100)),
+            ("structure", lambda d: [t for _, t in iter_chunks(io.StringIO(d))]))
+    for label, fn in runs:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            chunks = [c for d in docs for c in fn(d)]
+        sec = (time.perf_counter() - t0) / repeat
+        toks = [embedder.count_tokens(c) for c in chunks]
+        small = sum(1 for t in toks if t < MIN_TOKENS)
+        print(f"| {label} | {len(chunks)} | {len(chunks) / max(sec, 1e-9):.0f} | {sum(toks)} | "
+              f"{sum(toks) / max(len(toks), 1):.0f} | {small} |")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("what", choices=["search", "embed", "ann", "lexical", "pdf", "chunk"])
+    ap.add_argument("--sizes", default=os.getenv("BENCH_SIZES", "1000,5000,20000"))
+    ap.add_argument("--queries", type=int, default=int(os.getenv("BENCH_QUERIES", "200")))
+    args = ap.parse_args()
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    if args.what == "search":
+        bench_search(sizes, queries=args.queries)
+    elif args.what == "embed":
+        bench_embed(int(os.getenv("BENCH_TEXTS", "2000")))
+    elif args.what == "ann":
+        bench_ann(n=max(sizes), dim=int(os.getenv("BENCH_ANN_DIM", "384")), queries=args.queries)
+    elif args.what == "lexical":
+        bench_lexical(sizes, queries=args.queries)
+    elif args.what == "pdf":
+        bench_pdf(sorted(glob.glob(os.path.join(os.getenv("RAG_RAW_DIR", "data/raw"), "*.pdf"))))
+    elif args.what == "chunk":
+        from day2.instructor.ingest import collect_sources_from_folder
+        bench_chunk(collect_sources_from_folder(os.getenv("RAG_RAW_DIR", "data/raw")))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+구조/토큰 인식 청커 (문자 800/100 창 chunk_text 대체).
+
+- 제목 줄(#, 1. / 1.2, 제1장, Ⅰ., [..], 가. 등)에서 새 청크를 시작한다 (현재 청크가 RAG_CHUNK_MIN_TOKENS 이상일 때)
+- 문단(빈 줄) 경계는 청크가 목표의 3/4 이상 찼으면 그 자리에서 자른다
+- 그 외에는 문장 단위로 채우고, 크기는 임베딩 토크나이저 토큰 수(RAG_CHUNK_TOKENS)로 잰다
+- 한 문장이 예산보다 길면 그 문장만 토큰 예산 크기로 나눈다
+- 겹침은 기본 없음(RAG_CHUNK_OVERLAP_TOKENS>0이면 직전 문장을 그 토큰 수 안에서 이어 붙임)
+- RAG_CHUNK_MIN_TOKENS 미만인 청크는 내보내지 않는다: 도중에는 다음 단위를 예산을 넘겨서라도 이어 붙이고
+  (제목 줄만 남는 청크 방지), 마지막 자투리는 앞 청크에 붙인다. 그래서 청크는 최대 예산+최소 토큰까지 커질 수 있고,
+  최소보다 짧은 청크는 문서 전체가 그보다 짧을 때뿐이다
+
+iter_chunks(pieces)는 줄/쪽 단위 조각을 받아 (시작 오프셋, 청크 텍스트)를 흘려보내는 제너레이터라서
+문서 전체 문자열을 만들지 않아도 된다. 오프셋은 make_chunks가 PDF 쪽 번호를 찾는 데 쓴다.
+"""
+import os, re
+from typing import Iterable, Iterator, List, Tuple, Optional
+
+from day2.instructor.embedder import count_tokens
+
+CHUNK_TOKENS = int(os.getenv("RAG_CHUNK_TOKENS", "350"))
+MIN_TOKENS = int(os.getenv("RAG_CHUNK_MIN_TOKENS", "60"))
+OVERLAP_TOKENS = int(os.getenv("RAG_CHUNK_OVERLAP_TOKENS", "0"))
+
+_HEADING = re.compile(
+    r"^\s*(#{1,6}\s+\S"                      # markdown
+    r"|제\s*\d+\s*[장절조관편]"                # 제1장, 제 2 조
+    r"|[ⅠⅡⅢⅣⅤⅥⅦⅧⅨⅩ]+\s*[.)]"                  # Ⅰ.
+    r"|\d+(?:\.\d+){0,3}\.?\s+\S.{0,60}$"     # 1. 개요 / 2.3 방법 (짧은 줄)
+    r"|[가-하]\.\s+\S.{0,60}$"                # 가. 목적
+    r"|\[[^\]]{1,40}\]\s*$"                   # [붙임]
+    r")"
+)
+# 문장 끝: . ! ? 。 뒤에 공백/줄끝
+_SENT_END = re.compile(r"[.!?。？！](?=\s|$)")
+
+# ---------------- units: (offset, kind, text) ----------------
+def _iter_lines(pieces: Iterable[str]) -> Iterator[str]:
+    """조각 경계와 무관하게 줄 단위로 (줄바꿈 포함)"""
+    rest = ""
+    for piece in pieces:
+        rest += piece
+        if "\n" not in piece:
+            continue
+        *lines, rest = rest.split("\n")
+        for ln in lines:
+            yield ln + "\n"
+    if rest:
+        yield rest
+
+def _iter_units(pieces: Iterable[str], flush_chars: int) -> Iterator[Tuple[int, str, str]]:
+    """
+    kind: "head"(제목 줄) | "sent"(문장) | "para"(문단 경계, text="")
+    문장 버퍼는 완결된 문장을 내보낼 때마다 비우고, flush_chars를 넘으면 강제로 내보낸다.
+    """
+    off = 0
+    buf, buf_off = "", 0
+
+    def drain(final: bool):
+        nonlocal buf, buf_off
+        last = 0
+        for m in _SENT_END.finditer(buf):
+            seg = buf[last : m.end()]
+            if seg.strip():
+                yield (buf_off + last, "sent", seg)
+            last = m.end()
+        if final or len(buf) - last > flush_chars:
+            seg = buf[last:]
+            if seg.strip():
+                yield (buf_off + last, "sent", seg)
+            last = len(buf)
+        buf, buf_off = buf[last:], buf_off + last
+
+    for ln in _iter_lines(pieces):
+        if not ln.strip():
+            yield from drain(True)
+            yield (off, "para", "")
+        elif len(ln) < 120 and _HEADING.match(ln):
+            yield from drain(True)
+            yield (off, "head", ln)
+            buf_off = off + len(ln)
+        else:
+            if not buf:
+                buf_off = off
+            buf += ln
+            yield from drain(False)
+        off += len(ln)
+    yield from drain(True)
+
+def _split_long(off: int, text: str, ntok: int, max_tokens: int) -> Iterator[Tuple[int, str, int]]:
+    """예산보다 긴 문장 → 글자 비율로 토큰 예산 크기 조각 (가능하면 공백에서 자름)"""
+    step = max(1, int(len(text) * max_tokens / max(ntok, 1)))
+    a = 0
+    while a < len(text):
+        b = min(a + step, len(text))
+        if b < len(text):
+            ws = text.rfind(" ", a + step // 2, b)
+            if ws > a:
+                b = ws + 1
+        seg = text[a:b]
+        yield (off + a, seg, count_tokens(seg))
+        a = b
+
+# ---------------- chunks ----------------
+def iter_chunks(pieces: Iterable[str], max_tokens: int = CHUNK_TOKENS, min_tokens: int = MIN_TOKENS,
+                overlap_tokens: int = OVERLAP_TOKENS) -> Iterator[Tuple[int, str]]:
+    """pieces(줄/쪽/파일 객체 등 문자열 iterable) → (시작 오프셋, 청크 텍스트)"""
+    soft = max_tokens * 3 // 4
+    parts: List[Tuple[int, str, int]] = []   # 현재 청크의 (offset, text, tokens)
+    ntok = 0
+    held: Optional[Tuple[int, str, int]] = None  # 자투리 병합을 위해 한 개 늦게 내보낸다
+
+    def emit():
+        nonlocal parts, ntok, held
+        if not parts:
+            return
+        text = "".join(t for _, t, _ in parts).strip()
+        cur = (parts[0][0], text, ntok)
+        carry: List[Tuple[int, str, int]] = []
+        if overlap_tokens > 0 and parts[-1][2] <= overlap_tokens:
+            carry = [parts[-1]]
+        parts, ntok = carry, sum(p[2] for p in carry)
+        if text:
+            if held is not None:
+                yield held[:2]
+            held = cur
+
+    for off, kind, text in _iter_units(pieces, flush_chars=max_tokens * 4):
+        if kind == "para":
+            if ntok >= soft:
+                yield from emit()
+            elif parts:
+                parts.append((off, "\n", 0))
+            continue
+        if kind == "head" and ntok >= min_tokens:
+            yield from emit()
+        t = count_tokens(text)
+        units = _split_long(off, text, t, max_tokens) if t > max_tokens else [(off, text, t)]
+        for u in units:
+            if parts and ntok >= min_tokens and ntok + u[2] > max_tokens:
+                yield from emit()
+            parts.append(u)
+            ntok += u[2]
+
+    # 마지막: 자투리는 앞 청크에 붙인다
+    tail = None
+    if parts:
+        text = "".join(t for _, t, _ in parts).strip()
+        if text:
+            tail = (parts[0][0], text, ntok)
+    if held is not None and tail is not None and tail[2] < min_tokens:
+        yield (held[0], held[1] + "\n" + tail[1])
+    else:
+        if held is not None:
+            yield held[:2]
+        if tail is not None:
+            yield tail[:2]
@@ -0,0 +1,151 @@
+"""
+근접 중복 청크 억제 (MinHash-LSH). FaissStore.upsert가 임베딩 전에 적용한다.
+
+- 정규화: 소문자 + 공백 제거 → 문자 5-gram shingle (미러 사이트 사본, 줄바꿈/공백만 다른 PDF 사본)
+- 서명: 128개 해시 최솟값(uint32), 16 band × 8 row LSH로 후보를 찾고
+  서명 일치율(≈ Jaccard)이 RAG_DEDUP_THRESHOLD(기본 0.85) 이상인 살아있는 청크가 있으면 중복
+- 중복 청크는 버리지 않고 "dup_of": 원본 id 를 단 메타 전용 row로 남긴다(임베딩/인덱스/top-k 슬롯 없음)
+- 서명/밴드는 {index_dir}/dedup.sqlite 에 보관 → 실행을 넘어 동작 (처음 켤 때 기존 청크로 채움)
+
+  RAG_DEDUP=0 이면 끔
+"""
+import os, re, sqlite3, hashlib, threading
+from typing import List, Dict, Tuple, Optional, Callable, Iterable
+import numpy as np
+
+DEDUP_ENABLED = os.getenv("RAG_DEDUP", "1") == "1"
+THRESHOLD = float(os.getenv("RAG_DEDUP_THRESHOLD", "0.85"))
+DB_NAME = "dedup.sqlite"
+
+NUM_PERM = 128
+BANDS, ROWS = 16, 8
+SHINGLE = 5
+
+_rng = np.random.default_rng(20250901)
+_A = _rng.integers(1, 2**63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, NUM_PERM, dtype=np.uint64)
+_P = np.uint64(1099511628211)
+_WS = re.compile(r"\s+")
+
+# ---------------- MinHash ----------------
+def signature(text: str) -> np.ndarray:
+    """uint32[NUM_PERM]. shingle 해시는 코드포인트 다항식 롤링(uint64 wrap-around)"""
+    s = _WS.sub("", (text or "").lower())
+    if not s:
+        return np.full(NUM_PERM, 0xFFFFFFFF, dtype=np.uint32)
+    cp = np.frombuffer(s.encode("utf-32-le"), dtype="<u4").astype(np.uint64)
+    w = min(SHINGLE, len(cp))
+    n = len(cp) - w + 1
+    h = np.zeros(n, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for k in range(w):
+            h = h * _P + cp[k : k + n]
+        h = np.unique(h)
+        m = (_A[:, None] * h[None, :] + _B[:, None]) >> np.uint64(32)
+    return m.min(axis=1).astype(np.uint32)
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b))
+
+def band_keys(sig: np.ndarray) -> List[int]:
+    out = []
+    for b in range(BANDS):
+        d = hashlib.blake2b(bytes([b]) + sig[b * ROWS : (b + 1) * ROWS].tobytes(), digest_size=8).digest()
+        out.append(int.from_bytes(d, "little", signed=True))
+    return out
+
+# ---------------- persistent LSH index ----------------
+class DedupIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS sig (id TEXT PRIMARY KEY, sig BLOB) WITHOUT ROWID")
+        self._db.execute("CREATE TABLE IF NOT EXISTS band (key INTEGER, id TEXT, PRIMARY KEY (key, id)) WITHOUT ROWID")
+        self._db.execute("CREATE INDEX IF NOT EXISTS band_id ON band (id)")
+        self._db.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sig").fetchone()[0]
+
+    def _add(self, cid: str, sig: np.ndarray) -> None:
+        self._db.execute("DELETE FROM band WHERE id=?", (cid,))
+        self._db.execute("INSERT OR REPLACE INTO sig (id, sig) VALUES (?, ?)", (cid, sig.tobytes()))
+        self._db.executemany("INSERT OR IGNORE INTO band (key, id) VALUES (?, ?)",
+                             [(k, cid) for k in band_keys(sig)])
+
+    def _best(self, sig: np.ndarray, is_live: Callable[[str], bool], exclude: str) -> Optional[Tuple[str, float]]:
+        keys = band_keys(sig)
+        q = f"SELECT DISTINCT id FROM band WHERE key IN ({','.join('?' * len(keys))})"
+        cands = [r[0] for r in self._db.execute(q, keys) if r[0] != exclude]
+        best = None
+        for cid in cands:
+            if not is_live(cid):
+                continue
+            row = self._db.execute("SELECT sig FROM sig WHERE id=?", (cid,)).fetchone()
+            if row is None:
+                continue
+            sim = similarity(sig, np.frombuffer(row[0], dtype=np.uint32))
+            if sim >= THRESHOLD and (best is None or sim > best[1]):
+                best = (cid, sim)
+        return best
+
+    def filter(self, chunks: List[Dict], is_live: Callable[[str], bool]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        chunks를 (유지, 중복)으로 나눈다. 중복에는 dup_of/dup_score가 붙는다.
+        유지 청크의 서명은 바로 기록(같은 배치 안의 사본도 잡힘).
+        """
+        keep: List[Dict] = []
+        dups: List[Dict] = []
+        batch = set()
+        live = lambda cid: cid in batch or is_live(cid)
+        with self._lock:
+            for c in chunks:
+                sig = signature(c.get("text", ""))
+                m = self._best(sig, live, exclude=c["id"])
+                if m is not None:
+                    dups.append(dict(c, dup_of=m[0], dup_score=round(m[1], 3)))
+                    continue
+                self._add(c["id"], sig)
+                batch.add(c["id"])
+                keep.append(c)
+            self._db.commit()
+        return keep, dups
+
+    def backfill(self, items: Iterable[Tuple[str, str]]) -> int:
+        """(id, text)로 서명 채우기 (기존 인덱스에 처음 켤 때)"""
+        n = 0
+        with self._lock:
+            for cid, text in items:
+                self._add(cid, signature(text))
+                n += 1
+            self._db.commit()
+        return n
+
+    def remove(self, ids: List[str]) -> None:
+        with self._lock:
+            self._db.executemany("DELETE FROM sig WHERE id=?", [(c,) for c in ids])
+            self._db.executemany("DELETE FROM band WHERE id=?", [(c,) for c in ids])
+            self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sig")
+            self._db.execute("DELETE FROM band")
+            self._db.commit()
+
+_INDEXES: Dict[str, DedupIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+def get_dedup(index_dir: str) -> Optional[DedupIndex]:
+    """index_dir별 공유 인스턴스. RAG_DEDUP=0이면 None"""
+    if not DEDUP_ENABLED:
+        return None
+    key = os.path.abspath(index_dir)
+    with _INDEXES_LOCK:
+        dd = _INDEXES.get(key)
+        if dd is None:
+            dd = _INDEXES[key] = DedupIndex(os.path.join(key, DB_NAME))
+        return dd
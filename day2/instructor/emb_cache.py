@@ -0,0 +1,125 @@
+"""
+임베딩 영속 캐시: (model, sha256(text)) → float32 벡터, SQLite 한 파일.
+
+- rag_store.embed_texts, day3 ranker, FaissStore.rebuild/차원 불일치 재빌드가 모두 공유
+- 크기 상한(EMBED_CACHE_MAX_ROWS) 초과 시 마지막 사용 시각(atime)이 오래된 것부터 제거
+- hits/misses 카운터: stats()
+EMBED_CACHE=0 이면 비활성.
+"""
+import os, time, sqlite3, hashlib, threading
+from typing import List, Dict, Optional, Callable, Sequence
+import numpy as np
+
+CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "data/cache/embeddings.sqlite")
+CACHE_MAX_ROWS = int(os.getenv("EMBED_CACHE_MAX_ROWS", "200000"))
+ENABLED = os.getenv("EMBED_CACHE", "1") == "1"
+
+def text_key(text: str) -> bytes:
+    return hashlib.sha256((text or "").encode("utf-8")).digest()
+
+class EmbeddingCache:
+    def __init__(self, path: str = CACHE_PATH, max_rows: int = CACHE_MAX_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        d = os.path.dirname(path)
+        if d: os.makedirs(d, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS emb ("
+            " model TEXT NOT NULL, h BLOB NOT NULL, vec BLOB NOT NULL, atime INTEGER NOT NULL,"
+            " PRIMARY KEY (model, h)) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS emb_atime ON emb(atime)")
+        self._rows = self._db.execute("SELECT COUNT(*) FROM emb").fetchone()[0]
+
+    # ---------- 조회/저장 ----------
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        keys = [text_key(t) for t in texts]
+        found: Dict[bytes, np.ndarray] = {}
+        now = int(time.time())
+        with self._lock:
+            for i in range(0, len(keys), 500):  # SQLite 변수 개수 제한
+                part = list(set(keys[i : i + 500]))
+                q = "SELECT h, vec FROM emb WHERE model=? AND h IN (%s)" % ",".join("?" * len(part))
+                for h, blob in self._db.execute(q, [model, *part]):
+                    found[bytes(h)] = np.frombuffer(blob, dtype="float32")
+                hit = [h for h in part if h in found]
+                if hit:
+                    self._db.execute(
+                        "UPDATE emb SET atime=? WHERE model=? AND h IN (%s)" % ",".join("?" * len(hit)),
+                        [now, model, *hit],
+                    )
+            out = [found.get(k) for k in keys]
+            n_hit = sum(v is not None for v in out)
+            self.hits += n_hit
+            self.misses += len(out) - n_hit
+        return out
+
+    def put_many(self, model: str, texts: Sequence[str], vecs: Sequence) -> None:
+        now = int(time.time())
+        rows = [(model, text_key(t), np.asarray(v, dtype="float32").tobytes(), now)
+                for t, v in zip(texts, vecs)]
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO emb(model, h, vec, atime) VALUES (?,?,?,?)", rows)
+            self._rows += self._db.total_changes - before
+            if self._rows > self.max_rows:
+                self._evict()
+
+    def _evict(self) -> None:
+        """오래 안 쓴 것부터 상한의 90%까지 줄인다 (lock 보유 상태에서 호출)."""
+        drop = self._rows - int(self.max_rows * 0.9)
+        self._db.execute(
+            "DELETE FROM emb WHERE (model, h) IN (SELECT model, h FROM emb ORDER BY atime LIMIT ?)", (drop,)
+        )
+        self._rows = self._db.execute("SELECT COUNT(*) FROM emb").fetchone()[0]
+
+    # ---------- 정보 ----------
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "rows": self._rows}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM emb")
+            self._rows = 0
+
+# ---------------- 프로세스 공용 인스턴스 ----------------
+_CACHE: Optional[EmbeddingCache] = None
+_CACHE_LOCK = threading.Lock()
+
+def get_cache() -> Optional[EmbeddingCache]:
+    global _CACHE
+    if not ENABLED:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = EmbeddingCache()
+        return _CACHE
+
+def cached_embed(model: str, texts: List[str],
+                 fetch: Callable[[List[str]], List[List[float]]]) -> List[np.ndarray]:
+    """
+    캐시에 없는 텍스트만 fetch(중복 제거)로 가져오고 결과를 캐시에 넣는다.
+    반환: 입력 순서의 원본(정규화 전) float32 벡터 리스트
+    """
+    cache = get_cache()
+    vecs: List[Optional[np.ndarray]] = cache.get_many(model, texts) if cache else [None] * len(texts)
+    todo: Dict[str, List[int]] = {}
+    for i, v in enumerate(vecs):
+        if v is None:
+            todo.setdefault(texts[i], []).append(i)
+    if todo:
+        uniq = list(todo)
+        got = fetch(uniq)
+        for t, v in zip(uniq, got):
+            arr = np.asarray(v, dtype="float32")
+            for i in todo[t]:
+                vecs[i] = arr
+        if cache:
+            cache.put_many(model, uniq, got)
+    return vecs
@@ -0,0 +1,218 @@
+"""
+배치/동시 임베딩 실행기.
+
+- 고정 개수(EMBED_BATCH=8) 대신 토큰 예산(EMBED_BATCH_TOKENS)으로 배치를 채운다
+- 스레드 풀로 최대 EMBED_CONCURRENCY개 배치를 동시에 보낸다
+- 429(rate limit)는 지터 섞인 지수 백오프로 재시도하고, 그동안 다른 워커도 함께 쉰다(backpressure)
+- 입력 탓인 실패(400/413/422, 잘못된 입력)만 배치를 반으로 나눠 재시도(텍스트 1개씩 전부 다시 보내지 않음)
+  인증/한도 소진/네트워크 오류는 나눠도 똑같이 실패하므로 바로 올린다
+- 결과는 항상 입력 순서
+
+백엔드: EMBED_BACKEND=litellm(기본) | fake(오프라인 결정적 벡터, 벤치/테스트용)
+"""
+import os, time, random, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Callable, Optional
+import numpy as np
+
+EMB_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "litellm")
+BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "8000"))   # 요청 1건당 토큰 예산
+BATCH_MAX = int(os.getenv("EMBED_BATCH_MAX", "256"))          # 요청 1건당 최대 텍스트 수
+CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+RETRIES = int(os.getenv("EMBED_RETRIES", "6"))
+BACKOFF_BASE = float(os.getenv("EMBED_BACKOFF_BASE", "0.5"))  # 초
+BACKOFF_MAX = float(os.getenv("EMBED_BACKOFF_MAX", "30"))
+
+Backend = Callable[[List[str]], List[List[float]]]
+
+# ---------------- 토큰 수 ----------------
+try:
+    import tiktoken
+    _ENC = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENC = None
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 1
+    if _ENC is not None:
+        return len(_ENC.encode(text, disallowed_special=()))
+    # 근사: ASCII는 4자당 1토큰, 한글 등 비ASCII는 1자당 1토큰
+    ascii_n = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_n // 4 + (len(text) - ascii_n) + 1
+
+def pack_batches(texts: List[str], max_tokens: int = BATCH_TOKENS,
+                 max_items: int = BATCH_MAX) -> List[List[int]]:
+    """입력 순서를 유지하며 토큰 예산/개수 한도 안에서 인덱스 묶음을 만든다."""
+    batches: List[List[int]] = []
+    cur: List[int] = []
+    cur_tok = 0
+    for i, t in enumerate(texts):
+        n = count_tokens(t)
+        if cur and (cur_tok + n > max_tokens or len(cur) >= max_items):
+            batches.append(cur)
+            cur, cur_tok = [], 0
+        cur.append(i)
+        cur_tok += n
+    if cur:
+        batches.append(cur)
+    return batches
+
+# ---------------- 백엔드 ----------------
+def litellm_backend(model: str = EMB_MODEL) -> Backend:
+    def _call(texts: List[str]) -> List[List[float]]:
+        from litellm import embedding
+        r = embedding(model=model, input=texts)
+        return [obj["embedding"] for obj in r["data"]]
+    return _call
+
+def fake_backend(dim: int = 1536, latency_ms: float = 0.0, per_token_ms: float = 0.0) -> Backend:
+    """텍스트 해시로 만든 결정적 난수 벡터. latency로 원격 호출 지연을 흉내낸다."""
+    def _call(texts: List[str]) -> List[List[float]]:
+        if latency_ms or per_token_ms:
+            time.sleep((latency_ms + per_token_ms * sum(count_tokens(t) for t in texts)) / 1000.0)
+        out = []
+        for t in texts:
+            seed = int.from_bytes(hashlib.md5((t or "").encode("utf-8")).digest()[:8], "little")
+            out.append(np.random.default_rng(seed).standard_normal(dim).astype("float32").tolist())
+        return out
+    return _call
+
+def _status(e: Exception) -> Optional[int]:
+    code = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+def _is_rate_limit(e: Exception) -> bool:
+    return _status(e) == 429 or "RateLimit" in type(e).__name__ or "429" in str(e)[:200]
+
+_INPUT_ERROR_NAMES = ("BadRequest", "InvalidRequest", "ContextWindowExceeded", "UnprocessableEntity")
+
+def _is_input_error(e: Exception) -> bool:
+    """배치 내용 탓인 실패인가 (나눠 보내면 나머지는 성공할 수 있는 것)"""
+    if _is_rate_limit(e):
+        return False
+    code = _status(e)
+    if code is not None:
+        return code in (400, 413, 422)
+    return isinstance(e, (ValueError, TypeError)) or any(n in type(e).__name__ for n in _INPUT_ERROR_NAMES)
+
+def _retry_after(e: Exception) -> Optional[float]:
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+# ---------------- 실행기 ----------------
+class EmbeddingExecutor:
+    """
+    embed(texts) -> 입력 순서의 원본(정규화 전) 벡터 리스트.
+    stats(): requests / retries_429 / splits / texts
+    """
+
+    def __init__(self, backend: Optional[Backend] = None, concurrency: int = CONCURRENCY,
+                 max_tokens: int = BATCH_TOKENS, max_items: int = BATCH_MAX,
+                 retries: int = RETRIES, backoff_base: float = BACKOFF_BASE):
+        self.backend = backend or litellm_backend()
+        self.concurrency = max(1, concurrency)
+        self.max_tokens = max_tokens
+        self.max_items = max_items
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self._pause_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries_429": 0, "splits": 0, "texts": 0}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _bump(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def _wait_pause(self) -> None:
+        while True:
+            with self._lock:
+                wait = self._pause_until - time.monotonic()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def _call(self, texts: List[str]) -> List[List[float]]:
+        """429는 지수 백오프(+지터)로 재시도. 쉬는 동안 다른 워커도 _pause_until에서 대기."""
+        for attempt in range(self.retries + 1):
+            self._wait_pause()
+            try:
+                self._bump("requests")
+                vecs = self.backend(texts)
+                if len(vecs) != len(texts):
+                    raise ValueError(f"embedding count mismatch: {len(vecs)} != {len(texts)}")
+                return vecs
+            except Exception as e:
+                if not _is_rate_limit(e) or attempt == self.retries:
+                    raise
+                self._bump("retries_429")
+                delay = _retry_after(e) or min(BACKOFF_MAX, self.backoff_base * (2 ** attempt))
+                delay *= random.uniform(0.5, 1.5)
+                with self._lock:
+                    self._pause_until = max(self._pause_until, time.monotonic() + delay)
+        raise RuntimeError("unreachable")
+
+    def _run_batch(self, texts: List[str]) -> List[List[float]]:
+        try:
+            return self._call(texts)
+        except Exception as e:
+            if len(texts) == 1 or not _is_input_error(e):
+                raise
+            # 배치 안의 불량 입력 격리: 반으로 나눠 재시도
+            self._bump("splits")
+            mid = len(texts) // 2
+            return self._run_batch(texts[:mid]) + self._run_batch(texts[mid:])
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        self._bump("texts", len(texts))
+        batches = pack_batches(texts, self.max_tokens, self.max_items)
+        out: List[Optional[List[float]]] = [None] * len(texts)
+
+        def _work(idxs: List[int]) -> None:
+            vecs = self._run_batch([texts[i] for i in idxs])
+            for i, v in zip(idxs, vecs):
+                out[i] = v
+
+        if len(batches) == 1 or self.concurrency == 1:
+            for b in batches:
+                _work(b)
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as pool:
+                for f in [pool.submit(_work, b) for b in batches]:
+                    f.result()
+        return out
+
+# ---------------- 모델별 공용 인스턴스 ----------------
+_EXECUTORS: Dict[str, EmbeddingExecutor] = {}
+_EXEC_LOCK = threading.Lock()
+_BACKEND_OVERRIDE: Optional[Backend] = None
+
+def use_backend(backend: Optional[Backend]) -> None:
+    """모든 모델의 백엔드를 교체(None이면 환경설정 기본값). 기존 실행기는 폐기."""
+    global _BACKEND_OVERRIDE
+    with _EXEC_LOCK:
+        _BACKEND_OVERRIDE = backend
+        _EXECUTORS.clear()
+
+def get_executor(model: str = EMB_MODEL) -> EmbeddingExecutor:
+    with _EXEC_LOCK:
+        ex = _EXECUTORS.get(model)
+        if ex is None:
+            if _BACKEND_OVERRIDE is not None:
+                backend = _BACKEND_OVERRIDE
+            elif EMBED_BACKEND == "fake":
+                backend = fake_backend()
+            else:
+                backend = litellm_backend(model)
+            ex = _EXECUTORS[model] = EmbeddingExecutor(backend)
+        return ex
@@ -0,0 +1,92 @@
+"""
+FaissStore 메타 필터 인덱스: kind / source / date 를 벡터 위치(position) 기준으로 보관하고,
+검색 시 packed 비트맵을 faiss.IDSelectorBitmap 으로 넘겨 FAISS 안에서 거른다(과다 조회/후처리 없음).
+
+- kind, source : 사전 인코딩 코드 배열(uint32) + 값별 packed 비트맵 캐시
+- date         : int32 YYYYMMDD (0 = 날짜 없음)
+
+where 예시:
+  {"kind": "government"}
+  {"kind": ["government", "instructor"], "date_from": "2025-01-01"}
+  {"source": "data/raw/Tech Legal Insights.pdf"}
+"""
+import re
+from typing import Dict, List, Optional, Iterable, Union
+import numpy as np
+import faiss
+
+FIELDS = ("kind", "source")
+WHERE_KEYS = set(FIELDS) | {"date_from", "date_to"}
+
+_DATE_PAT = re.compile(r"(\d{4})[.\-/년\s]*(\d{1,2})[.\-/월\s]*(\d{1,2})")
+
+def parse_date(s: Optional[str]) -> int:
+    """'2025-01-02' / '2025.1.2' / '2025년 1월 2일' → 20250102, 실패 시 0"""
+    m = _DATE_PAT.search(s or "")
+    if not m:
+        return 0
+    return int(m.group(1)) * 10000 + int(m.group(2)) * 100 + int(m.group(3))
+
+def _as_list(v: Union[str, Iterable[str]]) -> List[str]:
+    return [v] if isinstance(v, str) else list(v)
+
+class FieldIndex:
+    def __init__(self, n: int):
+        self.n = n
+        self.codes = {f: np.zeros(n, dtype="uint32") for f in FIELDS}
+        self.vocab: Dict[str, Dict[str, int]] = {f: {"": 0} for f in FIELDS}
+        self.dates = np.zeros(n, dtype="int32")
+        self._bitmaps: Dict[tuple, np.ndarray] = {}
+
+    def set(self, pos: int, kind: str, source: str, date: str) -> None:
+        for f, v in (("kind", kind), ("source", source)):
+            voc = self.vocab[f]
+            code = voc.get(v)
+            if code is None:
+                code = voc[v] = len(voc)
+            self.codes[f][pos] = code
+        self.dates[pos] = parse_date(date)
+        self._bitmaps.clear()
+
+    def _value_bits(self, field: str, value: str) -> np.ndarray:
+        key = (field, value)
+        bits = self._bitmaps.get(key)
+        if bits is None:
+            code = self.vocab[field].get(value)
+            mask = (self.codes[field] == code) if code is not None else np.zeros(self.n, dtype=bool)
+            bits = self._bitmaps[key] = np.packbits(mask, bitorder="little")
+        return bits
+
+    def select(self, where: Dict, live: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        where 조건(AND, 리스트 값은 OR)을 만족하는 위치의 packed 비트맵(little bit order).
+        live: 살아있는 위치 비트맵(톰스톤 제외), 주면 AND
+        """
+        bad = set(where) - WHERE_KEYS
+        if bad:
+            raise ValueError(f"unsupported filter keys: {sorted(bad)}")
+        bits = np.full((self.n + 7) // 8, 0xFF, dtype="uint8") if live is None else live.copy()
+        for f in FIELDS:
+            if where.get(f) is None:
+                continue
+            acc = np.zeros_like(bits)
+            for v in _as_list(where[f]):
+                acc |= self._value_bits(f, v)
+            bits &= acc
+        lo, hi = parse_date(where.get("date_from")), parse_date(where.get("date_to"))
+        if lo or hi:
+            d = self.dates
+            mask = d > 0
+            if lo: mask &= d >= lo
+            if hi: mask &= d <= hi
+            bits &= np.packbits(mask, bitorder="little")
+        if self.n % 8:
+            bits[-1] &= (1 << (self.n % 8)) - 1  # 꼬리 패딩 비트 제거
+        return bits
+
+def popcount(bits: np.ndarray) -> int:
+    return int(np.unpackbits(bits).sum())
+
+def bitmap_selector(n: int, bits: np.ndarray) -> faiss.IDSelectorBitmap:
+    """bits는 selector를 쓰는 동안 살아 있어야 한다(호출 측이 참조 유지)."""
+    return faiss.IDSelectorBitmap(n, faiss.swig_ptr(bits))
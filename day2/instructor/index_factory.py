@@ -0,0 +1,125 @@
+"""
+FaissStore 인덱스 팩토리: Flat(기본) / IVF-Flat / HNSW / IVF-PQ / OPQ+IVF-PQ / SQ(fp16, int8).
+
+RAG_INDEX 에 프리셋 이름 또는 faiss.index_factory 문자열을 그대로 넣는다.
+  flat     → Flat                       (정확, 1536d 기준 6KB/청크)
+  ivf      → IVF{nlist},Flat            (nprobe로 속도/재현율 조절)
+  hnsw     → HNSW32                     (efSearch로 조절, 학습 불필요)
+  ivfpq    → IVF{nlist},PQ{m}           (m 바이트/청크)
+  opq      → OPQ{m},IVF{nlist},PQ{m}
+  sq8      → SQ8                        (1바이트/차원)
+  sqfp16   → SQfp16                     (2바이트/차원)
+학습이 필요한 인덱스는 최대 RAG_TRAIN_SAMPLE개 표본으로 학습한다. 필요한 표본 수(min_train)는
+RAG_MIN_TRAIN과 k-means 하한(센트로이드당 39개: IVF 39·nlist, PQ/OPQ 39·2^nbits = 9984) 중 큰 값이며,
+부족하면 IVF-Flat(같은 nlist, 가능할 때) → Flat 순으로 대체한다 (적은 표본의 PQ 학습은 코드북이 망가진다).
+검색 파라미터: RAG_NPROBE (IVF), RAG_EF_SEARCH (HNSW)
+"""
+import os, math
+from typing import Optional
+import numpy as np
+import faiss
+
+INDEX_SPEC = os.getenv("RAG_INDEX", "flat")
+TRAIN_SAMPLE = int(os.getenv("RAG_TRAIN_SAMPLE", "50000"))
+MIN_TRAIN = int(os.getenv("RAG_MIN_TRAIN", "2000"))
+NPROBE = int(os.getenv("RAG_NPROBE", "16"))
+EF_SEARCH = int(os.getenv("RAG_EF_SEARCH", "64"))
+
+PRESETS = {
+    "flat":   "Flat",
+    "ivf":    "IVF{nlist},Flat",
+    "hnsw":   "HNSW32",
+    "ivfpq":  "IVF{nlist},PQ{m}",
+    "opq":    "OPQ{m},IVF{nlist},PQ{m}",
+    "sq8":    "SQ8",
+    "sqfp16": "SQfp16",
+}
+
+def _nlist(n: int) -> int:
+    # 관례: 4*sqrt(n), 셀당 최소 39개 학습 표본 확보
+    return max(1, min(int(4 * math.sqrt(max(n, 1))), n // 39 or 1))
+
+def _pq_m(dim: int) -> int:
+    # 서브벡터당 16차원 근처, dim의 약수
+    for m in (dim // 16, dim // 8, dim // 4, dim // 2, dim):
+        if m and dim % m == 0 and m <= 256:
+            return m
+    return 1
+
+def factory_string(dim: int, n: int, spec: Optional[str] = None) -> str:
+    spec = (spec or INDEX_SPEC).strip()
+    tmpl = PRESETS.get(spec.lower(), spec)
+    return tmpl.format(nlist=_nlist(n), m=_pq_m(dim))
+
+def needs_raw_vectors(index: faiss.Index) -> bool:
+    """재구성(reconstruct)이 정확하지 않거나 불가능한 인덱스 → compaction용 원본 벡터를 따로 보관."""
+    return not isinstance(index, faiss.IndexFlat)
+
+def min_train(index: faiss.Index) -> int:
+    """학습 표본 하한: max(RAG_MIN_TRAIN, 39·nlist, 39·2^nbits) — k-means가 경고 없이 도는 최소치"""
+    need = MIN_TRAIN
+    inner = index
+    if isinstance(index, faiss.IndexPreTransform):
+        for i in range(index.chain.size()):
+            vt = faiss.downcast_VectorTransform(index.chain.at(i))
+            if isinstance(vt, faiss.OPQMatrix):
+                need = max(need, 39 * 256)  # OPQ 회전 학습은 내부에서 8비트 PQ를 학습한다
+        inner = faiss.downcast_index(index.index)
+    ivf = faiss.try_extract_index_ivf(inner)
+    if ivf is not None:
+        need = max(need, 39 * ivf.nlist)
+        inner = faiss.downcast_index(ivf)
+    pq = getattr(inner, "pq", None)
+    if pq is not None:
+        need = max(need, 39 * int(pq.ksub))
+    return need
+
+def build_index(X: np.ndarray, spec: Optional[str] = None, seed: int = 0) -> faiss.Index:
+    """X(정규화된 float32)로 인덱스 생성 + (필요 시) 표본 학습 + add."""
+    n, dim = X.shape
+    fs = factory_string(dim, n, spec)
+    index = faiss.index_factory(dim, fs, faiss.METRIC_INNER_PRODUCT)
+    need = 0 if index.is_trained else min_train(index)
+    if n < need:
+        ivf = faiss.try_extract_index_ivf(index)
+        fallback, name = faiss.IndexFlatIP(dim), "Flat"
+        if ivf is not None and not isinstance(faiss.downcast_index(ivf), faiss.IndexIVFFlat):
+            alt = faiss.index_factory(dim, f"IVF{ivf.nlist},Flat", faiss.METRIC_INNER_PRODUCT)
+            if n >= min_train(alt):
+                fallback, name = alt, f"IVF{ivf.nlist},Flat"
+        print(f"[FaissStore] {fs}: 학습 표본 {n} < {need} → {name}")
+        index = fallback
+    if not index.is_trained:
+        rng = np.random.default_rng(seed)
+        sample = X if n <= TRAIN_SAMPLE else X[np.sort(rng.choice(n, TRAIN_SAMPLE, replace=False))]
+        index.train(np.ascontiguousarray(sample, dtype="float32"))
+    index.add(np.ascontiguousarray(X, dtype="float32"))
+    tune(index)
+    return index
+
+def tune(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> faiss.Index:
+    """IVF nprobe / HNSW efSearch 설정 (해당 없는 인덱스는 무시)."""
+    ps = faiss.ParameterSpace()
+    for name, val in (("nprobe", nprobe or NPROBE), ("efSearch", ef_search or EF_SEARCH)):
+        try:
+            ps.set_index_parameter(index, name, val)
+        except RuntimeError:
+            pass
+    return index
+
+def search_params(index: faiss.Index, sel: faiss.IDSelector) -> faiss.SearchParameters:
+    """IDSelector를 인덱스 종류에 맞는 SearchParameters로 감싼다(현재 nprobe/efSearch 유지)."""
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexPreTransform) else index
+    ivf = faiss.try_extract_index_ivf(inner)
+    if ivf is not None:
+        p = faiss.SearchParametersIVF(sel=sel, nprobe=ivf.nprobe)
+    elif isinstance(inner, faiss.IndexHNSW):
+        p = faiss.SearchParametersHNSW(sel=sel, efSearch=inner.hnsw.efSearch)
+    else:
+        p = faiss.SearchParameters(sel=sel)
+    if inner is not index:
+        p = faiss.SearchParametersPreTransform(index_params=p)
+    return p
+
+def index_nbytes(index: faiss.Index) -> int:
+    return int(faiss.serialize_index(index).size)
@@ -1,13 +1,16 @@
-import os, re, glob, hashlib, requests, json
+import os, io, re, glob, bisect, hashlib, json
 from typing import List, Dict, Tuple, Optional
 from dotenv import load_dotenv, find_dotenv
 from bs4 import BeautifulSoup
 
 load_dotenv(find_dotenv(), override=False)
 
+from day1.instructor.http_cache import cached_get  # .env의 HTTP_CACHE_* 반영 후
+
 REQUEST_TIMEOUT = int(os.getenv("RAG_REQUEST_TIMEOUT", "15"))
 USER_AGENT = os.getenv("RAG_USER_AGENT", "Mozilla/5.0 (Day2-Instructor)")
 RAW_DIR = os.getenv("RAG_RAW_DIR", "data/raw")
+CHUNKER = os.getenv("RAG_CHUNKER", "structure")  # structure(문단/제목/문장 + 토큰 예산) | chars(800/100 문자 창)
 
 def read_text_file(path: str) -> str:
     return open(path, "r", encoding="utf-8").read()
@@ -15,22 +18,19 @@ def read_text_file(path: str) -> str:
 def read_md_file(path: str) -> str:
     return read_text_file(path)
 
-def read_pdf_file(path: str) -> str:
+def read_pdf_pages(path: str) -> List[str]:
+    """쪽별 텍스트 (pdf_extract: PDF_BACKEND, 쪽 구간 병렬, 파일 해시 캐시). 실패 시 []"""
     try:
-        from PyPDF2 import PdfReader
-        reader = PdfReader(path)
-        texts = []
-        for page in reader.pages:
-            try:
-                texts.append(page.extract_text() or "")
-            except Exception:
-                pass
-        return "\n".join(texts)
+        from day2.instructor.pdf_extract import extract_pages
+        return extract_pages(path)
     except Exception:
-        return ""
+        return []
+
+def read_pdf_file(path: str) -> str:
+    return "\n".join(read_pdf_pages(path))
 
 def read_url_text(url: str) -> Tuple[str, str]:
-    r = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=REQUEST_TIMEOUT)
+    r = cached_get(url, headers={"User-Agent": USER_AGENT}, timeout=REQUEST_TIMEOUT)  # day1 http_cache
     r.raise_for_status()
     html = r.text
     soup = BeautifulSoup(html, "html.parser")
@@ -72,6 +72,43 @@ def read_text_auto(path_or_url: str) -> Tuple[str, str]:
     except Exception:
         return (os.path.basename(path_or_url), "")
 
+def strip_repeated_lines(pages: List[str], min_pages: int = 3, ratio: float = 0.5) -> List[str]:
+    """쪽마다 반복되는 머리말/꼬리말 줄(각 쪽 처음·끝 2줄 중 절반 이상의 쪽에 나오는 줄)을 지운다."""
+    if len(pages) < min_pages:
+        return pages
+    edge = lambda lines: {l.strip() for l in lines[:2] + lines[-2:] if l.strip()}
+    counts: Dict[str, int] = {}
+    for p in pages:
+        for l in edge(p.splitlines()):
+            counts[l] = counts.get(l, 0) + 1
+    rep = {l for l, c in counts.items() if c >= max(min_pages, ratio * len(pages))}
+    if not rep:
+        return pages
+    out = []
+    for p in pages:
+        lines = p.splitlines()
+        n = len(lines)
+        out.append("\n".join(l for i, l in enumerate(lines)
+                             if not ((i < 2 or i >= n - 2) and l.strip() in rep)))
+    return out
+
+def read_document(path_or_url: str) -> Tuple[str, str, Optional[List[Tuple[int, int]]]]:
+    """
+    반환: (title, text, page_starts). PDF면 page_starts = [(text 내 시작 오프셋, 쪽 번호), ...],
+    그 외는 None (청크 page = 청크 순번).
+    """
+    if path_or_url.lower().endswith(".pdf") and not re.match(r"^https?://", path_or_url):
+        from day2.instructor.pdf_extract import extract_pages
+        # 파싱 실패는 예외 그대로 (read_pdf_pages처럼 []로 삼키면 빈 문서와 구분되지 않는다)
+        pages = strip_repeated_lines(extract_pages(path_or_url))  # 반복 머리말/꼬리말 제거
+        starts, off = [], 0
+        for no, t in enumerate(pages, 1):
+            starts.append((off, no))
+            off += len(t) + 1  # "\n" 구분자
+        return (os.path.basename(path_or_url), "\n".join(pages), starts)
+    title, text = read_text_auto(path_or_url)
+    return (title, text, None)
+
 def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100) -> List[str]:
     chunks = []
     i = 0
@@ -94,6 +131,39 @@ def collect_sources_from_folder(folder: str = RAW_DIR) -> List[str]:
                 paths.append(u)
     return paths
 
+def make_chunks(path: str, title: str, text: str,
+                chunk_size: int = 800, overlap: int = 100, kind: str = "generic",
+                page_starts: Optional[List[Tuple[int, int]]] = None,
+                chunker: Optional[str] = None) -> List[Dict]:
+    """
+    문서 1개 → 청크 dict 리스트 (id = md5(title::j)).
+    chunker: structure(기본, chunker.iter_chunks — RAG_CHUNK_TOKENS 토큰 예산) | chars(chunk_size/overlap 문자 창)
+    page_starts가 있으면(PDF) page = 청크 시작 위치가 속한 실제 쪽, 없으면 청크 순번.
+    """
+    base = title or os.path.basename(path)
+    if (chunker or CHUNKER) == "chars":
+        step = max(1, chunk_size - overlap)
+        pieces = (((j - 1) * step, t) for j, t in enumerate(chunk_text(text, chunk_size, overlap), 1))
+    else:
+        from day2.instructor.chunker import iter_chunks
+        pieces = iter_chunks(io.StringIO(text))  # text는 이미 메모리에 있음: StringIO는 줄 단위로 넘기는 어댑터
+    offs = [o for o, _ in page_starts] if page_starts else None
+    out: List[Dict] = []
+    for j, (start, t) in enumerate(pieces, 1):
+        cid = hashlib.md5((base + "::" + str(j)).encode("utf-8")).hexdigest()
+        page = j
+        if offs:
+            page = page_starts[max(0, bisect.bisect_right(offs, start) - 1)][1]
+        out.append({
+            "id": cid,
+            "text": t,
+            "source": path,     # URL or File path
+            "page": page,
+            "kind": kind,
+            "title": base,
+        })
+    return out
+
 def ingest_sources(paths: Optional[List[str]] = None,
                    chunk_size: int = 800,
                    overlap: int = 100,
@@ -104,26 +174,17 @@ def ingest_sources(paths: Optional[List[str]] = None,
     paths: 파일/URL 리스트(없으면 RAW_DIR에서 수집)
     반환: [{"id","text","source","page","kind","title"}, ...]
     - save_chunks=True이면 out_dir/chunks.jsonl 로 라인 단위 JSON 저장
+    - 읽기는 pipeline.iter_documents(스레드 풀, PDF는 쪽 구간 프로세스 풀)로 병렬 처리.
+      전체 청크를 리스트로 돌려주므로, 큰 코퍼스는 pipeline.ingest_to_store를 쓴다.
     """
+    from day2.instructor.pipeline import iter_documents
+
     paths = paths or collect_sources_from_folder(RAW_DIR)
     out: List[Dict] = []
-
-    for p in paths:
-        title, text = read_text_auto(p)
-        if not text:
-            continue
-        chunks = chunk_text(text, chunk_size=chunk_size, overlap=overlap)
-        base = title or os.path.basename(p)
-        for j, t in enumerate(chunks, 1):
-            cid = hashlib.md5((base + "::" + str(j)).encode("utf-8")).hexdigest()
-            out.append({
-                "id": cid,
-                "text": t,
-                "source": p,        # URL or File path
-                "page": j,
-                "kind": kind,
-                "title": base,
-            })
+    for p, title, text, starts in iter_documents(paths):
+        if text:
+            out.extend(make_chunks(p, title, text, chunk_size=chunk_size, overlap=overlap, kind=kind,
+                                   page_starts=starts))
 
     if save_chunks:
         os.makedirs(out_dir, exist_ok=True)
@@ -0,0 +1,133 @@
+"""
+오프라인 어휘(BM25) 검색 엔진 — 한국어 문서용.
+
+토큰화: 한글 연속 구간은 문자 bigram(1글자면 unigram), 영문은 소문자 단어, 숫자는 쉼표 제거.
+  "2025년 클라우드 지원사업 총 100억원" → 2025 / 년 / 클라 라우 우드 / 지원 원사 사업 / 총 / 100 / 억원
+기관명·사업명·예산 숫자처럼 임베딩이 놓치기 쉬운 표면형을 그대로 맞춘다.
+
+저장: FaissStore의 base/세그먼트마다 *.lex.npz 하나 (append-only, 세그먼트 단위로 증분)
+  term  u32[T]   정렬된 term 해시
+  off   i64[T+1] term별 postings 구간
+  doc   u32[P]   세그먼트 내 로컬 문서 번호
+  tf    u16[P]
+  dl    u32[n]   문서 길이(토큰 수)
+질의 시 세그먼트별 postings를 이진탐색으로 찾아 전역 df/avgdl로 BM25를 계산한다.
+"""
+import re, math, hashlib
+from functools import lru_cache
+from collections import Counter
+from typing import List, Tuple, Optional
+import numpy as np
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_PAT = re.compile(r"[가-힣]+|[a-z]+|\d+(?:[.,]\d+)*")
+
+def tokenize(text: str) -> List[str]:
+    out: List[str] = []
+    for tok in _TOKEN_PAT.findall((text or "").lower()):
+        c = tok[0]
+        if "가" <= c <= "힣":
+            if len(tok) == 1:
+                out.append(tok)
+            else:
+                out.extend(tok[i : i + 2] for i in range(len(tok) - 1))
+        elif c.isdigit():
+            out.append(tok.replace(",", ""))
+        else:
+            out.append(tok)
+    return out
+
+@lru_cache(maxsize=1 << 18)
+def term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=4).digest(), "little")
+
+class LexSegment:
+    """문서 n개짜리 불변 postings 묶음."""
+    __slots__ = ("term", "off", "doc", "tf", "dl")
+
+    def __init__(self, term, off, doc, tf, dl):
+        self.term, self.off, self.doc, self.tf, self.dl = term, off, doc, tf, dl
+
+    @property
+    def n(self) -> int:
+        return int(len(self.dl))
+
+    @classmethod
+    def build(cls, texts: List[str]) -> "LexSegment":
+        terms: List[int] = []
+        docs: List[int] = []
+        tfs: List[int] = []
+        dl = np.zeros(len(texts), dtype="uint32")
+        for d, t in enumerate(texts):
+            toks = tokenize(t)
+            dl[d] = len(toks)
+            for term, tf in Counter(term_hash(x) for x in toks).items():
+                terms.append(term); docs.append(d); tfs.append(min(tf, 65535))
+        term_a = np.array(terms, dtype="uint32")
+        doc_a = np.array(docs, dtype="uint32")
+        tf_a = np.array(tfs, dtype="uint16")
+        order = np.lexsort((doc_a, term_a))
+        term_a, doc_a, tf_a = term_a[order], doc_a[order], tf_a[order]
+        uniq, first = np.unique(term_a, return_index=True)
+        off = np.append(first, len(term_a)).astype("int64")
+        return cls(uniq, off, doc_a, tf_a, dl)
+
+    def postings(self, h: int) -> Tuple[np.ndarray, np.ndarray]:
+        i = int(np.searchsorted(self.term, h))
+        if i >= len(self.term) or int(self.term[i]) != h:
+            return self.doc[:0], self.tf[:0]
+        a, b = int(self.off[i]), int(self.off[i + 1])
+        return self.doc[a:b], self.tf[a:b]
+
+    def save(self, fileobj) -> None:
+        np.savez(fileobj, term=self.term, off=self.off, doc=self.doc, tf=self.tf, dl=self.dl)
+
+    @classmethod
+    def load(cls, path: str) -> "LexSegment":
+        z = np.load(path)
+        return cls(z["term"], z["off"], z["doc"], z["tf"], z["dl"])
+
+class LexicalIndex:
+    """(시작 위치, LexSegment) 목록을 하나의 BM25 인덱스처럼 조회. 문서 번호 = FaissStore 벡터 위치."""
+
+    def __init__(self, parts: List[Tuple[int, LexSegment]], ntotal: int):
+        self.parts = parts
+        self.ntotal = ntotal
+        total_len = sum(float(seg.dl.sum()) for _, seg in parts)
+        self.n_docs = sum(seg.n for _, seg in parts)
+        self.avgdl = (total_len / self.n_docs) if self.n_docs else 1.0
+        self._dl = np.zeros(ntotal, dtype="float32")
+        for start, seg in parts:
+            self._dl[start : start + seg.n] = seg.dl
+
+    def search(self, query: str, k: int, allowed: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """allowed: 길이 ntotal bool 마스크(필터/톰스톤). 반환: [(position, bm25), ...] 내림차순"""
+        hs = {term_hash(t) for t in tokenize(query)}
+        if not hs or not self.n_docs:
+            return []
+        scores = np.zeros(self.ntotal, dtype="float32")
+        N = self.n_docs
+        for h in hs:
+            plist = [(start, *seg.postings(h)) for start, seg in self.parts]
+            df = sum(len(d) for _, d, _ in plist)
+            if not df:
+                continue
+            idf = math.log(1.0 + (N - df + 0.5) / (df + 0.5))
+            for start, d, tf in plist:
+                if not len(d):
+                    continue
+                pos = d.astype("int64") + start
+                tf = tf.astype("float32")
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self._dl[pos] / self.avgdl)
+                scores[pos] += idf * tf * (BM25_K1 + 1.0) / (tf + norm)
+        if allowed is not None:
+            scores[~allowed[: self.ntotal]] = 0.0
+        nz = np.flatnonzero(scores)
+        if not len(nz):
+            return []
+        kk = min(k, len(nz))
+        top = nz[np.argpartition(-scores[nz], kk - 1)[:kk]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(p), float(scores[p])) for p in top]
@@ -4,8 +4,10 @@ from dotenv import load_dotenv, find_dotenv
 
 load_dotenv(find_dotenv(), override=False)
 
-from day2.instructor.ingest import ingest_sources, collect_sources_from_folder
+from day2.instructor.ingest import collect_sources_from_folder
+from day2.instructor.sources import sync_sources
 from day2.instructor.rag_store import FaissStore
+from day2.instructor.emb_cache import get_cache
 from day2.instructor.agents import answer_with_context
 
 def render_hits_table(items, title="RAG Retrieval"):
@@ -23,14 +25,15 @@ def main():
 
     store = FaissStore.load_or_new(index_dir)
 
-    # 0) 인덱스 준비
-    if store.ntotal() == 0:
-        sources = collect_sources_from_folder(raw_dir)
-        chunks = ingest_sources(sources, out_dir=index_dir, kind="instructor")
-        ntotal, added = store.upsert(chunks)
-        print(f"[Upsert] ntotal={ntotal}, added={added}")
-    else:
-        print(f"[Index ready] ntotal={store.ntotal()}")
+    # 0) 인덱스 준비: 새/변경 소스만 반영, 사라진 소스의 청크는 정리 (sources.json 매니페스트)
+    sources = collect_sources_from_folder(raw_dir)
+    st = sync_sources(sources, store, kind="instructor")
+    if "pipeline" in st:
+        print(f"[Upsert] ntotal={st['ntotal']}, added={st['pipeline']['embedded']}")
+        cache = get_cache()
+        if cache: print(f"[EmbCache] {cache.stats()}")
+    print(f"[Index ready] ntotal={st['ntotal']} (new={st['new']}, changed={st['changed']}, "
+          f"unchanged={st['unchanged']}, removed={st['removed']}, retired={st['retired_chunks']})")
 
     # 1) 검색
     k = int(os.getenv("D2_TOPK", "6"))
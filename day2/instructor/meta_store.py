@@ -0,0 +1,205 @@
+"""
+FaissStore 메타데이터 사이드카(meta.bin): mmap으로 여는 컬럼형 바이너리 포맷.
+
+레이아웃 (little-endian)
+  header   : magic(8) | ncols u32 | reserved u32 | nrows u64 | cols_len u32 | cols(json) | pad(8)
+  offsets  : u64[ncols, nrows+1]     # 컬럼 c의 r번째 값 = blob[off[c,r] : off[c,r+1]]
+  id_hash  : u64[nrows]              # blake2b-64(id), 오름차순
+  id_row   : u64[nrows]              # id_hash와 같은 순서의 row 번호
+  blob     : 컬럼별 utf-8 값들을 이어붙인 바이트열
+
+top-k 조회는 id→row 이진탐색 + 필요한 k개 row의 슬라이스만 디코딩하므로 O(k)이다.
+chunks.jsonl은 import/export 포맷으로만 유지한다.
+
+  python -m day2.instructor.meta_store migrate [index_dir ...]   # chunks.jsonl → meta.bin (1회)
+  python -m day2.instructor.meta_store export  [index_dir ...]   # meta.bin → chunks.jsonl
+"""
+import os, sys, json, mmap, struct, hashlib
+from typing import List, Dict, Optional, Iterable, Iterator
+import numpy as np
+
+MAGIC = b"D2META01"
+SIDECAR_NAME = "meta.bin"
+JSONL_NAME = "chunks.jsonl"
+
+# 표준 청크 스키마 컬럼. 그 외 키는 "extra"에 JSON으로 보관.
+COLUMNS = ("id", "title", "source", "kind", "page", "date", "text", "extra")
+INT_COLUMNS = {"page"}
+OPTIONAL_COLUMNS = {"date"}  # 비어 있으면 row()에서 키 자체를 생략
+
+_HEAD = struct.Struct("<8sIIQI")
+
+def id_hash(cid: str) -> int:
+    return int.from_bytes(hashlib.blake2b(cid.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _cell(row: Dict, col: str) -> str:
+    if col == "extra":
+        extra = {k: v for k, v in row.items() if k not in COLUMNS}
+        return json.dumps(extra, ensure_ascii=False) if extra else ""
+    v = row.get(col)
+    return "" if v is None else str(v)
+
+def _decode(out: Dict, col: str, v: str) -> None:
+    """컬럼 문자열 → row dict (MetaSidecar.row와 normalize_row가 공유)"""
+    if col == "extra":
+        if v: out.update(json.loads(v))
+    elif col in OPTIONAL_COLUMNS and not v:
+        return
+    elif col in INT_COLUMNS:
+        out[col] = int(v) if v.lstrip("-").isdigit() else (v or None)
+    else:
+        out[col] = v
+
+def normalize_row(row: Dict) -> Dict:
+    """write_sidecar → MetaSidecar.row 왕복을 거친 모양 (없는 title/kind는 "", 빈 date는 생략 등). 저장본 비교용"""
+    out: Dict = {}
+    for col in COLUMNS:
+        _decode(out, col, _cell(row, col))
+    return out
+
+# ---------------- write ----------------
+def write_sidecar(path: str, rows: List[Dict]) -> int:
+    """rows를 meta.bin으로 기록(tmp → os.replace 원자적 교체). 반환: nrows"""
+    n, ncols = len(rows), len(COLUMNS)
+    offsets = np.zeros((ncols, n + 1), dtype="<u8")
+    parts: List[bytes] = []
+    pos = 0
+    for c, col in enumerate(COLUMNS):
+        for r, row in enumerate(rows):
+            b = _cell(row, col).encode("utf-8")
+            parts.append(b)
+            offsets[c, r] = pos
+            pos += len(b)
+        offsets[c, n] = pos
+
+    hashes = np.array([id_hash(str(row["id"])) for row in rows], dtype="<u8")
+    order = np.argsort(hashes, kind="stable")
+    cols = json.dumps(list(COLUMNS)).encode("utf-8")
+    head = _HEAD.pack(MAGIC, ncols, 0, n, len(cols)) + cols
+    head += b"\0" * (-len(head) % 8)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(head)
+        f.write(offsets.tobytes())
+        f.write(hashes[order].tobytes())
+        f.write(order.astype("<u8").tobytes())
+        for b in parts:
+            f.write(b)
+        f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return n
+
+# ---------------- read ----------------
+class MetaSidecar:
+    """meta.bin 읽기 전용 뷰. 모든 배열은 mmap 위의 np.frombuffer(복사 없음)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        if self._mm is None or self._mm[:8] != MAGIC:
+            raise ValueError(f"not a meta sidecar: {path}")
+        _, ncols, _, n, cols_len = _HEAD.unpack_from(self._mm, 0)
+        p = _HEAD.size
+        self.columns = json.loads(self._mm[p : p + cols_len].decode("utf-8"))
+        p += cols_len
+        p += -p % 8
+        self.n = n
+        self._col = {c: i for i, c in enumerate(self.columns)}
+        self._off = np.frombuffer(self._mm, dtype="<u8", count=ncols * (n + 1), offset=p).reshape(ncols, n + 1)
+        p += ncols * (n + 1) * 8
+        self._hash = np.frombuffer(self._mm, dtype="<u8", count=n, offset=p); p += n * 8
+        self._row = np.frombuffer(self._mm, dtype="<u8", count=n, offset=p); p += n * 8
+        self._blob = memoryview(self._mm)[p:]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def close(self) -> None:
+        self._off = self._hash = self._row = None
+        self._blob.release()
+        self._mm.close()
+
+    def value(self, col: str, row: int) -> str:
+        c = self._col[col]
+        a, b = int(self._off[c, row]), int(self._off[c, row + 1])
+        return str(self._blob[a:b], "utf-8")
+
+    def field(self, col: str, row: int) -> str:
+        """컬럼이 없는 구버전 파일이면 extra(JSON)에서 찾는다."""
+        if col in self._col:
+            return self.value(col, row)
+        extra = self.value("extra", row) if "extra" in self._col else ""
+        v = json.loads(extra).get(col) if extra else None
+        return "" if v is None else str(v)
+
+    def find(self, cid: str) -> Optional[int]:
+        """id → row (없으면 None). 해시 충돌은 id 컬럼으로 확인."""
+        if not self.n:
+            return None
+        h = np.uint64(id_hash(cid))
+        i = int(np.searchsorted(self._hash, h, side="left"))
+        while i < self.n and self._hash[i] == h:
+            r = int(self._row[i])
+            if self.value("id", r) == cid:
+                return r
+            i += 1
+        return None
+
+    def row(self, r: int) -> Dict:
+        out: Dict = {}
+        for col in self.columns:
+            _decode(out, col, self.value(col, r))
+        return out
+
+    def get(self, cid: str) -> Optional[Dict]:
+        r = self.find(cid)
+        return None if r is None else self.row(r)
+
+    def ids(self) -> List[str]:
+        return [self.value("id", r) for r in range(self.n)]
+
+    def iter_rows(self) -> Iterator[Dict]:
+        for r in range(self.n):
+            yield self.row(r)
+
+def open_sidecar(path: str) -> Optional[MetaSidecar]:
+    return MetaSidecar(path) if os.path.exists(path) else None
+
+# ---------------- jsonl import/export ----------------
+def read_jsonl(path: str) -> List[Dict]:
+    if not os.path.exists(path): return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(l) for l in f if l.strip()]
+
+def write_jsonl(path: str, rows: Iterable[Dict]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for it in rows:
+            f.write(json.dumps(it, ensure_ascii=False) + "\n")
+
+def migrate_dir(index_dir: str) -> int:
+    """기존 {index_dir}/chunks.jsonl → meta.bin. 이미 있으면 건너뜀. 반환: 기록한 row 수"""
+    side = os.path.join(index_dir, SIDECAR_NAME)
+    src = os.path.join(index_dir, JSONL_NAME)
+    if os.path.exists(side) or not os.path.exists(src):
+        return 0
+    return write_sidecar(side, read_jsonl(src))
+
+def export_dir(index_dir: str) -> int:
+    side = open_sidecar(os.path.join(index_dir, SIDECAR_NAME))
+    if side is None:
+        return 0
+    try:
+        write_jsonl(os.path.join(index_dir, JSONL_NAME), side.iter_rows())
+        return len(side)
+    finally:
+        side.close()
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "migrate"
+    dirs = sys.argv[2:] or [os.getenv("D2_INDEX_DIR", "data/processed/day2/faiss")]
+    for d in dirs:
+        n = migrate_dir(d) if cmd == "migrate" else export_dir(d)
+        print(f"[meta_store] {cmd} {d}: {n} rows")
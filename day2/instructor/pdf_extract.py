@@ -0,0 +1,154 @@
+"""
+PDF 텍스트 추출기: 백엔드 선택 + 페이지 구간 프로세스 병렬 + 파일 해시 캐시.
+
+  PDF_BACKEND            auto(기본) | pymupdf | pypdf | pypdf2
+                         auto = pymupdf(fitz)가 설치돼 있으면 그것, 없으면 pypdf
+  PDF_WORKERS            페이지 구간을 나눠 맡길 프로세스 수 (기본 min(4, CPU))
+  PDF_PARALLEL_MIN_PAGES 이 쪽수 이상일 때만 병렬 (작은 파일은 프로세스 왕복이 더 비싸다)
+  PDF_CACHE              1(기본)이면 추출 결과를 PDF_CACHE_DIR/{sha256}.{backend}.json 에 캐시
+
+extract_pages(path) → ["1쪽 텍스트", "2쪽 텍스트", ...] (인덱스 + 1 = 실제 쪽 번호)
+프로세스 풀은 모듈 전역 하나를 공유하므로, 여러 PDF를 동시에 읽어도 PDF_WORKERS개를 넘지 않는다.
+"""
+import os, json, hashlib, threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Callable, Dict
+
+PDF_BACKEND = os.getenv("PDF_BACKEND", "auto")
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+CACHE_ENABLED = os.getenv("PDF_CACHE", "1") == "1"
+CACHE_DIR = os.getenv("PDF_CACHE_DIR", "data/cache/pdf")
+
+def file_sha256(path: str, bufsize: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(bufsize), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# ---------------- backends: (path, start, stop) -> [page text] ----------------
+def _pages_pymupdf(path: str, start: int, stop: int) -> List[str]:
+    import fitz
+    with fitz.open(path) as doc:
+        return [doc[i].get_text() or "" for i in range(start, min(stop, doc.page_count))]
+
+def _pages_pypdf(path: str, start: int, stop: int) -> List[str]:
+    from pypdf import PdfReader
+    return _extract_reader(PdfReader(path), start, stop)
+
+def _pages_pypdf2(path: str, start: int, stop: int) -> List[str]:
+    from PyPDF2 import PdfReader
+    return _extract_reader(PdfReader(path), start, stop)
+
+def _extract_reader(reader, start: int, stop: int) -> List[str]:
+    out = []
+    for i in range(start, min(stop, len(reader.pages))):
+        try:
+            out.append(reader.pages[i].extract_text() or "")
+        except Exception:
+            out.append("")
+    return out
+
+def _count_pymupdf(path: str) -> int:
+    import fitz
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+def _count_pypdf(path: str) -> int:
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+def _count_pypdf2(path: str) -> int:
+    from PyPDF2 import PdfReader
+    return len(PdfReader(path).pages)
+
+BACKENDS: Dict[str, Callable[[str, int, int], List[str]]] = {
+    "pymupdf": _pages_pymupdf,
+    "pypdf": _pages_pypdf,
+    "pypdf2": _pages_pypdf2,
+}
+_COUNTERS = {"pymupdf": _count_pymupdf, "pypdf": _count_pypdf, "pypdf2": _count_pypdf2}
+_MODULES = {"pymupdf": "fitz", "pypdf": "pypdf", "pypdf2": "PyPDF2"}
+
+def available_backends() -> List[str]:
+    import importlib.util
+    return [b for b in BACKENDS if importlib.util.find_spec(_MODULES[b]) is not None]
+
+def resolve_backend(name: Optional[str] = None) -> str:
+    name = (name or PDF_BACKEND).lower()
+    avail = available_backends()
+    if name == "auto":
+        for b in ("pymupdf", "pypdf", "pypdf2"):
+            if b in avail:
+                return b
+        raise RuntimeError("no PDF backend installed (pymupdf / pypdf / PyPDF2)")
+    if name not in BACKENDS:
+        raise ValueError(f"unknown PDF backend: {name}")
+    if name not in avail:
+        raise RuntimeError(f"PDF backend not installed: {name}")
+    return name
+
+def _extract_range(path: str, backend: str, start: int, stop: int) -> List[str]:
+    """프로세스 풀 작업 단위 (pickle 대상이라 모듈 최상위 함수)"""
+    return BACKENDS[backend](path, start, stop)
+
+# ---------------- shared process pool ----------------
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+def _pool() -> ProcessPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # fork 대신 spawn: 부모의 스레드(임베딩/HTTP 풀) 상태를 물려받지 않도록
+            _POOL = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=mp.get_context("spawn"))
+        return _POOL
+
+# ---------------- cache ----------------
+def _cache_path(digest: str, backend: str) -> str:
+    return os.path.join(CACHE_DIR, f"{digest}.{backend}.json")
+
+def _cache_get(digest: str, backend: str) -> Optional[List[str]]:
+    try:
+        with open(_cache_path(digest, backend), "r", encoding="utf-8") as f:
+            return json.load(f)["pages"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _cache_put(digest: str, backend: str, pages: List[str]) -> None:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(digest, backend)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"pages": pages}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+# ---------------- public ----------------
+def extract_pages(path: str, backend: Optional[str] = None, workers: Optional[int] = None,
+                  use_cache: Optional[bool] = None) -> List[str]:
+    """
+    쪽별 텍스트. 캐시 적중이면 파싱 없이 반환.
+    workers>1이고 쪽수가 PDF_PARALLEL_MIN_PAGES 이상이면 쪽 구간을 공유 프로세스 풀에 나눠 맡긴다.
+    """
+    backend = resolve_backend(backend)
+    use_cache = CACHE_ENABLED if use_cache is None else use_cache
+    digest = file_sha256(path) if use_cache else ""
+    if use_cache:
+        pages = _cache_get(digest, backend)
+        if pages is not None:
+            return pages
+
+    workers = PDF_WORKERS if workers is None else workers
+    n = _COUNTERS[backend](path)
+    if workers > 1 and n >= PARALLEL_MIN_PAGES:
+        step = -(-n // (workers * 2))  # 워커당 구간 2개 정도 → 쪽마다 길이가 달라도 고르게
+        futs = [_pool().submit(_extract_range, path, backend, a, min(a + step, n)) for a in range(0, n, step)]
+        pages = [t for f in futs for t in f.result()]
+    else:
+        pages = _extract_range(path, backend, 0, n)
+
+    if use_cache:
+        _cache_put(digest, backend, pages)
+    return pages
@@ -0,0 +1,210 @@
+"""
+Day2 스트리밍 인제스트 파이프라인: 읽기 → 청크 → 배치 임베딩 + 인덱스 append.
+
+  read   : 스레드 풀(RAG_IO_WORKERS)에서 문서 단위로 읽는다. PDF는 pdf_extract가 쪽 구간을
+           공유 프로세스 풀(PDF_WORKERS)에 나눠 맡긴다. 동시에 읽는 문서 수는 워커 수의 2배로 제한.
+  chunk  : 문서 하나씩 make_chunks → RAG_INGEST_BATCH개씩 묶음
+  index  : 별도 스레드가 묶음마다 FaissStore.upsert (임베딩 + 세그먼트 1개 append)
+
+단계 사이는 크기 제한 큐(RAG_INGEST_QUEUE 묶음)라서 임베딩이 밀리면 청크/읽기가 멈춘다(backpressure).
+전체 청크를 리스트로 들고 있지 않으므로 메모리는 코퍼스 크기와 무관하다.
+
+  python -m day2.instructor.pipeline [paths ...]    # 없으면 RAG_RAW_DIR
+"""
+import os, sys, time, queue, threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Iterator, Iterable, Optional, Tuple, Callable
+
+from day2.instructor.ingest import read_document, make_chunks, collect_sources_from_folder, RAW_DIR
+
+IO_WORKERS = int(os.getenv("RAG_IO_WORKERS", "8"))
+INGEST_BATCH = int(os.getenv("RAG_INGEST_BATCH", "256"))   # upsert 1회(= 세그먼트 1개)당 청크 수
+INGEST_QUEUE = int(os.getenv("RAG_INGEST_QUEUE", "2"))     # 임베딩 대기 묶음 수 상한
+
+# ---------------- stage stats ----------------
+class StageStats:
+    """단계별 처리량: items개를 busy초 동안 처리"""
+
+    def __init__(self, name: str, unit: str):
+        self.name, self.unit = name, unit
+        self.items = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, items: int, seconds: float) -> None:
+        with self._lock:
+            self.items += items
+            self.busy += seconds
+
+    def rate(self) -> float:
+        return self.items / self.busy if self.busy > 0 else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.name} {self.items} {self.unit} in {self.busy:.2f}s ({self.rate():.1f} {self.unit}/s)"
+
+# ---------------- read ----------------
+def _read_timed(path: str) -> Tuple[str, str, Optional[List[Tuple[int, int]]], float, Optional[str]]:
+    """반환: (title, text, page_starts, 초, 오류). 읽기/파싱 실패는 빈 문서가 아니라 오류로 돌려준다."""
+    t0 = time.perf_counter()
+    try:
+        title, text, starts = read_document(path)
+        err = None
+    except Exception as e:
+        print(f"[Ingest] skip {path}: {e}")
+        title, text, starts, err = "", "", None, f"{type(e).__name__}: {e}"
+    return title, text, starts, time.perf_counter() - t0, err
+
+def iter_documents(paths: Iterable[str], ordered: bool = True,
+                   stats: Optional[StageStats] = None,
+                   on_error: Optional[Callable[[str, str], None]] = None) -> Iterator[Tuple[str, str, str, Optional[List]]]:
+    """
+    (path, title, text, page_starts)를 병렬로 읽어 흘려보낸다. 진행 중인 문서는 최대 2*IO 워커 개.
+    ordered=True면 입력 순서대로(완료가 앞서도 버퍼에서 대기), False면 완료 순서.
+    읽기에 실패한 문서는 내보내지 않고 on_error(path, 오류)로 알린다.
+    """
+    limit = 2 * IO_WORKERS
+    src = iter(enumerate(paths))
+    threads = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="ingest-io")
+    pending: Dict = {}
+    done_buf: Dict[int, Tuple] = {}
+    next_i = 0
+
+    def submit() -> bool:
+        try:
+            i, p = next(src)
+        except StopIteration:
+            return False
+        pending[threads.submit(_read_timed, p)] = (i, p)
+        return True
+
+    try:
+        while len(pending) < limit and submit():
+            pass
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                i, p = pending.pop(fut)
+                title, text, starts, sec, err = fut.result()
+                if stats is not None:
+                    stats.add(1, sec)
+                if err is not None:
+                    if on_error is not None:
+                        on_error(p, err)
+                    done_buf[i] = None  # ordered 순번은 채워 둔다
+                    continue
+                done_buf[i] = (p, title, text, starts)
+            if ordered:
+                while next_i in done_buf:
+                    doc = done_buf.pop(next_i)
+                    next_i += 1
+                    if doc is not None:
+                        yield doc
+            else:
+                for i in sorted(done_buf):
+                    doc = done_buf.pop(i)
+                    if doc is not None:
+                        yield doc
+            while len(pending) + len(done_buf) < limit and submit():
+                pass
+    finally:
+        for fut in pending:
+            fut.cancel()
+        threads.shutdown(wait=False, cancel_futures=True)
+
+# ---------------- read → chunk → index ----------------
+def iter_chunk_batches(paths: Iterable[str], chunk_size: int = 800, overlap: int = 100,
+                       kind: str = "generic", batch: int = INGEST_BATCH,
+                       read_stats: Optional[StageStats] = None,
+                       chunk_stats: Optional[StageStats] = None,
+                       on_source: Optional[Callable[[str, List[str]], None]] = None,
+                       on_error: Optional[Callable[[str, str], None]] = None) -> Iterator[List[Dict]]:
+    """
+    on_source(path, chunk_ids): 읽은 문서마다 1회 (텍스트가 비어도 [] 로 호출)
+    on_error(path, 오류): 읽기/파싱에 실패한 문서 (on_source는 부르지 않는다)
+    """
+    buf: List[Dict] = []
+    for p, title, text, starts in iter_documents(paths, ordered=False, stats=read_stats, on_error=on_error):
+        if not text:
+            if on_source is not None:
+                on_source(p, [])
+            continue
+        t0 = time.perf_counter()
+        rows = make_chunks(p, title, text, chunk_size=chunk_size, overlap=overlap, kind=kind,
+                           page_starts=starts)
+        if chunk_stats is not None:
+            chunk_stats.add(len(rows), time.perf_counter() - t0)
+        if on_source is not None:
+            on_source(p, [r["id"] for r in rows])
+        buf.extend(rows)
+        while len(buf) >= batch:
+            yield buf[:batch]
+            buf = buf[batch:]
+    if buf:
+        yield buf
+
+def ingest_to_store(paths: Optional[List[str]], store, chunk_size: int = 800, overlap: int = 100,
+                    kind: str = "generic", batch: int = INGEST_BATCH,
+                    on_source: Optional[Callable[[str, List[str]], None]] = None,
+                    on_error: Optional[Callable[[str, str], None]] = None) -> Dict:
+    """
+    paths(파일/URL)를 스트리밍으로 store에 넣는다. 임베딩/append는 별도 스레드에서 묶음 단위로.
+    on_source: 문서별 청크 id 콜백 (sources.sync_sources가 매니페스트 작성에 사용)
+    on_error: 읽기/파싱 실패 문서 콜백 (path, 오류)
+    반환: {"docs","chunks","embedded","failed","ntotal","seconds","stages": {read, chunk, index}}
+    """
+    paths = paths if paths is not None else collect_sources_from_folder(RAW_DIR)
+    read_st, chunk_st, index_st = StageStats("read", "docs"), StageStats("chunk", "chunks"), StageStats("index", "chunks")
+    q: "queue.Queue[Optional[List[Dict]]]" = queue.Queue(maxsize=max(1, INGEST_QUEUE))
+    result = {"embedded": 0, "ntotal": store.ntotal(), "error": None}
+    failed: List[str] = []
+
+    def _on_error(p: str, err: str) -> None:
+        failed.append(p)
+        if on_error is not None:
+            on_error(p, err)
+
+    def _indexer():
+        while True:
+            rows = q.get()
+            if rows is None:
+                return
+            if result["error"] is not None:
+                continue  # 실패 후에는 생산자가 막히지 않도록 비우기만 한다
+            t0 = time.perf_counter()
+            try:
+                ntotal, added = store.upsert(rows)
+                result["ntotal"] = ntotal
+                result["embedded"] += added
+            except Exception as e:
+                result["error"] = e
+            index_st.add(len(rows), time.perf_counter() - t0)
+
+    t_start = time.perf_counter()
+    worker = threading.Thread(target=_indexer, name="ingest-index", daemon=True)
+    worker.start()
+    try:
+        for rows in iter_chunk_batches(paths, chunk_size, overlap, kind, batch, read_st, chunk_st,
+                                       on_source, _on_error):
+            q.put(rows)  # 큐가 차 있으면 여기서 대기 → 읽기도 멈춤
+            if result["error"] is not None:
+                break
+    finally:
+        q.put(None)
+        worker.join()
+    if result["error"] is not None:
+        raise result["error"]
+
+    out = {
+        "docs": read_st.items, "chunks": chunk_st.items, "embedded": result["embedded"], "failed": len(failed),
+        "ntotal": result["ntotal"], "seconds": round(time.perf_counter() - t_start, 3),
+        "stages": {s.name: {"items": s.items, "busy_s": round(s.busy, 3), "per_s": round(s.rate(), 1)}
+                   for s in (read_st, chunk_st, index_st)},
+    }
+    print(f"[Pipeline] {read_st} | {chunk_st} | {index_st} | wall {out['seconds']:.2f}s")
+    return out
+
+if __name__ == "__main__":
+    from day2.instructor.rag_store import FaissStore
+    srcs = sys.argv[1:] or collect_sources_from_folder(RAW_DIR)
+    st = ingest_to_store(srcs, FaissStore.load_or_new(), kind=os.getenv("RAG_KIND", "instructor"))
+    print(f"[Pipeline] ntotal={st['ntotal']}, embedded={st['embedded']}")
@@ -1,214 +1,954 @@
 import os
 import json
+import threading
 import faiss
 import numpy as np
-from typing import List, Dict, Tuple, Optional
-from litellm import embedding
+from typing import List, Dict, Tuple, Optional, Callable
+from day2.instructor.emb_cache import cached_embed
+from day2.instructor.embedder import get_executor
+from day2.instructor.index_factory import build_index, tune, needs_raw_vectors, search_params
+from day2.instructor.filters import FieldIndex, popcount, bitmap_selector
+from day2.instructor.lexical import LexSegment, LexicalIndex
+from day2.instructor.dedup import get_dedup, signature, similarity
+from day2.instructor import rerank as rerank_mod
+from day2.instructor.meta_store import (
+    MetaSidecar, open_sidecar, write_sidecar, normalize_row, read_jsonl, write_jsonl, migrate_dir,
+    SIDECAR_NAME, JSONL_NAME,
+)
 
 # ---------------- Config ----------------
 EMB_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 DEFAULT_INDEX_DIR = os.getenv("D2_INDEX_DIR", "data/processed/day2/faiss")
-BATCH = int(os.getenv("EMBED_BATCH", "8"))
 MIN_SCORE = float(os.getenv("RAG_MIN_SCORE", "0.0"))  # 하위 유사도 컷오프 (0~1 내적값)
+RESIDENT = os.getenv("RAG_RESIDENT", "1") == "1"       # 인덱스/ids/메타를 메모리에 상주
+COMPACT_SEGMENTS = int(os.getenv("RAG_COMPACT_SEGMENTS", "16"))  # 세그먼트가 이만큼 쌓이면 compact()
+COMPACT_DEAD = float(os.getenv("RAG_COMPACT_DEAD", "0.2"))      # 죽은 벡터 비율이 이 이상이면 compact()
+COMPACT_BG = os.getenv("RAG_COMPACT_BG", "1") == "1"             # compaction을 백그라운드 스레드로
+SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "vector")  # vector | hybrid | lexical
+HYBRID_DEPTH = int(os.getenv("RAG_HYBRID_DEPTH", "50"))  # hybrid: 벡터/BM25 각각 이만큼 뽑아 RRF
+MANIFEST_NAME = "manifest.json"
 
 # ---------------- Embedding ----------------
+def _embed_api(texts: List[str]) -> List[List[float]]:
+    """토큰 예산 배치 + 동시 요청 + 429 백오프 (embedder 참조). 반환: 정규화 전 벡터"""
+    return get_executor(EMB_MODEL).embed(texts)
+
 def embed_texts(texts: List[str]) -> np.ndarray:
-    """문자열 리스트 -> L2 정규화된 float32 벡터(np.ndarray)"""
+    """문자열 리스트 -> L2 정규화된 float32 벡터(np.ndarray). (model, sha256(text)) 캐시 경유"""
     if not texts:
         return np.zeros((0, 1536), dtype="float32")
-    vecs: List[List[float]] = []
-    if BATCH > 1 and len(texts) > 1:
-        for i in range(0, len(texts), BATCH):
-            chunk = texts[i : i + BATCH]
-            try:
-                r = embedding(model=EMB_MODEL, input=chunk)
-                for obj in r["data"]:
-                    vecs.append(obj["embedding"])
-            except Exception:
-                for t in chunk:
-                    rr = embedding(model=EMB_MODEL, input=t)
-                    vecs.append(rr["data"][0]["embedding"])
-    else:
-        for t in texts:
-            r = embedding(model=EMB_MODEL, input=t)
-            vecs.append(r["data"][0]["embedding"])
-
+    vecs = cached_embed(EMB_MODEL, list(texts), _embed_api)
     X = np.array(vecs, dtype="float32")
     faiss.normalize_L2(X)  # cosine via inner product
     return X
 
+# ---------------- Fusion ----------------
+def rrf_fuse(result_lists: List[List[Dict]], k: int = 6, rrf_k: int = 60) -> List[Dict]:
+    """
+    Reciprocal-rank fusion: score(id) = Σ 1/(rrf_k + rank). 같은 id는 한 번만.
+    반환 항목의 score는 RRF 점수, 원래 점수는 score_raw(최댓값)로 보존.
+    """
+    fused: Dict[str, Dict] = {}
+    for hits in result_lists:
+        for rank, h in enumerate(hits, 1):
+            cur = fused.get(h["id"])
+            if cur is None:
+                cur = fused[h["id"]] = dict(h, score=0.0, score_raw=h.get("score", 0.0))
+            cur["score"] += 1.0 / (rrf_k + rank)
+            cur["score_raw"] = max(cur["score_raw"], h.get("score", 0.0))
+    return sorted(fused.values(), key=lambda x: x["score"], reverse=True)[:k]
+
+def _rrf_pairs(vec: List[Tuple[str, float]], lex: List[Tuple[str, float]],
+               k: int, rrf_k: int = 60) -> Tuple[List[Tuple[str, float]], Dict[str, Dict]]:
+    """벡터/BM25 (id, score) 순위 목록을 RRF로 합친다. 반환: ([(id, rrf)], id → {score_vec, score_lex})"""
+    fused: Dict[str, float] = {}
+    parts: Dict[str, Dict] = {}
+    for key, row in (("score_vec", vec), ("score_lex", lex)):
+        for rank, (cid, sc) in enumerate(row, 1):
+            fused[cid] = fused.get(cid, 0.0) + 1.0 / (rrf_k + rank)
+            parts.setdefault(cid, {})[key] = float(sc)
+    top = sorted(fused.items(), key=lambda x: x[1], reverse=True)[:k]
+    return top, parts
+
+# ---------------- Atomic file helpers ----------------
+def _fsync_replace(tmp: str, path: str) -> None:
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def _atomic_write_json(path: str, obj) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False)
+    _fsync_replace(tmp, path)
+
+def _atomic_save_npy(path: str, X: np.ndarray) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, X)
+    _fsync_replace(tmp, path)
+
+def _atomic_write_index(path: str, index: faiss.Index) -> None:
+    tmp = path + ".tmp"
+    faiss.write_index(index, tmp)
+    _fsync_replace(tmp, path)
+
+def _atomic_save_lex(path: str, seg: LexSegment) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        seg.save(f)
+    _fsync_replace(tmp, path)
+
+# ---------------- Resident snapshot ----------------
+class _Snapshot:
+    """
+    한 시점(manifest 버전)의 인덱스/ids/메타를 메모리에 들고 있는 묶음.
+    - index: base 인덱스 + 세그먼트 벡터를 add 한 결과 (앞쪽 base_n개가 base)
+    - ids:   벡터 위치(position) → id
+    - metas: [base, seg1, seg2, ...] 사이드카. 같은 id는 뒤쪽(최신)이 우선
+    - dead:  위치별 톰스톤(bool). 삭제되었거나 텍스트 변경으로 새 벡터가 추가된 위치
+    sig는 파일 (mtime_ns, size) 튜플.
+    쓰기가 만든 스냅샷(advance)은 index를 처음 쓸 때 디스크에서 읽는다(index_loader) → 쓰기는 O(새 row).
+    """
+    __slots__ = ("sig", "manifest", "_index", "_index_loader", "_index_lock", "dim", "base_n", "ids", "metas",
+                 "dead", "_pos", "_fields", "_lex", "_live_bits")
+
+    def __init__(self, sig, manifest: Dict, index, base_n: int, ids: List[str], metas: List[MetaSidecar],
+                 dead: Optional[np.ndarray] = None, dim: Optional[int] = None,
+                 index_loader: Optional[Callable[[], Optional[faiss.Index]]] = None):
+        self.sig = sig
+        self.manifest = manifest
+        self._index = index
+        self._index_loader = index_loader if index is None else None
+        self._index_lock = threading.Lock()
+        self.dim = int(index.d) if index is not None else dim
+        self.base_n = base_n
+        self.ids = ids
+        self.metas = metas
+        self.dead = dead if dead is not None else np.zeros(len(ids), dtype=bool)
+        self._live_bits: Optional[np.ndarray] = None
+        self._pos: Optional[Dict[str, int]] = None
+        self._fields: Optional[FieldIndex] = None
+        self._lex: Optional[LexicalIndex] = None
+
+    @property
+    def index(self) -> Optional[faiss.Index]:
+        if self._index_loader is not None:
+            with self._index_lock:
+                if self._index_loader is not None:
+                    self._index = self._index_loader()
+                    self._index_loader = None
+        return self._index
+
+    @property
+    def ntotal(self) -> int:
+        """벡터 위치 수 (톰스톤 포함) = len(ids)"""
+        return len(self.ids)
+
+    def advance(self, sig, manifest: Dict, side: MetaSidecar, new_ids: List[str], dead: List[int],
+                dim: Optional[int], index_loader: Callable[[], Optional[faiss.Index]]) -> "_Snapshot":
+        """세그먼트 1개가 커밋된 뒤의 스냅샷을 디스크 재로딩 없이 만든다 (ids/dead/pos만 이어 붙임)."""
+        ids = self.ids + new_ids
+        d = np.zeros(len(ids), dtype=bool)
+        d[: len(self.dead)] = self.dead
+        if dead:
+            d[np.asarray(dead, dtype=np.int64)] = True
+        snap = _Snapshot(sig, manifest, None, self.base_n, ids, self.metas + [side], d,
+                         dim=dim or self.dim, index_loader=index_loader)
+        if self._pos is not None:
+            pos = dict(self._pos)
+            for p in dead or []:
+                cid = self.ids[p]
+                if pos.get(cid) == p:
+                    del pos[cid]
+            for i, cid in enumerate(new_ids, len(self.ids)):
+                pos[cid] = i  # 텍스트가 바뀐 id는 위에서 지워져 끝에 다시 붙는다 → 위치 오름차순 유지
+            snap._pos = pos
+        return snap
+
+    @property
+    def n_dead(self) -> int:
+        return int(self.dead.sum())
+
+    @property
+    def pos(self) -> Dict[str, int]:
+        """id → 살아있는 벡터 위치 (지연 생성, 위치 오름차순)"""
+        if self._pos is None:
+            dead = self.dead
+            self._pos = {cid: i for i, cid in enumerate(self.ids) if not dead[i]}
+        return self._pos
+
+    @property
+    def live_bits(self) -> Optional[np.ndarray]:
+        """살아있는 위치의 packed 비트맵(little). 톰스톤이 없으면 None"""
+        if self._live_bits is None and self.dead.any():
+            self._live_bits = np.packbits(~self.dead, bitorder="little")
+        return self._live_bits
+
+    @property
+    def fields(self) -> FieldIndex:
+        """kind/source/date 필터 인덱스 (지연 생성, 사이드카 컬럼만 읽음)"""
+        if self._fields is None:
+            pos = self.pos
+            fi = FieldIndex(self.ntotal)
+            for side in self.metas:  # 오래된 것 → 최신 순으로 덮어쓰기
+                for r in range(len(side)):
+                    p = pos.get(side.value("id", r))
+                    if p is not None:
+                        fi.set(p, side.field("kind", r), side.field("source", r), side.field("date", r))
+            self._fields = fi
+        return self._fields
+
+    def find_meta(self, cid: str) -> Optional[Dict]:
+        """최신 메타. 삭제 표시(_deleted) row가 가장 최신이면 None"""
+        for side in reversed(self.metas):
+            m = side.get(cid)
+            if m is not None:
+                return None if m.get("_deleted") else m
+        return None
+
+    def get_meta(self, cid: str) -> Dict:
+        return self.find_meta(cid) or {"id": cid}
+
+    def orphaned_dups(self, gone: set) -> Dict[str, List[Dict]]:
+        """
+        원본이 gone에 있거나 더는 벡터가 없는 살아있는 중복(dup_of) row의 최신 메타, 원본 id별로.
+        중복 row는 벡터가 없으므로 각 사이드카의 벡터 구간 뒤쪽만 훑는다.
+        """
+        segs = self.manifest.get("segments", [])
+        counts = ([self.base_n] if len(self.metas) > len(segs) else []) + [int(s.get("n", 0)) for s in segs]
+        out: Dict[str, List[Dict]] = {}
+        seen = set()
+        for side, n in zip(self.metas, counts):
+            for r in range(n, len(side)):
+                if not side.field("dup_of", r):
+                    continue
+                cid = side.value("id", r)
+                if cid in seen or cid in gone:
+                    continue
+                seen.add(cid)
+                m = self.find_meta(cid)
+                canon = (m or {}).get("dup_of")
+                if canon and (canon in gone or canon not in self.pos):
+                    out.setdefault(canon, []).append(m)
+        return out
+
+    def live_rows(self) -> List[Dict]:
+        """살아있는 모든 row(최신 메타). 벡터 위치 순서 → 벡터 없는 메타 순."""
+        pos = self.pos
+        rows = [self.get_meta(cid) for cid in pos]
+        seen = set(pos)
+        for side in self.metas:
+            for cid in side.ids():
+                if cid in seen: continue
+                seen.add(cid)
+                m = self.find_meta(cid)
+                if m is not None:
+                    rows.append(m)
+        return rows
+
+# index_dir(절대경로) -> _Snapshot. 프로세스 안의 모든 FaissStore 인스턴스가 공유한다.
+_RESIDENT: Dict[str, _Snapshot] = {}
+_RESIDENT_LOCK = threading.Lock()
+_WRITE_LOCK = threading.Lock()
+_COMPACTING: set = set()  # 백그라운드 compaction 중인 index_dir
+
 # ---------------- Store ----------------
 class FaissStore:
     """
-    아주 단순한 로컬 FAISS 스토어.
+    아주 단순한 로컬 FAISS 스토어 (append-only 세그먼트 + 주기적 compaction).
     파일:
-      {index_dir}/faiss.index
-      {index_dir}/chunks.jsonl   # 메타 rows
-      {index_dir}/ids.json       # 벡터 순서에 대응하는 id 리스트
+      {index_dir}/manifest.json       # 커밋 지점: base + 세그먼트 목록 (os.replace로 원자적 교체)
+      {index_dir}/base-NNNNNN.index   # compaction된 base 인덱스 (RAG_INDEX: flat/ivf/hnsw/ivfpq/opq/sq8/sqfp16)
+      {index_dir}/base-NNNNNN.npy     # Flat이 아닌 base의 원본 벡터 (compaction/재학습용)
+      {index_dir}/base-NNNNNN.meta    # base 메타 사이드카(벡터 순서, meta_store 참조)
+      {index_dir}/seg-NNNNNN.npy      # upsert 1회분 신규 벡터
+      {index_dir}/seg-NNNNNN.meta     # upsert 1회분 row (벡터 있는 row가 앞쪽 n개, 삭제는 _deleted row)
+      {index_dir}/seg-NNNNNN.dead.npy # 이 세그먼트가 죽인 이전 벡터 위치(톰스톤)
+      {index_dir}/*.lex.npz           # base/세그먼트별 BM25 postings (lexical 참조)
+      {index_dir}/dedup.sqlite        # 근접 중복 MinHash 서명 (dedup 참조)
+      {index_dir}/chunks.jsonl        # import/export 전용
+    manifest.json이 없는 구버전 디렉터리는 faiss.index / ids.json / meta.bin(또는 chunks.jsonl)을
+    base로 읽고, 첫 쓰기 때 매니페스트를 만든다.
     공개 메서드:
-      upsert(chunks) -> (ntotal, n_added)
-      search(query, k) -> [{...}]
+      upsert(chunks) -> (ntotal, n_embedded)   # 텍스트가 바뀐 id는 재임베딩 + 이전 벡터 톰스톤
+                                               # 근접 중복은 임베딩 없이 dup_of 메타 row로만 기록
+      delete(ids) -> int                        # 톰스톤 기록 (검색에서 즉시 제외)
+      delete_where(where) -> int                # 예: {"date_to": "2025-01-01"} 만료 공고 정리
+      search(query, k, where, mode, rerank) -> [{...}]            # where: kind/source/date 필터
+      search_many(queries, k, dedup, where, mode, rerank) -> [[{...}], ...]   # 배치 질의
+      search_fused(queries, k, where, mode) -> [{...}]                # RRF 융합
+    mode: "vector"(기본, RAG_SEARCH_MODE) | "hybrid"(벡터+BM25 RRF) | "lexical"(BM25만, 임베딩 호출 없음)
+    rerank: RERANK_BACKEND로 켠 CPU 재정렬기가 k × RERANK_DEPTH 후보에서 k개를 다시 고른다 (rerank 참조)
       ntotal() -> int
       reset_index() -> None
       rebuild() -> int            # 메타 전체로 재빌드
+      compact() -> int            # 세그먼트를 base로 병합 + 톰스톤 제거 (재임베딩 없음)
+      compact_async() -> Thread   # 같은 작업을 백그라운드 스레드로
+    세그먼트 RAG_COMPACT_SEGMENTS개 또는 죽은 벡터 비율 RAG_COMPACT_DEAD 이상이면 자동 compaction.
+    ntotal()은 살아있는 벡터 수.
+      export_jsonl(path) -> int   # 메타 → chunks.jsonl
+    resident=True(기본, RAG_RESIDENT=1)이면 스냅샷을 한 번만 읽어 메모리에 두고,
+    매니페스트(구버전은 세 파일)의 mtime/size가 바뀔 때만 다시 읽는다.
     """
 
     # ---------- 생성/경로 ----------
-    def __init__(self, index_dir: Optional[str] = None):
+    def __init__(self, index_dir: Optional[str] = None, resident: Optional[bool] = None):
         self.dir = index_dir or DEFAULT_INDEX_DIR
+        self.resident = RESIDENT if resident is None else resident
         os.makedirs(self.dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.dir, MANIFEST_NAME)
+        self.jsonl_path = os.path.join(self.dir, JSONL_NAME)
+        # 구버전(매니페스트 이전) 파일
         self.index_path = os.path.join(self.dir, "faiss.index")
-        self.meta_path  = os.path.join(self.dir, "chunks.jsonl")
+        self.meta_path  = os.path.join(self.dir, SIDECAR_NAME)
         self.ids_path   = os.path.join(self.dir, "ids.json")
 
     @classmethod
-    def load_or_new(cls, index_dir: Optional[str] = None) -> "FaissStore":
-        return cls(index_dir=index_dir)
+    def load_or_new(cls, index_dir: Optional[str] = None, resident: Optional[bool] = None) -> "FaissStore":
+        return cls(index_dir=index_dir, resident=resident)
 
     @classmethod
-    def load(cls, index_dir: Optional[str] = None) -> "FaissStore":
-        return cls(index_dir=index_dir)
-
-    # ---------- 내부 IO ----------
-    def _load_meta(self) -> List[Dict]:
-        if not os.path.exists(self.meta_path): return []
-        with open(self.meta_path, "r", encoding="utf-8") as f:
-            return [json.loads(l) for l in f]
-
-    def _save_meta(self, items: List[Dict]) -> None:
-        with open(self.meta_path, "w", encoding="utf-8") as f:
-            for it in items:
-                f.write(json.dumps(it, ensure_ascii=False) + "\n")
-
-    def _load_ids(self) -> List[str]:
-        if not os.path.exists(self.ids_path): return []
-        with open(self.ids_path, "r", encoding="utf-8") as f:
-            return json.load(f)
+    def load(cls, index_dir: Optional[str] = None, resident: Optional[bool] = None) -> "FaissStore":
+        return cls(index_dir=index_dir, resident=resident)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.dir, name)
+
+    # ---------- 매니페스트 ----------
+    def _read_manifest(self) -> Dict:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        if not os.path.exists(self.meta_path):
+            migrate_dir(self.dir)  # 구버전 디렉터리: chunks.jsonl → meta.bin (1회)
+        ex = os.path.exists
+        return {
+            "version": 0, "next": 1, "segments": [],
+            "base": {
+                "index": "faiss.index" if ex(self.index_path) else None,
+                "ids": "ids.json" if ex(self.ids_path) else None,
+                "meta": SIDECAR_NAME if ex(self.meta_path) else None,
+            },
+        }
+
+    def _commit(self, manifest: Dict, advance: Optional[Callable[[Tuple, Dict], "_Snapshot"]] = None) -> Dict:
+        """
+        매니페스트 교체 = 커밋. 이 rename 전에 죽으면 새 파일들은 참조되지 않는 고아로 남는다.
+        advance(sig, manifest)가 있으면(세그먼트 추가) 상주 스냅샷을 디스크에서 다시 읽지 않고 이어 붙인 것으로 교체한다.
+        반환: 커밋된 매니페스트
+        """
+        manifest = dict(manifest, version=int(manifest.get("version", 0)) + 1)
+        _atomic_write_json(self.manifest_path, manifest)
+        if advance is None or not self.resident:
+            self._invalidate()
+            return manifest
+        sig = self._signature()
+        # stat 뒤에 읽은 매니페스트가 방금 쓴 것과 같아야 sig가 이 커밋의 것 (그 사이 다른 프로세스 커밋이면 재로딩)
+        if self._read_manifest() != manifest:
+            self._invalidate()
+            return manifest
+        snap = advance(sig, manifest)
+        with _RESIDENT_LOCK:
+            _RESIDENT[os.path.abspath(self.dir)] = snap
+        return manifest
+
+    def _gc(self, manifest: Dict) -> None:
+        """매니페스트가 참조하지 않는 base/세그먼트/구버전 파일 정리."""
+        keep = {n for n in (manifest.get("base") or {}).values() if n}
+        for seg in manifest.get("segments", []):
+            keep.update(n for n in (seg.get("vec"), seg.get("meta"), seg.get("lex"), seg.get("dead")) if n)
+        legacy = {"faiss.index", "ids.json", SIDECAR_NAME}
+        for name in os.listdir(self.dir):
+            ours = name.startswith(("base-", "seg-")) or name in legacy
+            if ours and name not in keep:
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+
+    # ---------- 인덱스 ----------
+    def _new_index(self, dim: int) -> faiss.Index:
+        """base 없이 세그먼트만 있을 때의 임시 인덱스. 학습형 인덱스는 compaction 때 만든다."""
+        return faiss.IndexFlatIP(dim)
+
+    def _vectors(self, snap: _Snapshot) -> Optional[np.ndarray]:
+        """모든 위치의 원본 벡터: base는 보관본(.npy) 또는 Flat 재구성, 세그먼트는 .npy"""
+        parts = []
+        base = snap.manifest.get("base") or {}
+        if snap.base_n:
+            if base.get("vec"):
+                parts.append(np.load(self._path(base["vec"]), mmap_mode="r"))
+            else:
+                parts.append(snap.index.reconstruct_n(0, snap.base_n))
+        for seg in snap.manifest.get("segments", []):
+            if seg.get("n"):
+                parts.append(np.load(self._path(seg["vec"]), mmap_mode="r"))
+        return np.ascontiguousarray(np.concatenate(parts), dtype="float32") if parts else None
+
+    def _vectors_at(self, snap: _Snapshot, positions: List[int]) -> np.ndarray:
+        """위치별 원본 벡터(정규화된 float32). base는 보관본 또는 Flat 재구성, 세그먼트는 .npy(mmap)"""
+        parts = []  # (시작 위치, 끝 위치, 배열 또는 None=인덱스 재구성)
+        base = snap.manifest.get("base") or {}
+        if snap.base_n:
+            src = np.load(self._path(base["vec"]), mmap_mode="r") if base.get("vec") else None
+            parts.append((0, snap.base_n, src))
+        off = snap.base_n
+        for seg in snap.manifest.get("segments", []):
+            n = int(seg.get("n", 0))
+            if n:
+                parts.append((off, off + n, np.load(self._path(seg["vec"]), mmap_mode="r")))
+                off += n
+        X = np.zeros((len(positions), snap.index.d if snap.index is not None else 0), dtype="float32")
+        for j, p in enumerate(positions):
+            for a, b, src in parts:
+                if a <= p < b:
+                    X[j] = src[p - a] if src is not None else snap.index.reconstruct(int(p))
+                    break
+        return X
+
+    def _lexical(self, snap: _Snapshot) -> LexicalIndex:
+        """스냅샷의 BM25 인덱스(지연 생성). .lex.npz가 없는 구버전 base/세그먼트는 메타 텍스트로 메모리에서 만든다."""
+        if snap._lex is not None:
+            return snap._lex
+        parts: List[Tuple[int, LexSegment]] = []
+        base = snap.manifest.get("base") or {}
+        if snap.base_n:
+            if base.get("lex"):
+                parts.append((0, LexSegment.load(self._path(base["lex"]))))
+            else:
+                side = snap.metas[0] if base.get("meta") else None
+                texts = []
+                for cid in snap.ids[: snap.base_n]:
+                    r = side.find(cid) if side is not None else None
+                    texts.append(side.value("text", r) if r is not None else "")
+                parts.append((0, LexSegment.build(texts)))
+        start = snap.base_n
+        metas = snap.metas[1:] if base.get("meta") else snap.metas
+        for seg, side in zip(snap.manifest.get("segments", []), metas):
+            n = int(seg.get("n", 0))
+            if not n:
+                continue
+            if seg.get("lex"):
+                parts.append((start, LexSegment.load(self._path(seg["lex"]))))
+            else:
+                parts.append((start, LexSegment.build([side.value("text", r) for r in range(n)])))
+            start += n
+        snap._lex = LexicalIndex(parts, snap.ntotal)
+        return snap._lex
+
+    # ---------- 상주 스냅샷 ----------
+    def _signature(self) -> Tuple:
+        paths = (self.manifest_path,) if os.path.exists(self.manifest_path) \
+            else (self.index_path, self.meta_path, self.ids_path)
+        sig = []
+        for p in paths:
+            try:
+                st = os.stat(p)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _load_snapshot(self, sig: Tuple) -> _Snapshot:
+        try:
+            return self._load_snapshot_once(sig)
+        except FileNotFoundError:
+            # 다른 프로세스의 compaction이 읽는 도중 파일을 치웠다 → 새 매니페스트로 재시도
+            return self._load_snapshot_once(self._signature())
+
+    def _load_index(self, man: Dict) -> Tuple[Optional[faiss.Index], int]:
+        """매니페스트의 base 인덱스 + 세그먼트 벡터. 반환: (인덱스, base 벡터 수)"""
+        base = man.get("base") or {}
+        index = tune(faiss.read_index(self._path(base["index"]))) if base.get("index") else None
+        base_n = int(index.ntotal) if index is not None else 0
+        for seg in man.get("segments", []):
+            if int(seg.get("n", 0)):
+                X = np.ascontiguousarray(np.load(self._path(seg["vec"])), dtype="float32")
+                if index is None:
+                    index = self._new_index(X.shape[1])
+                index.add(X)
+        return index, base_n
+
+    def _load_snapshot_once(self, sig: Tuple) -> _Snapshot:
+        man = self._read_manifest()
+        base = man.get("base") or {}
+        index, base_n = self._load_index(man)
+        metas: List[MetaSidecar] = []
+        base_meta = open_sidecar(self._path(base["meta"])) if base.get("meta") else None
+        if base_meta is not None:
+            metas.append(base_meta)
+        if base.get("ids"):
+            with open(self._path(base["ids"]), "r", encoding="utf-8") as f:
+                ids = json.load(f)
+        elif base_meta is not None and base_n:
+            ids = [base_meta.value("id", r) for r in range(base_n)]
+        else:
+            ids = []
+
+        for seg in man.get("segments", []):
+            side = MetaSidecar(self._path(seg["meta"]))
+            ids.extend(side.value("id", r) for r in range(int(seg.get("n", 0))))
+            metas.append(side)
+        dead = np.zeros(len(ids), dtype=bool)
+        for seg in man.get("segments", []):
+            if seg.get("dead"):
+                dead[np.load(self._path(seg["dead"]))] = True
+        return _Snapshot(sig, man, index, base_n, ids, metas, dead)
+
+    def _snapshot(self, with_index: bool = True) -> _Snapshot:
+        """
+        resident면 캐시된 스냅샷(매니페스트가 바뀌었을 때만 재로딩), 아니면 매번 디스크에서 읽는다.
+        with_index=False(쓰기 경로)면 쓰기가 이어 붙인 스냅샷의 인덱스를 읽지 않는다.
+        """
+        if not self.resident:
+            return self._load_snapshot(None)
+        key = os.path.abspath(self.dir)
+        sig = self._signature()
+        with _RESIDENT_LOCK:
+            snap = _RESIDENT.get(key)
+            if snap is None or snap.sig != sig:
+                snap = self._load_snapshot(sig)
+                _RESIDENT[key] = snap
+        if with_index:
+            try:
+                snap.index
+            except FileNotFoundError:
+                # 다른 프로세스의 compaction이 세그먼트를 치웠다 → 새 매니페스트로 전부 다시 읽기
+                self._invalidate()
+                return self._snapshot()
+        return snap
 
-    def _save_ids(self, ids: List[str]) -> None:
-        with open(self.ids_path, "w", encoding="utf-8") as f:
-            json.dump(ids, f, ensure_ascii=False, indent=2)
+    def _invalidate(self) -> None:
+        with _RESIDENT_LOCK:
+            _RESIDENT.pop(os.path.abspath(self.dir), None)
 
-    def _read_index(self) -> Optional[faiss.Index]:
-        if not os.path.exists(self.index_path): return None
-        return faiss.read_index(self.index_path)
+    def _load_meta(self) -> List[Dict]:
+        return self._snapshot().live_rows()
 
-    def _write_index(self, index: faiss.Index) -> None:
-        faiss.write_index(index, self.index_path)
+    # ---------- 쓰기: base / 세그먼트 ----------
+    def _write_base(self, rows: List[Dict], manifest: Dict,
+                    X: Optional[np.ndarray] = None, embed: bool = True) -> int:
+        """
+        rows(벡터 순서) 전체로 새 base 세대를 쓰고 세그먼트를 비운다.
+        X가 없고 embed=True면 rows 텍스트를 임베딩, embed=False면 메타만 보존(인덱스 없음).
+        반환: ntotal
+        """
+        gen = int(manifest.get("next", 1))
+        if X is None and embed and rows:
+            rows = [c for c in rows if not c.get("dup_of")] + [c for c in rows if c.get("dup_of")]
+            X = embed_texts([c.get("text", "") for c in rows if not c.get("dup_of")])
+        base = {"index": None, "ids": None, "vec": None, "meta": f"base-{gen:06d}.meta", "lex": None}
+        ntotal = 0
+        if X is not None and len(X):
+            index = build_index(X)
+            ntotal = int(index.ntotal)
+            base["index"] = f"base-{gen:06d}.index"
+            _atomic_write_index(self._path(base["index"]), index)
+            if needs_raw_vectors(index):
+                base["vec"] = f"base-{gen:06d}.npy"
+                _atomic_save_npy(self._path(base["vec"]), X)
+            base["lex"] = f"base-{gen:06d}.lex.npz"
+            _atomic_save_lex(self._path(base["lex"]), LexSegment.build([c.get("text", "") for c in rows[:ntotal]]))
+        write_sidecar(self._path(base["meta"]), rows)
+        man = {"version": manifest.get("version", 0), "next": gen + 1, "base": base, "segments": []}
+        self._commit(man)
+        self._gc(man)
+        return ntotal
+
+    def _append_segment(self, rows: List[Dict], X: Optional[np.ndarray], manifest: Dict,
+                        dead: Optional[List[int]] = None, snap: Optional[_Snapshot] = None) -> Dict:
+        """
+        rows 앞쪽 len(X)개가 X에 대응. 새 파일만 쓰고 매니페스트에 세그먼트 1개 추가.
+        dead: 이 세그먼트로 대체/삭제되는 기존 벡터 위치
+        snap: manifest를 읽은 스냅샷. 주면 커밋 후 상주 스냅샷을 재로딩 대신 이어 붙여 갱신한다.
+        """
+        name = f"seg-{int(manifest.get('next', 1)):06d}"
+        n = 0 if X is None else int(len(X))
+        seg = {"vec": None, "meta": name + ".meta", "n": n}
+        if dead:
+            seg["dead"] = name + ".dead.npy"
+            _atomic_save_npy(self._path(seg["dead"]), np.array(sorted(dead), dtype="int64"))
+        if n:
+            seg["vec"] = name + ".npy"
+            seg["lex"] = name + ".lex.npz"
+            _atomic_save_npy(self._path(seg["vec"]), X)
+            _atomic_save_lex(self._path(seg["lex"]), LexSegment.build([c.get("text", "") for c in rows[:n]]))
+        write_sidecar(self._path(seg["meta"]), rows)
+        man = dict(manifest, next=int(manifest.get("next", 1)) + 1,
+                   segments=list(manifest.get("segments", [])) + [seg])
+        advance = None
+        if snap is not None:
+            new_ids = [c["id"] for c in rows[:n]]
+            dim = int(X.shape[1]) if n else None
+            advance = lambda sig, committed: snap.advance(
+                sig, committed, MetaSidecar(self._path(seg["meta"])), new_ids, dead or [], dim,
+                lambda: self._load_index(committed)[0])
+        return self._commit(man, advance)
 
     # ---------- 빌드/리셋 ----------
-    def _build_index_from_meta(self, meta: List[Dict]) -> Tuple[faiss.Index, List[str]]:
-        texts = [c.get("text", "") for c in meta]
-        if not texts:
-            dim = 1536  # 기본 차원(placeholder)
-            return faiss.IndexFlatIP(dim), []
-        X = embed_texts(texts)
-        index = faiss.IndexFlatIP(X.shape[1])
-        index.add(X)
-        ids_order = [c["id"] for c in meta]
-        return index, ids_order
-
     def reset_index(self) -> None:
-        """faiss.index/ids.json만 삭제 (메타는 보존)."""
-        if os.path.exists(self.index_path): os.remove(self.index_path)
-        if os.path.exists(self.ids_path): os.remove(self.ids_path)
+        """인덱스/세그먼트 벡터만 삭제 (메타는 보존)."""
+        with _WRITE_LOCK:
+            snap = self._snapshot(with_index=False)
+            self._write_base(snap.live_rows(), snap.manifest, embed=False)
 
     def rebuild(self) -> int:
-        """메타(chunks.jsonl) 전체로 인덱스 재생성. 반환: ntotal"""
-        meta = self._load_meta()
-        index, ids_order = self._build_index_from_meta(meta)
-        self._write_index(index); self._save_ids(ids_order)
-        return index.ntotal
+        """메타 전체로 인덱스 재생성. 반환: ntotal"""
+        with _WRITE_LOCK:
+            snap = self._snapshot(with_index=False)
+            return self._write_base(snap.live_rows(), snap.manifest)
+
+    def compact(self) -> int:
+        """
+        세그먼트를 base 한 세대로 병합(원본 벡터 재사용, 재임베딩 없음). 반환: ntotal
+        톰스톤 위치와 삭제 row는 버린다. 현재 RAG_INDEX 설정으로 인덱스를 다시 만들므로,
+        인덱스 종류 변경에도 쓴다.
+        """
+        with _WRITE_LOCK:
+            snap = self._snapshot(with_index=False)
+            X = self._vectors(snap)
+            if X is not None and snap.n_dead:
+                X = X[np.flatnonzero(~snap.dead)]  # live_rows()의 벡터 순서와 같다
+            return self._write_base(snap.live_rows(), snap.manifest, X=X, embed=False)
+
+    def compact_async(self) -> Optional[threading.Thread]:
+        """compact()를 백그라운드 스레드로. 같은 디렉터리에서 이미 도는 중이면 None"""
+        key = os.path.abspath(self.dir)
+        with _RESIDENT_LOCK:
+            if key in _COMPACTING:
+                return None
+            _COMPACTING.add(key)
+
+        def _run():
+            try:
+                n = self.compact()
+                print(f"[FaissStore] compacted {self.dir}: ntotal={n}")
+            except Exception as e:
+                print(f"[FaissStore] compaction failed: {e}")
+            finally:
+                with _RESIDENT_LOCK:
+                    _COMPACTING.discard(key)
+
+        # daemon=False: 프로세스 종료 전에 커밋까지 마친다
+        t = threading.Thread(target=_run, name="faiss-compact", daemon=False)
+        t.start()
+        return t
+
+    def _maybe_compact(self, man: Dict, n_dead: int, n_pos: int) -> None:
+        many_segs = len(man.get("segments", [])) >= COMPACT_SEGMENTS
+        many_dead = n_pos > 0 and n_dead / n_pos >= COMPACT_DEAD
+        if many_segs or many_dead:
+            if COMPACT_BG:
+                self.compact_async()
+            else:
+                self.compact()
 
     # ---------- upsert ----------
     def upsert(self, chunks: List[Dict]) -> Tuple[int, int]:
-        if not chunks:
-            index = self._read_index()
-            return (index.ntotal if index is not None else 0, 0)
-
-        # 1) 메타 병합
-        old_meta_by_id = {c["id"]: c for c in self._load_meta()}
-        for c in chunks:
-            old_meta_by_id[c["id"]] = c
-        merged = list(old_meta_by_id.values())
-        self._save_meta(merged)
-
-        index = self._read_index()
-        ids_order = self._load_ids()
-
-        # 2) 처음 생성
-        if index is None:
-            index, ids_order = self._build_index_from_meta(merged)
-            self._write_index(index); self._save_ids(ids_order)
-            return index.ntotal, len(ids_order)
-
-        # 3) 신규만 추가
-        known = set(ids_order)
-        new_items = [c for c in merged if c["id"] not in known]
-        if not new_items:
-            self._write_index(index); self._save_ids(ids_order)
-            return index.ntotal, 0
-
-        Xnew = embed_texts([c["text"] for c in new_items])
-
-        # 4) 차원 불일치 → 전체 재빌드
-        if Xnew.shape[1] != index.d:
-            index, ids_order = self._build_index_from_meta(merged)
-            self._write_index(index); self._save_ids(ids_order)
-            return index.ntotal, len(merged) - len(known)
-
-        # 5) 증분 추가
-        index.add(Xnew)
-        ids_order.extend([c["id"] for c in new_items])
-        self._write_index(index); self._save_ids(ids_order)
-        return index.ntotal, len(new_items)
+        """
+        append-only: 신규 id와 텍스트가 바뀐 id의 벡터, 변경된 메타만 새 세그먼트로 기록한다.
+        텍스트가 바뀐 id의 이전 벡터 위치는 톰스톤으로 표시(검색 제외, compaction 때 제거).
+        반환: (살아있는 벡터 수, 이번에 임베딩한 수)
+        """
+        with _WRITE_LOCK:
+            snap = self._snapshot(with_index=False)
+            if not chunks:
+                return (len(snap.pos), 0)
+
+            incoming: Dict[str, Dict] = {}
+            for c in chunks:
+                incoming[c["id"]] = c
+
+            dd = get_dedup(self.dir)
+
+            # 1) 처음 생성 (또는 reset_index 이후): 메타 전체로 base 빌드
+            if not snap.ids:
+                merged = {c["id"]: c for c in snap.live_rows()}
+                merged.update(incoming)
+                rows = list(merged.values())
+                if dd is not None:
+                    dd.clear()
+                    plain = [{k: v for k, v in c.items() if k not in ("dup_of", "dup_score")} for c in rows]
+                    keep, dups = dd.filter(plain, lambda cid: False)
+                    rows = keep + dups
+                ntotal = self._write_base(rows, snap.manifest)
+                return ntotal, ntotal
+
+            # 2) 신규 id / 텍스트 변경 id / 메타만 바뀐 id 분리 (동일하면 기록 안 함)
+            fresh: List[Dict] = []
+            touched: List[Dict] = []
+            dead: List[int] = []
+            for cid, c in incoming.items():
+                p = snap.pos.get(cid)
+                if p is None:
+                    old = snap.find_meta(cid)
+                    canon = (old or {}).get("dup_of")
+                    if canon in snap.pos and (old.get("text") or "") == (c.get("text") or ""):
+                        # 이미 중복으로 기록된 청크: 원본이 살아있고 텍스트가 같으면 그대로
+                        c = dict(c, dup_of=canon, dup_score=old.get("dup_score"))
+                        if old != normalize_row(c):
+                            touched.append(c)
+                        continue
+                    fresh.append(c)
+                    continue
+                old = snap.find_meta(cid)
+                if old is None or (old.get("text") or "") != (c.get("text") or ""):
+                    fresh.append(c)
+                    dead.append(p)
+                elif old != normalize_row(c):  # 사이드카 왕복 모양으로 비교 (None/빈 값 차이는 변경 아님)
+                    touched.append(c)
+            # 근접 중복 → 임베딩 없이 메타 row로
+            if dd is not None and fresh:
+                if dd.count() == 0 and snap.pos:
+                    dd.backfill((cid, snap.get_meta(cid).get("text", "")) for cid in snap.pos)
+                changing = {c["id"] for c in fresh}
+                fresh, dups = dd.filter(fresh, lambda cid: cid in snap.pos and cid not in changing)
+                touched.extend(dups)
+            if not fresh and not touched and not dead:
+                return len(snap.pos), 0
+
+            Xnew = embed_texts([c["text"] for c in fresh]) if fresh else None
+
+            # 3) 차원 불일치 → 전체 재빌드
+            if Xnew is not None and Xnew.shape[1] != snap.dim:
+                merged = {c["id"]: c for c in snap.live_rows()}
+                merged.update(incoming)
+                ntotal = self._write_base(list(merged.values()), snap.manifest)
+                return ntotal, ntotal
+
+            # 4) 세그먼트 추가
+            man = self._append_segment(fresh + touched, Xnew, snap.manifest, dead=dead, snap=snap)
+        n_pos = snap.ntotal + len(fresh)
+        self._maybe_compact(man, snap.n_dead + len(dead), n_pos)
+        return len(snap.pos) + len(fresh) - len(dead), len(fresh)
+
+    # ---------- delete ----------
+    def delete(self, ids: List[str]) -> int:
+        """
+        id들을 삭제: 삭제 row(_deleted) + 벡터 위치 톰스톤을 세그먼트 1개로 기록한다.
+        검색/ntotal에서는 즉시 빠지고, 파일에서는 compaction 때 사라진다. 반환: 삭제된 id 수
+        삭제되는 원본의 중복(dup_of) row가 살아있으면 원본별로 하나를 임베딩해 새 원본으로 올리고
+        나머지 중복은 그쪽을 가리키게 한다 (같은 세그먼트에 기록).
+        """
+        with _WRITE_LOCK:
+            snap = self._snapshot(with_index=False)
+            gone = [cid for cid in dict.fromkeys(ids) if snap.find_meta(cid) is not None]
+            if not gone:
+                return 0
+            dead = [snap.pos[cid] for cid in gone if cid in snap.pos]
+            promoted: List[Dict] = []
+            repointed: List[Dict] = []
+            for dups in snap.orphaned_dups(set(gone)).values():
+                head = {k: v for k, v in dups[0].items() if k not in ("dup_of", "dup_score")}
+                promoted.append(head)
+                hsig = signature(head.get("text", ""))
+                repointed.extend(dict(c, dup_of=head["id"], dup_score=round(similarity(hsig, signature(c.get("text", ""))), 3))
+                                 for c in dups[1:])
+            dd = get_dedup(self.dir)
+            if dd is not None:
+                dd.remove(gone)
+                if promoted:
+                    dd.backfill((c["id"], c.get("text", "")) for c in promoted)
+            X = embed_texts([c.get("text", "") for c in promoted]) if promoted else None
+            removed = [{"id": cid, "_deleted": 1} for cid in gone]
+            if X is not None and snap.dim is not None and X.shape[1] != snap.dim:
+                # 다른 차원(모델)의 인덱스 → 전체 재빌드
+                merged = {c["id"]: c for c in snap.live_rows() if c["id"] not in gone}
+                merged.update({c["id"]: c for c in promoted + repointed})
+                self._write_base(list(merged.values()), snap.manifest)
+                return len(gone)
+            if promoted:
+                print(f"[FaissStore] promoted {len(promoted)} duplicate(s) of deleted chunks")
+            man = self._append_segment(promoted + repointed + removed, X,
+                                       snap.manifest, dead=dead, snap=snap)
+        self._maybe_compact(man, snap.n_dead + len(dead), snap.ntotal + len(promoted))
+        return len(gone)
+
+    def delete_where(self, where: Dict) -> int:
+        """where 조건(filters 참조)에 맞는 벡터를 모두 삭제. 예: 마감 지난 공고 정리"""
+        snap = self._snapshot()
+        if not snap.ntotal:
+            return 0
+        mask = np.unpackbits(snap.fields.select(where, live=snap.live_bits),
+                             count=snap.ntotal, bitorder="little").astype(bool)
+        return self.delete([snap.ids[p] for p in np.flatnonzero(mask)])
 
     # ---------- search ----------
-    def search(self, query: str, k: int = 6) -> List[Dict]:
+    @staticmethod
+    def _hit(cid: str, score: float, m: Dict) -> Dict:
+        title = (m.get("title", "") or "")[:140]
+        text = m.get("text", "") or ""
+        return {
+            "id": cid,
+            "title": title,
+            "url": m.get("source", ""),
+            "source": m.get("source", ""),
+            "summary": text[:300],
+            "text": text,
+            "page": m.get("page", 1),
+            "kind": m.get("kind", ""),
+            "score": float(score),
+        }
+
+    def search(self, query: str, k: int = 6, where: Optional[Dict] = None,
+               mode: Optional[str] = None, rerank: Optional[bool] = None) -> List[Dict]:
         """
         표준 반환 스키마:
         [{id,title,url,source,summary,text,page,kind,score}, ...]
+        where: {"kind", "source", "date_from", "date_to"} 메타 필터 (filters 참조)
+        mode="hybrid"면 score는 RRF 점수이고 score_vec/score_lex가 붙는다.
+        재정렬기가 켜져 있으면(RERANK_BACKEND, rerank 참조) score_rerank 순서다.
         """
-        index = self._read_index()
-        if index is None or index.ntotal == 0:
-            return []
+        return self.search_many([query], k=k, where=where, mode=mode, rerank=rerank)[0]
 
-        Q = embed_texts([query])
-        kk = min(max(1, k), index.ntotal)
-        D, I = index.search(Q, kk)
-        idxs, scores = I[0].tolist(), D[0].tolist()
+    def search_many(self, queries: List[str], k: int = 6, dedup: bool = False,
+                    where: Optional[Dict] = None, mode: Optional[str] = None,
+                    rerank: Optional[bool] = None) -> List[List[Dict]]:
+        """
+        여러 질의를 한 번에: 임베딩 1배치 + index.search 1회(행렬) + 메타는 id당 1회만 해석.
+        dedup=True면 같은 id는 점수가 가장 높은 질의의 결과에만 남긴다.
+        where가 있으면 조건 비트맵을 IDSelector로 FAISS 검색 안에 넣는다(과다 조회 없음).
+        mode: vector | hybrid | lexical (기본 RAG_SEARCH_MODE). hybrid는 벡터/BM25 각각
+        RAG_HYBRID_DEPTH개를 같은 필터로 뽑아 RRF로 합친다.
+        rerank: None이면 설정된 재정렬기("rag")가 있을 때 사용, False면 끔. 켜지면 k × RERANK_DEPTH개를
+        후보로 뽑아 재정렬 후 k개만 돌려준다.
+        반환: 질의 순서대로 표준 스키마 리스트
+        """
+        mode = (mode or SEARCH_MODE).lower()
+        if mode not in ("vector", "hybrid", "lexical"):
+            raise ValueError(f"unknown search mode: {mode}")
+        if not queries:
+            return []
+        snap = self._snapshot()
+        index = snap.index
+        if snap.ntotal == 0:
+            return [[] for _ in queries]
+
+        params, n_ok = None, index.ntotal
+        bits = snap.fields.select(where, live=snap.live_bits) if where else snap.live_bits
+        if bits is not None:
+            n_ok = popcount(bits)
+            if n_ok == 0:
+                return [[] for _ in queries]
+            params = search_params(index, bitmap_selector(index.ntotal, bits))
+
+        rr = rerank_mod.get_reranker("rag") if rerank is not False else None
+        k_out = max(1, k)
+        kk = min(k_out * rerank_mod.DEPTH if rr is not None else k_out, n_ok)
+        depth = kk if mode == "vector" else min(max(kk, HYBRID_DEPTH), n_ok)
+        ids_order = snap.ids
+
+        vec_rows: List[List[Tuple[str, float]]] = []
+        if mode != "lexical":
+            Q = embed_texts(list(queries))
+            D, I = index.search(Q, depth, params=params) if params is not None else index.search(Q, depth)
+            for idxs, scores in zip(I.tolist(), D.tolist()):
+                row = []
+                for ii, sc in zip(idxs, scores):
+                    if ii < 0 or ii >= len(ids_order):
+                        continue
+                    if sc < MIN_SCORE:
+                        continue
+                    row.append((ids_order[ii], sc))
+                vec_rows.append(row)
+
+        lex_rows: List[List[Tuple[str, float]]] = []
+        if mode != "vector":
+            lex = self._lexical(snap)
+            allowed = None
+            if bits is not None:
+                allowed = np.unpackbits(bits, count=snap.ntotal, bitorder="little").astype(bool)
+            for q in queries:
+                lex_rows.append([(ids_order[p], sc) for p, sc in lex.search(q, depth, allowed)])
+
+        parts: List[Dict[str, Dict]] = [{} for _ in queries]
+        if mode == "vector":
+            rows = vec_rows
+        elif mode == "lexical":
+            rows = [row[:kk] for row in lex_rows]
+        else:
+            rows = []
+            for qi, (v, l) in enumerate(zip(vec_rows, lex_rows)):
+                top, parts[qi] = _rrf_pairs(v, l, kk)
+                rows.append(top)
+
+        if dedup:
+            best: Dict[str, Tuple[float, int]] = {}
+            for qi, row in enumerate(rows):
+                for cid, sc in row:
+                    if cid not in best or sc > best[cid][0]:
+                        best[cid] = (sc, qi)
+            rows = [[(cid, sc) for cid, sc in row if best[cid][1] == qi] for qi, row in enumerate(rows)]
+
+        metas: Dict[str, Dict] = {}
+        out: List[List[Dict]] = []
+        for qi, row in enumerate(rows):
+            hits = []
+            for cid, sc in row:
+                if cid not in metas:
+                    metas[cid] = snap.get_meta(cid)
+                h = self._hit(cid, sc, metas[cid])
+                if mode == "hybrid":
+                    h.update(score_vec=0.0, score_lex=0.0)
+                    h.update(parts[qi].get(cid, {}))
+                hits.append(h)
+            out.append(hits)
+        if rr is not None:
+            out = [rr.rerank(q, hits, k_out) for q, hits in zip(queries, out)]
+        return out
 
-        meta_list = self._load_meta()
-        ids_order = self._load_ids()
-        meta_by_id = {c["id"]: c for c in meta_list}
+    def search_fused(self, queries: List[str], k: int = 6, rrf_k: int = 60,
+                     where: Optional[Dict] = None, mode: Optional[str] = None) -> List[Dict]:
+        """search_many 결과를 reciprocal-rank fusion으로 하나의 top-k로 합친다."""
+        return rrf_fuse(self.search_many(queries, k=k, where=where, mode=mode), k=k, rrf_k=rrf_k)
 
-        out: List[Dict] = []
-        for ii, sc in zip(idxs, scores):
-            if ii < 0 or ii >= len(ids_order):
+    def get_vectors(self, ids: List[str], texts: Optional[Dict[str, str]] = None) -> Dict[str, np.ndarray]:
+        """
+        살아있는 id의 저장된 벡터(정규화됨) → 다시 임베딩하지 않고 재사용할 때.
+        texts(id → 기대 텍스트)를 주면 저장된 메타 텍스트가 같은 것만 돌려준다.
+        """
+        snap = self._snapshot()
+        if snap.index is None:
+            return {}
+        pos = snap.pos
+        want = []
+        for cid in dict.fromkeys(ids):
+            p = pos.get(cid)
+            if p is None:
                 continue
-            if sc < MIN_SCORE:
+            if texts is not None and (snap.find_meta(cid) or {}).get("text") != texts.get(cid):
                 continue
-            cid = ids_order[ii]
-            m = meta_by_id.get(cid, {"id": cid})
-            title = (m.get("title", "") or "")[:140]
-            text = m.get("text", "") or ""
-            out.append({
-                "id": cid,
-                "title": title,
-                "url": m.get("source", ""),
-                "source": m.get("source", ""),
-                "summary": text[:300],
-                "text": text,
-                "page": m.get("page", 1),
-                "kind": m.get("kind", ""),
-                "score": float(sc),
-            })
-        return out
+            want.append((cid, p))
+        if not want:
+            return {}
+        X = self._vectors_at(snap, [p for _, p in want])
+        return {cid: X[j] for j, (cid, _) in enumerate(want)}
+
+    # ---------- import/export ----------
+    def export_jsonl(self, path: Optional[str] = None) -> int:
+        """메타 전체를 chunks.jsonl 포맷으로 내보낸다. 반환: row 수"""
+        rows = self._load_meta()
+        write_jsonl(path or self.jsonl_path, rows)
+        return len(rows)
+
+    def import_jsonl(self, path: Optional[str] = None) -> Tuple[int, int]:
+        """chunks.jsonl 포맷을 읽어 upsert."""
+        return self.upsert(read_jsonl(path or self.jsonl_path))
 
     # ---------- info & aliases ----------
+    def ids_by_source(self, kind: Optional[str] = None) -> Dict[str, List[str]]:
+        """source 메타별 살아있는 청크 id (kind를 주면 그 kind만). 중복(dup_of) row 포함"""
+        out: Dict[str, List[str]] = {}
+        for m in self._snapshot(with_index=False).live_rows():
+            if kind is None or m.get("kind") == kind:
+                out.setdefault(m.get("source") or "", []).append(m["id"])
+        out.pop("", None)
+        return out
+
     def ntotal(self) -> int:
-        idx = self._read_index()
-        return int(idx.ntotal) if idx is not None else 0
+        """살아있는(검색 대상) 벡터 수"""
+        return len(self._snapshot().pos)
 
     def query(self, query: str, k: int = 6) -> List[Dict]:
         return self.search(query, k=k)
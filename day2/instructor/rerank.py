@@ -0,0 +1,233 @@
+"""
+CPU 재정렬(rerank) 단계: 1차 검색/랭킹이 넉넉히 뽑은 후보를 다시 점수 매겨 상위 k개만 넘긴다.
+
+  RERANK_BACKEND   none(기본) | auto | logistic | onnx
+                   auto = RERANK_ONNX_DIR의 cross-encoder(onnxruntime 설치 시) → 학습된 로지스틱 가중치 → 없음
+  RERANK_ONNX_DIR  cross-encoder 디렉터리: model.onnx + tokenizer.json (예: ms-marco-MiniLM-L-6-v2 ONNX 내보내기)
+  RERANK_MODEL_DIR 로지스틱 가중치 디렉터리 (기본 data/models/rerank, 종류별 {kind}.json)
+  RERANK_BATCH     배치당 후보 수 (기본 32)
+  RERANK_BUDGET_MS 질의당 지연 예산 (기본 250ms). 다음 배치가 예산을 넘길 것 같으면 멈추고,
+                   점수를 못 매긴 후보는 1차 순서 그대로 뒤에 붙인다
+  RERANK_DEPTH     k의 몇 배를 후보로 가져올지 (기본 4)
+
+종류(kind): "rag" = FaissStore.search 결과, "notice" = day3 rank_notices 후보.
+로지스틱 모델은 기존 점수 특징(score_vec/score_lex, score_deadline/score_sim/score_kw …)과
+질의 토큰 겹침으로 학습한다:  python -m day2.instructor.rerank train labels.jsonl --kind rag
+  labels.jsonl 한 줄 = {"query": ..., "label": 0|1, 후보 필드(title, text, score_* …)}
+"""
+import os, abc, json, math, time, argparse, threading, importlib.util
+from typing import List, Dict, Optional
+import numpy as np
+from day2.instructor.lexical import tokenize
+
+RERANK_BACKEND = os.getenv("RERANK_BACKEND", "none")
+ONNX_DIR = os.getenv("RERANK_ONNX_DIR", "")
+MODEL_DIR = os.getenv("RERANK_MODEL_DIR", "data/models/rerank")
+BATCH = int(os.getenv("RERANK_BATCH", "32"))
+BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "250"))
+DEPTH = int(os.getenv("RERANK_DEPTH", "4"))
+MAX_LEN = int(os.getenv("RERANK_MAX_LEN", "256"))
+THREADS = int(os.getenv("RERANK_THREADS", str(min(4, os.cpu_count() or 1))))
+
+# 종류별 기본 특징. 학습된 모델 파일의 "features"가 우선한다.
+FEATURES = {
+    "rag": ["score", "score_vec", "score_lex", "q_title", "q_text", "log_len"],
+    "notice": ["score_deadline", "score_sim", "score_kw", "q_title", "q_text", "has_attach"],
+}
+
+def _doc_text(c: Dict) -> str:
+    return c.get("text") or c.get("summary") or c.get("snippet") or ""
+
+def _features(query: str, cands: List[Dict], names: List[str]) -> np.ndarray:
+    """후보 → 특징 행렬. q_title/q_text = 질의 토큰 중 제목/본문에 있는 비율, log_len = log(1 + 본문 길이)"""
+    qt = set(tokenize(query))
+    X = np.zeros((len(cands), len(names)), dtype="float32")
+    for i, c in enumerate(cands):
+        derived = {}
+        if qt:
+            derived["q_title"] = len(qt & set(tokenize(c.get("title", "")))) / len(qt)
+            derived["q_text"] = len(qt & set(tokenize(_doc_text(c)))) / len(qt)
+        derived["log_len"] = math.log1p(len(_doc_text(c)))
+        for j, f in enumerate(names):
+            v = derived.get(f, c.get(f))
+            X[i, j] = float(v) if v is not None else 0.0
+    return X
+
+# ---------------- rerankers ----------------
+class Reranker(abc.ABC):
+    """score(query, cands) → 배열(클수록 관련)만 구현하면 배치·지연 예산 처리는 rerank()가 한다."""
+    name = "base"
+
+    def __init__(self, batch: int = BATCH, budget_ms: float = BUDGET_MS):
+        self.batch = max(1, batch)
+        self.budget_ms = budget_ms
+
+    @abc.abstractmethod
+    def score(self, query: str, cands: List[Dict]) -> np.ndarray:
+        ...
+
+    def rerank(self, query: str, cands: List[Dict], k: Optional[int] = None,
+               budget_ms: Optional[float] = None) -> List[Dict]:
+        """
+        cands는 1차 순서. 앞에서부터 배치로 점수를 매기고(첫 배치는 항상), 직전 배치만큼 더 걸리면
+        예산을 넘길 때 멈춘다. 반환: score_rerank가 붙은 재정렬 구간 + 나머지(1차 순서) 중 앞 k개
+        """
+        budget = (self.budget_ms if budget_ms is None else budget_ms) / 1000.0
+        t0 = time.perf_counter()
+        scores: List[np.ndarray] = []
+        done, last = 0, 0.0
+        while done < len(cands):
+            if done and time.perf_counter() - t0 + last > budget:
+                break
+            tb = time.perf_counter()
+            part = cands[done : done + self.batch]
+            scores.append(np.asarray(self.score(query, part), dtype="float32").reshape(-1))
+            last = time.perf_counter() - tb
+            done += len(part)
+        if done < len(cands):
+            print(f"[RERANK] {self.name}: budget {budget * 1000:.0f}ms → scored {done}/{len(cands)}")
+        s = np.concatenate(scores) if scores else np.zeros(0, dtype="float32")
+        head = [dict(cands[i], score_rerank=float(s[i])) for i in np.argsort(-s, kind="stable")]
+        out = head + list(cands[done:])
+        return out if k is None else out[:k]
+
+class LogisticReranker(Reranker):
+    """기존 점수 특징의 로지스틱 회귀 (표준화 → w·x + b → sigmoid). 후보 100개에 ~1ms"""
+    name = "logistic"
+
+    def __init__(self, model: Dict, **kw):
+        super().__init__(**kw)
+        self.features = list(model["features"])
+        self.mean = np.asarray(model["mean"], dtype="float32")
+        self.std = np.asarray(model["std"], dtype="float32")
+        self.w = np.asarray(model["w"], dtype="float32")
+        self.b = float(model["b"])
+
+    @classmethod
+    def load(cls, path: str, **kw) -> "LogisticReranker":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f), **kw)
+
+    def score(self, query: str, cands: List[Dict]) -> np.ndarray:
+        X = (_features(query, cands, self.features) - self.mean) / self.std
+        return 1.0 / (1.0 + np.exp(-(X @ self.w + self.b)))
+
+class OnnxCrossEncoder(Reranker):
+    """(질의, 제목+본문) 쌍을 cross-encoder ONNX 모델로 채점. onnxruntime + tokenizers 필요, CPU 전용"""
+    name = "onnx"
+
+    def __init__(self, model_dir: str, max_len: int = MAX_LEN, threads: int = THREADS, **kw):
+        super().__init__(**kw)
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(os.path.join(model_dir, "model.onnx"), opts,
+                                            providers=["CPUExecutionProvider"])
+        self.inputs = {i.name for i in self.session.get_inputs()}
+        self.tok = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tok.enable_truncation(max_length=max_len)
+        self.tok.enable_padding()
+
+    def score(self, query: str, cands: List[Dict]) -> np.ndarray:
+        enc = self.tok.encode_batch([(query, (c.get("title", "") + "\n" + _doc_text(c)).strip()) for c in cands])
+        feed = {"input_ids": np.array([e.ids for e in enc], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in enc], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in enc], dtype=np.int64)}
+        logits = self.session.run(None, {k: v for k, v in feed.items() if k in self.inputs})[0]
+        return logits.reshape(len(cands), -1)[:, -1]  # 출력 1개(관련도) 또는 2개([무관, 관련])
+
+# ---------------- 학습 ----------------
+def fit_logistic(X: np.ndarray, y: np.ndarray, features: List[str],
+                 l2: float = 1e-2, epochs: int = 500, lr: float = 0.5) -> Dict:
+    """표준화 + 전체 배치 경사하강 (L2). 반환: LogisticReranker 모델 dict"""
+    X = np.asarray(X, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std < 1e-6] = 1.0
+    Z = (X - mean) / std
+    w = np.zeros(Z.shape[1])
+    b = 0.0
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(Z @ w + b)))
+        g = p - y
+        w -= lr * (Z.T @ g / len(y) + l2 * w)
+        b -= lr * float(g.mean())
+    return {"features": list(features), "mean": mean.tolist(), "std": std.tolist(), "w": w.tolist(), "b": b}
+
+def model_path(kind: str) -> str:
+    return os.path.join(MODEL_DIR, f"{kind}.json")
+
+# ---------------- 선택/공용 인스턴스 ----------------
+def _onnx_ready() -> bool:
+    return (bool(ONNX_DIR) and os.path.exists(os.path.join(ONNX_DIR, "model.onnx"))
+            and all(importlib.util.find_spec(m) is not None for m in ("onnxruntime", "tokenizers")))
+
+def resolve_backend(kind: str, name: Optional[str] = None) -> Optional[str]:
+    name = (name or RERANK_BACKEND).lower()
+    if name in ("none", "0", ""):
+        return None
+    if name == "auto":
+        if _onnx_ready():
+            return "onnx"
+        return "logistic" if os.path.exists(model_path(kind)) else None
+    if name == "onnx":
+        if not _onnx_ready():
+            raise RuntimeError("onnx reranker needs RERANK_ONNX_DIR/model.onnx + onnxruntime + tokenizers")
+        return name
+    if name == "logistic":
+        if not os.path.exists(model_path(kind)):
+            raise RuntimeError(f"no trained rerank model: {model_path(kind)}")
+        return name
+    raise ValueError(f"unknown rerank backend: {name}")
+
+_RERANKERS: Dict[str, Optional[Reranker]] = {}
+_RERANK_LOCK = threading.Lock()
+
+def get_reranker(kind: str) -> Optional[Reranker]:
+    """종류별 공용 인스턴스 (RERANK_BACKEND=none이거나 auto인데 모델이 없으면 None)"""
+    with _RERANK_LOCK:
+        if kind not in _RERANKERS:
+            backend = resolve_backend(kind)
+            if backend == "onnx":
+                _RERANKERS[kind] = OnnxCrossEncoder(ONNX_DIR)
+            elif backend == "logistic":
+                _RERANKERS[kind] = LogisticReranker.load(model_path(kind))
+            else:
+                _RERANKERS[kind] = None
+        return _RERANKERS[kind]
+
+def use_reranker(kind: str, reranker: Optional[Reranker]) -> None:
+    """종류별 재정렬기 교체 (None이면 끔)"""
+    with _RERANK_LOCK:
+        _RERANKERS[kind] = reranker
+
+# ---------------- CLI ----------------
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("cmd", choices=["train"])
+    ap.add_argument("data", help="jsonl: {query, label, 후보 필드…}")
+    ap.add_argument("--kind", choices=sorted(FEATURES), default="rag")
+    ap.add_argument("--out", default=None)
+    args = ap.parse_args()
+    with open(args.data, "r", encoding="utf-8") as f:
+        rows = [json.loads(ln) for ln in f if ln.strip()]
+    y = np.array([float(r["label"]) for r in rows])
+    if len(set(y.tolist())) < 2:
+        raise SystemExit("need labelled rows of both classes")
+    names = FEATURES[args.kind]
+    X = np.concatenate([_features(r["query"], [r], names) for r in rows])
+    model = fit_logistic(X, y, names)
+    lr = LogisticReranker(model)
+    p = 1.0 / (1.0 + np.exp(-(((X - lr.mean) / lr.std) @ lr.w + lr.b)))
+    acc = float(((p > 0.5) == (y > 0.5)).mean())
+    out = args.out or model_path(args.kind)
+    d = os.path.dirname(out)
+    if d: os.makedirs(d, exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(model, f, ensure_ascii=False, indent=2)
+    print(f"[RERANK] trained {args.kind} on {len(rows)} rows (train acc {acc:.3f}) → {out}")
+
+if __name__ == "__main__":
+    main()
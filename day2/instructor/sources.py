@@ -0,0 +1,130 @@
+"""
+Day2 증분 재인제스트: 소스 매니페스트 {index_dir}/sources.json
+
+  path → {"size", "mtime_ns", "sha256", "ids": [청크 id, ...]}
+
+- size/mtime이 그대로면 파싱은 물론 해시도 읽지 않고 건너뜀 (변경 없는 재실행은 stat만)
+- size/mtime만 바뀌고 sha256이 같으면(touch, 복사) stat만 갱신
+- 새/변경 소스만 pipeline으로 읽기 → 청크 → 임베딩. 변경 후 사라진 청크 id는 store.delete
+- data/raw에서 사라진 소스의 청크는 store.delete
+- URL은 내용 지문이 없으므로 처음 한 번만 읽는다 (RAG_REFRESH_URLS=1이면 매번 다시)
+- sources.json이 없는 기존 인덱스(첫 실행)는 같은 kind 청크의 source 메타로 매니페스트를 만든다
+  (지문이 없으므로 전부 다시 읽고, 바뀐/사라진 소스의 옛 청크는 위와 같이 정리)
+- 읽기/파싱에 실패한 소스는 이전 항목(지문·청크 id)을 그대로 둔다 → 기존 청크 유지, 다음 실행에 재시도
+"""
+import os, re, json
+from typing import List, Dict, Optional
+
+from day2.instructor.pdf_extract import file_sha256
+from day2.instructor.pipeline import ingest_to_store
+
+SOURCES_NAME = "sources.json"
+REFRESH_URLS = os.getenv("RAG_REFRESH_URLS", "0") == "1"
+
+def _is_url(p: str) -> bool:
+    return bool(re.match(r"^https?://", p))
+
+def load_manifest(path: str) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("sources", {})
+
+def save_manifest(path: str, sources: Dict[str, Dict]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "sources": sources}, f, ensure_ascii=False, indent=1)
+        f.flush(); os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+def manifest_from_store(store, kind: str) -> Dict[str, Dict]:
+    """store의 청크 source 메타 → {path: {"ids": [...]}} (size/mtime/sha256 없음 = 다음 비교에서 변경으로 취급)"""
+    return {(src if _is_url(src) else os.path.normpath(src)): {"ids": ids}
+            for src, ids in store.ids_by_source(kind).items()}
+
+def sync_sources(paths: List[str], store, kind: str = "generic",
+                 chunk_size: int = 800, overlap: int = 100,
+                 manifest_path: Optional[str] = None) -> Dict:
+    """
+    paths(현재 소스 전체)와 매니페스트를 비교해 바뀐 것만 store에 반영한다.
+    반환: {"new","changed","unchanged","removed","failed","retired_chunks","ntotal", "pipeline"?}
+    """
+    manifest_path = manifest_path or os.path.join(store.dir, SOURCES_NAME)
+    if os.path.exists(manifest_path):
+        old = load_manifest(manifest_path)
+    else:
+        old = manifest_from_store(store, kind)
+        if old:
+            print(f"[Sources] no {SOURCES_NAME}: seeded {len(old)} sources from the index")
+    cur: Dict[str, Dict] = {}
+    todo: List[str] = []
+    stats = {"new": 0, "changed": 0, "unchanged": 0, "removed": 0, "failed": 0, "retired_chunks": 0}
+
+    for p in dict.fromkeys(paths):
+        key = p if _is_url(p) else os.path.normpath(p)
+        prev = old.get(key)
+        if _is_url(p):
+            if prev is not None and not REFRESH_URLS:
+                cur[key] = prev
+                stats["unchanged"] += 1
+            else:
+                cur[key] = {"ids": (prev or {}).get("ids", [])}
+                todo.append(p)
+                stats["changed" if prev else "new"] += 1
+            continue
+        try:
+            st = os.stat(p)
+        except FileNotFoundError:
+            continue
+        if prev and prev.get("size") == st.st_size and prev.get("mtime_ns") == st.st_mtime_ns:
+            cur[key] = prev
+            stats["unchanged"] += 1
+            continue
+        digest = file_sha256(p)
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest,
+                 "ids": (prev or {}).get("ids", [])}
+        cur[key] = entry
+        if prev and prev.get("sha256") == digest:
+            stats["unchanged"] += 1  # 내용 동일: stat만 갱신
+            continue
+        todo.append(p)
+        stats["changed" if prev else "new"] += 1
+
+    # 1) 사라진 소스 → 청크 삭제
+    retire: List[str] = []
+    for key, prev in old.items():
+        if key not in cur:
+            retire.extend(prev.get("ids", []))
+            stats["removed"] += 1
+
+    # 2) 새/변경 소스만 파이프라인으로 (같은 id·같은 텍스트는 upsert가 건너뜀)
+    if todo:
+        fresh_ids: Dict[str, List[str]] = {}
+        failed: List[str] = []
+
+        def _on_source(p: str, ids: List[str]) -> None:
+            fresh_ids[p if _is_url(p) else os.path.normpath(p)] = ids
+
+        def _on_error(p: str, err: str) -> None:
+            failed.append(p if _is_url(p) else os.path.normpath(p))
+
+        stats["pipeline"] = ingest_to_store(todo, store, chunk_size=chunk_size, overlap=overlap,
+                                            kind=kind, on_source=_on_source, on_error=_on_error)
+        for key in failed:
+            # 새 지문을 기록하지 않는다: 이전 항목이 있으면 그대로(청크 유지), 없으면 빼서 다음에 다시 읽기
+            if key in old:
+                cur[key] = old[key]
+            else:
+                cur.pop(key, None)
+        stats["failed"] = len(failed)
+        for key, ids in fresh_ids.items():
+            keep = set(ids)
+            retire.extend(cid for cid in cur[key].get("ids", []) if cid not in keep)
+            cur[key]["ids"] = ids
+
+    if retire:
+        stats["retired_chunks"] = store.delete(retire)
+    if cur != old:
+        save_manifest(manifest_path, cur)
+    stats["ntotal"] = store.ntotal()
+    return stats
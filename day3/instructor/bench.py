@@ -0,0 +1,339 @@
+"""
+Day3 수집기 벤치마크 (로컬 픽스처 서버, 외부 네트워크 없음).
+
+  python -m day3.instructor.bench crawl    # 목록+상세 30건 크롤: 순차(requests.get + 고정 sleep) vs 동시 풀 vs 동시 풀 + HTTP 캐시(warm)
+                                           #   vs 증분(워터마크, 새 공고 3건)
+  python -m day3.instructor.bench parse    # 저장된 NIPA/기업마당 상세 페이지 pages/sec: BeautifulSoup 3회 vs HtmlDoc 1회
+  python -m day3.instructor.bench fields   # 저장된 공고 본문 notices/sec: 라벨별 re.finditer 반복 vs extract_fields 1회 스캔
+  python -m day3.instructor.bench rank     # 공고 200건 rank_notices: 건별 임베딩 + 파이썬 루프 vs 배치 1회 + NumPy
+                                           #   vs FaissStore에 저장된 벡터 재사용 vs 상위 12개만 선택·복사
+                                           #   (가짜 임베딩, 호출당 지연 BENCH_EMBED_MS, 공고 수 BENCH_NOTICES)
+
+픽스처 응답 지연은 D3_FIXTURE_LATENCY_MS(기본 150ms)로 실제 사이트 왕복을 흉내 낸다.
+"""
+import os, re, json, glob, time, random, argparse, tempfile
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple, Optional
+
+import numpy as np
+import requests
+from bs4 import BeautifulSoup
+
+from day1.instructor import http_cache
+from day2.instructor import embedder, emb_cache, dedup
+from day2.instructor.rag_store import FaissStore
+from day3.instructor import crawl_state, fetchers, fixture_server, html_doc, parsers, ranker
+from day3.instructor.parsers import ATTACH_EXT
+from day3.instructor.http_pool import reset_pool, USER_AGENT, REQUEST_TIMEOUT
+
+# ---------------- crawl ----------------
+def _legacy_get(url: str) -> str:
+    """이전 _get_html: 요청마다 새 연결"""
+    r = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=REQUEST_TIMEOUT)
+    r.raise_for_status()
+    return r.text
+
+def _legacy_parse(html: str, url: str) -> Tuple[str, str, List[Dict]]:
+    """이전 상세 파싱: 제목/본문/첨부가 각자 BeautifulSoup(html.parser) 트리를 만든다"""
+    soup = BeautifulSoup(html, "html.parser")
+    title = url
+    for sel in html_doc.TITLE_SELECTORS:
+        node = soup.select_one(sel)
+        if node and node.get_text(strip=True):
+            title = node.get_text(strip=True)
+            break
+    soup = BeautifulSoup(html, "html.parser")
+    for t in soup(html_doc.NOISE_TAGS):
+        t.decompose()
+    texts = []
+    for sel in html_doc.MAIN_SELECTORS:
+        node = soup.select_one(sel)
+        if node:
+            txt = re.sub(r"\s+", " ", node.get_text(" ", strip=True)).strip()
+            if txt: texts.append(txt)
+    text = max(texts, key=len) if texts else re.sub(r"\s+", " ", soup.get_text(" ", strip=True)).strip()
+    atts = [{"name": a.get_text(strip=True) or a["href"].split("/")[-1], "url": a["href"]}
+            for a in BeautifulSoup(html, "html.parser").find_all("a", href=True)
+            if a["href"].lower().endswith(ATTACH_EXT)]
+    return title, text, atts
+
+def _legacy_crawl(list_url: str, keywords: List[str], max_pages: int) -> List[Dict]:
+    """이전 fetch_nipa_list_by_query 1단계: 목록/상세를 하나씩, 목록 0.2s·상세 0.1s 쉬며"""
+    pat = fetchers._detail_pat(list_url)
+    links = set()
+    for kw in [k for k in keywords if k] or [""]:
+        for page in range(1, max_pages + 1):
+            html = _legacy_get(f"{list_url}?srchKey=title&srchText={kw}&page={page}")
+            for a in BeautifulSoup(html, "html.parser").find_all("a", href=True):
+                u = fetchers._abs_url(list_url, a["href"])
+                if pat.match(u):
+                    links.add(u)
+            time.sleep(0.2)
+    items = []
+    for u in sorted(links)[:fetchers.NIPA_MAX_ITEMS]:
+        html = _legacy_get(u)
+        title, text, atts = _legacy_parse(html, u)
+        if fetchers._notice_filter_stage(title, text, atts, 1, keywords)[0]:
+            items.append({"url": u, "title": title})
+        time.sleep(0.1)
+    return items
+
+def bench_crawl(keywords: List[str], max_pages: int, repeat: int) -> None:
+    tmp = tempfile.TemporaryDirectory()
+    srv, list_url = fixture_server.serve()
+    print(f"[bench] fixture {list_url} latency={fixture_server.LATENCY_MS:.0f}ms "
+          f"per_page={fixture_server.PER_PAGE} keywords={keywords} max_pages={max_pages}")
+    print("| mode | sec | items | requests | 304 | peak conc |")
+    print("|---|---|---|---|---|---|")
+    crawl = lambda inc: fetchers.fetch_nipa_list_by_query(keywords, list_url=list_url, max_pages=max_pages,
+                                                          incremental=inc)
+    try:
+        for label in ("sequential", "pooled", "pooled+cache", "incremental+3new"):
+            # pooled는 캐시 없이 전체, pooled+cache는 임시 HTTP 캐시를 채운 뒤(warm) 전체,
+            # incremental은 임시 crawl_state를 채운 뒤 실행마다 새 공고 3건을 게시하고 잰다
+            http_cache.ENABLED = label in ("pooled+cache", "incremental+3new")
+            if http_cache.ENABLED:
+                http_cache._CACHE = http_cache.HttpCache(os.path.join(tmp.name, f"{label}.http.sqlite"))
+                if label == "incremental+3new":
+                    crawl_state._STATE = crawl_state.CrawlState(os.path.join(tmp.name, "crawl.sqlite"))
+                crawl(label == "incremental+3new")
+            srv.state.peak = 0
+            secs, n, before = [], 0, fixture_server.stats(srv)
+            for _ in range(repeat):
+                if label == "incremental+3new":
+                    srv.state.total += 3
+                t0 = time.perf_counter()
+                if label == "sequential":
+                    n = len(_legacy_crawl(list_url, keywords, max_pages))
+                else:
+                    reset_pool()  # 실행마다 새 풀 (연결 재사용은 한 실행 안에서만)
+                    n = len(crawl(label == "incremental+3new"))
+                secs.append(time.perf_counter() - t0)
+            after = fixture_server.stats(srv)
+            print(f"| {label} | {min(secs):.2f} | {n} | {(after['requests'] - before['requests']) // repeat} | "
+                  f"{(after['not_modified'] - before['not_modified']) // repeat} | {after['peak_concurrency']} |")
+    finally:
+        srv.shutdown()
+        http_cache._CACHE = None
+        crawl_state._STATE = None
+        tmp.cleanup()
+
+# ---------------- parse ----------------
+def _fixture_pages() -> List[Tuple[str, str]]:
+    out = []
+    for path in sorted(glob.glob(os.path.join(fixture_server.FIXTURE_DIR, "*.html"))):
+        if os.path.basename(path) == "nipa_list.html":
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            out.append((os.path.basename(path), f.read().replace("{{ID}}", "1001")))
+    return out
+
+def bench_parse(repeat: int) -> None:
+    pages = _fixture_pages()
+    print(f"[bench] {len(pages)} fixture pages x {repeat} ({', '.join(n for n, _ in pages)})")
+    base = {n: _legacy_parse(h, n) for n, h in pages}
+    print("| parser | trees/page | pages/sec | same output |")
+    print("|---|---|---|---|")
+
+    def _doc(h: str, n: str, parser: str):
+        d = html_doc.HtmlDoc(h, parser)
+        title = d.title(n)
+        atts = fetchers.parse_attachments([], doc=d)
+        return title, d.main_text(), atts
+
+    runs = [("bs4 html.parser x3 (legacy)", 3, lambda h, n: _legacy_parse(h, n))]
+    runs += [(f"HtmlDoc {p}", 1, (lambda p: lambda h, n: _doc(h, n, p))(p)) for p in html_doc.available_parsers()]
+    for label, trees, fn in runs:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for n, h in pages:
+                fn(h, n)
+        sec = time.perf_counter() - t0
+        same = all(fn(h, n) == base[n] for n, h in pages)
+        print(f"| {label} | {trees} | {len(pages) * repeat / max(sec, 1e-9):.0f} | {same} |")
+
+# ---------------- fields ----------------
+def _legacy_first_after(text: str, keys: List[str], maxlen: int) -> Optional[str]:
+    best = None
+    for k in keys:
+        for m in re.finditer(re.escape(k), text):
+            seg = text[m.end():min(len(text), m.end() + maxlen)].strip(" :：-—\n\r\t")
+            seg = re.split(r"[。\.\n\r;|]", seg)[0]
+            seg = re.sub(r"\s{2,}", " ", seg).strip()
+            if seg:
+                best = seg if (best is None or len(seg) > len(best)) else best
+    return best
+
+def _legacy_fields(text: str) -> Dict[str, Optional[str]]:
+    """이전 parse_dates/agency/budget/requirements: 라벨마다 re.finditer(re.escape(label), text)"""
+    P = parsers
+    out: Dict[str, Optional[str]] = {"announce_date": None, "close_date": None}
+    done = False
+    for lab in P.RANGE_LABELS:
+        for m in re.finditer(re.escape(lab), text):
+            seg = text[max(0, m.start() - 180):min(len(text), m.end() + 180)]
+            rm = P.RANGE_PAT.search(seg)
+            if rm:
+                out["announce_date"], out["close_date"] = P._post_fix_dates(
+                    P._norm_date(*rm.group(1, 2, 3)), P._norm_date(*rm.group(4, 5, 6)))
+                done = True
+                break
+            ds = P._find_dates(seg)
+            if len(ds) >= 2:
+                ds.sort()
+                out["announce_date"], out["close_date"] = P._post_fix_dates(ds[0], ds[-1])
+                done = True
+                break
+        if done:
+            break
+    if not done:
+        def _best_near(labels):
+            best = None
+            for lab in labels:
+                for m in re.finditer(re.escape(lab), text):
+                    ds = P._find_dates(text[max(0, m.start() - 160):min(len(text), m.end() + 160)])
+                    if ds and (best is None or max(ds) > best):
+                        best = max(ds)
+            return best
+        out["announce_date"], out["close_date"] = P._post_fix_dates(_best_near(P.ANN_LABELS), _best_near(P.CLOSE_LABELS))
+    out["agency"] = _legacy_first_after(text, P.AGENCY_KEYS, 80)
+    m = re.search(r"([\d][\d,\.]{0,12})\s*(억원|억|만원|만|원|천만원|백만원)", text)
+    out["budget"] = f"{m.group(1)}{m.group(2)}" if m else _legacy_first_after(text, P.BUDGET_KEYS, 60)
+    hits = []
+    for k in P.REQ_KEYS:
+        for m in re.finditer(re.escape(k), text):
+            seg = re.sub(r"\s{2,}", " ", text[max(0, m.start() - 160):min(len(text), m.end() + 160)]).strip()
+            hits.append(f"{k}: {seg[:300]}")
+    hits.sort(key=len, reverse=True)
+    out["requirements"] = hits[0][:400] if hits else None
+    return out
+
+def _notice_corpus() -> List[str]:
+    texts = []
+    with open(os.path.join(fixture_server.FIXTURE_DIR, "notice_texts.jsonl"), "r", encoding="utf-8") as f:
+        texts += [json.loads(ln)["text"] for ln in f if ln.strip()]
+    texts += [html_doc.HtmlDoc(h).main_text() for _, h in _fixture_pages()]
+    return texts
+
+def bench_fields(repeat: int) -> None:
+    texts = _notice_corpus()
+    print(f"[bench] {len(texts)} notice texts x {repeat} (avg {sum(map(len, texts)) // len(texts)} chars)")
+    print("| extractor | notices/sec | same output |")
+    print("|---|---|---|")
+    base = [_legacy_fields(t) for t in texts]
+    separate = lambda t: dict(zip(("announce_date", "close_date"), parsers.parse_dates(t)),
+                              agency=parsers.parse_agency(t), budget=parsers.parse_budget(t),
+                              requirements=parsers.parse_requirements(t))
+    for label, fn in (("legacy re.finditer per label", _legacy_fields),
+                      ("parse_* (scan per call)", separate),
+                      ("extract_fields (1 scan)", parsers.extract_fields)):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for t in texts:
+                fn(t)
+        sec = time.perf_counter() - t0
+        same = [fn(t) for t in texts] == base
+        print(f"| {label} | {len(texts) * repeat / max(sec, 1e-9):.0f} | {same} |")
+
+# ---------------- rank ----------------
+def _legacy_rank(query: str, items: List[Dict], keywords: List[str], embed_one) -> List[Dict]:
+    """개선 전 rank_notices: 공고마다 임베딩 요청 1건 + 항목별 파이썬 점수 계산"""
+    def _keyword_score(item: Dict) -> float:
+        blob = f"{item.get('title','')} {item.get('summary') or item.get('snippet','')}".lower()
+        atts = " ".join([(a.get("name") or "") for a in (item.get("attachments") or [])]).lower()
+        text = blob + " " + atts
+        ks = [k for k in keywords or [] if k and k not in ranker.KW_STOP]
+        if not ks: return 0.0
+        s = 0.0
+        for k in ks:
+            if re.search(rf"\b{re.escape(k)}\b", text): s += 1.0
+            elif k in text: s += 0.5
+        return min(1.0, s / len(ks))
+
+    q = embed_one(query)
+    X = np.stack([embed_one(ranker._notice_text(it)) for it in items])
+    sims = X @ q
+    ranked = []
+    for i, it in enumerate(items):
+        dl = parsers.compute_days_left(it.get("close_date"))
+        dl_norm = 0.15 if dl is None else (0.0 if dl < 0 or dl >= 30 else (30 - dl) / 30.0)
+        kw = _keyword_score(it)
+        score = 0.6 * dl_norm + 0.25 * float(sims[i]) + 0.15 * kw
+        if it.get("title", "").strip() in ranker.GENERIC_TITLE and not it.get("attachments"):
+            score *= 0.6
+        ranked.append(dict(it, score_deadline=dl_norm, score_sim=float(sims[i]), score_kw=kw, score=score))
+    ranked.sort(key=lambda x: x["score"], reverse=True)
+    return ranked
+
+def _rank_items(n: int) -> List[Dict]:
+    rng = random.Random(7)
+    texts = _notice_corpus()
+    today = datetime.now(parsers.TZ).date()
+    items = []
+    for i in range(n):
+        body = texts[i % len(texts)]
+        close = today + timedelta(days=rng.randint(-5, 60))
+        items.append({
+            "id": f"bench-{i}", "title": f"공고 {i} " + rng.choice(["클라우드 지원사업", "AI 바우처 모집", "데이터 구축", "주요사업"]),
+            "url": f"https://example.org/notice/{i}", "summary": body[:300],
+            "close_date": close.isoformat() if rng.random() > 0.1 else None,
+            "attachments": [{"name": "공고문.hwp"}] if i % 4 else [], "source": "gov-nipa",
+        })
+    return items
+
+def bench_rank(n: int, repeat: int) -> None:
+    latency_ms = float(os.getenv("BENCH_EMBED_MS", "20"))
+    calls = {"n": 0}
+    fake = embedder.fake_backend(1536, latency_ms=latency_ms)
+    def _counted(texts: List[str]) -> List[List[float]]:
+        calls["n"] += 1
+        return fake(texts)
+    embedder.use_backend(_counted)
+    emb_cache.ENABLED = False  # 매 반복이 실제 임베딩 경로를 타도록 (실제 캐시에 섞이지도 않게)
+    dedup.DEDUP_ENABLED = False  # 합성 공고는 본문이 겹쳐 근접 중복으로 빠지므로 전부 인덱스에 넣는다
+
+    def _embed_one(t: str) -> np.ndarray:
+        v = np.array(embedder.get_executor().embed([t or ""])[0], dtype="float32")
+        return v / (np.linalg.norm(v) + 1e-9)
+
+    query, keywords = "최신 클라우드 사업공고를 찾아줘", ["클라우드", "ai"]
+    items = _rank_items(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FaissStore(os.path.join(tmp, "faiss"))
+        store.upsert([{"id": it["id"], "text": ranker._notice_text(it), "source": it["url"], "page": 1,
+                       "kind": "government", "title": it["title"]} for it in items])
+        print(f"[bench] {n} notices x {repeat}, fake embedding {latency_ms:.0f}ms/call")
+        print("| ranker | sec/run | embed calls/run | same order |")
+        print("|---|---|---|---|")
+        base = [it["id"] for it in _legacy_rank(query, items, keywords, _embed_one)]
+        for label, fn in (("legacy (1 call/notice, loops)", lambda: _legacy_rank(query, items, keywords, _embed_one)),
+                          ("batched + NumPy", lambda: ranker.rank_notices(query, items, keywords)),
+                          ("batched + store vectors", lambda: ranker.rank_notices(query, items, keywords, store=store)),
+                          ("store vectors + top_k=12", lambda: ranker.rank_notices(query, items, keywords, store=store, top_k=12))):
+            calls["n"] = 0
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                out = fn()
+            sec = (time.perf_counter() - t0) / repeat
+            same = [it["id"] for it in out] == base[:len(out)]
+            print(f"| {label} | {sec:.3f} | {calls['n'] / repeat:.0f} | {same} |")
+    embedder.use_backend(None)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("what", choices=["crawl", "parse", "fields", "rank"])
+    ap.add_argument("--keywords", default=os.getenv("BENCH_KEYWORDS", "클라우드,AI"))
+    ap.add_argument("--pages", type=int, default=int(os.getenv("BENCH_PAGES", "2")))
+    ap.add_argument("--repeat", type=int, default=int(os.getenv("BENCH_REPEAT", "0")))
+    args = ap.parse_args()
+    if args.what == "crawl":
+        bench_crawl([k.strip() for k in args.keywords.split(",") if k.strip()], args.pages, args.repeat or 1)
+    elif args.what == "parse":
+        bench_parse(args.repeat or 50)
+    elif args.what == "fields":
+        bench_fields(args.repeat or 500)
+    elif args.what == "rank":
+        bench_rank(int(os.getenv("BENCH_NOTICES", "200")), args.repeat or 3)
+
+if __name__ == "__main__":
+    main()
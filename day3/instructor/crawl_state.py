@@ -0,0 +1,107 @@
+"""
+NIPA 증분 크롤 상태: 목록 URL·키워드별 워터마크(본 공고 id 최댓값) + 파싱된 상세 레코드, SQLite 한 파일.
+
+NIPA 공고 id(/home/2-2/<id>)는 증가만 하므로
+- 목록은 1쪽부터 워터마크 이하 id가 보일 때까지만 넘긴다 (평소엔 키워드당 1쪽)
+- 워터마크보다 큰 id만 상세를 받아 파싱하고, 나머지는 저장된 레코드를 그대로 쓴다
+→ 매일 새로고침이 O(전체 공고) → O(새 공고)
+
+  D3_INCREMENTAL=0 이면 끔 (매번 전체 크롤)
+  D3_CRAWL_STATE   상태 파일 (기본 data/cache/day3/crawl.sqlite)
+"""
+import os, json, time, sqlite3, threading
+from typing import List, Dict, Optional, Iterable
+
+INCREMENTAL = os.getenv("D3_INCREMENTAL", "1") == "1"
+STATE_PATH = os.getenv("D3_CRAWL_STATE", "data/cache/day3/crawl.sqlite")
+
+_PAGE_COLS = ("url", "title", "text", "attachments", "announce_date", "close_date")
+
+class CrawlState:
+    def __init__(self, path: str = STATE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        d = os.path.dirname(path)
+        if d: os.makedirs(d, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS watermark (list_url TEXT, keyword TEXT, max_id INTEGER NOT NULL,"
+            " updated REAL NOT NULL, PRIMARY KEY (list_url, keyword)) WITHOUT ROWID")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS link (list_url TEXT, keyword TEXT, nid INTEGER, url TEXT NOT NULL,"
+            " PRIMARY KEY (list_url, keyword, nid)) WITHOUT ROWID")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS page (url TEXT PRIMARY KEY, title TEXT, text TEXT, attachments TEXT,"
+            " announce_date TEXT, close_date TEXT, fetched REAL NOT NULL) WITHOUT ROWID")
+        self._db.commit()
+
+    # ---------- watermark ----------
+    def watermark(self, list_url: str, keyword: str) -> int:
+        """본 적 있는 가장 큰 id (없으면 -1 → 전체 크롤)"""
+        with self._lock:
+            row = self._db.execute("SELECT max_id FROM watermark WHERE list_url=? AND keyword=?",
+                                   (list_url, keyword)).fetchone()
+        return row[0] if row else -1
+
+    def set_watermark(self, list_url: str, keyword: str, max_id: int) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO watermark (list_url, keyword, max_id, updated) VALUES (?,?,?,?)",
+                             (list_url, keyword, max_id, time.time()))
+            self._db.commit()
+
+    # ---------- links / records ----------
+    def add_links(self, list_url: str, keyword: str, links: Iterable[tuple]) -> None:
+        """links: (nid, url)"""
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO link (list_url, keyword, nid, url) VALUES (?,?,?,?)",
+                                 [(list_url, keyword, nid, url) for nid, url in links])
+            self._db.commit()
+
+    def links(self, list_url: str, keyword: str, limit: int) -> List[tuple]:
+        """(nid, url) 최신 id부터"""
+        with self._lock:
+            return self._db.execute(
+                "SELECT nid, url FROM link WHERE list_url=? AND keyword=? ORDER BY nid DESC LIMIT ?",
+                (list_url, keyword, limit)).fetchall()
+
+    def put_pages(self, pages: List[Dict]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO page (url, title, text, attachments, announce_date, close_date, fetched)"
+                " VALUES (?,?,?,?,?,?,?)",
+                [(p["url"], p["title"], p["text"], json.dumps(p["attachments"], ensure_ascii=False),
+                  p["announce_date"], p["close_date"], now) for p in pages])
+            self._db.commit()
+
+    def get_pages(self, urls: List[str]) -> Dict[str, Dict]:
+        out: Dict[str, Dict] = {}
+        with self._lock:
+            for i in range(0, len(urls), 500):  # SQLite 변수 개수 제한
+                part = urls[i : i + 500]
+                q = f"SELECT {', '.join(_PAGE_COLS)} FROM page WHERE url IN ({','.join('?' * len(part))})"
+                for row in self._db.execute(q, part):
+                    rec = dict(zip(_PAGE_COLS, row))
+                    rec["attachments"] = json.loads(rec["attachments"] or "[]")
+                    out[rec["url"]] = rec
+        return out
+
+    def clear(self) -> None:
+        with self._lock:
+            for t in ("watermark", "link", "page"):
+                self._db.execute(f"DELETE FROM {t}")
+            self._db.commit()
+
+_STATE: Optional[CrawlState] = None
+_STATE_LOCK = threading.Lock()
+
+def get_crawl_state() -> Optional[CrawlState]:
+    """프로세스 공용 인스턴스. D3_INCREMENTAL=0이면 None"""
+    global _STATE
+    if not INCREMENTAL:
+        return None
+    with _STATE_LOCK:
+        if _STATE is None:
+            _STATE = CrawlState()
+        return _STATE
@@ -1,13 +1,12 @@
-import os, re, time, urllib.parse, requests
+import os, re, urllib.parse
+from functools import lru_cache
 from typing import List, Dict, Optional, Set, Tuple
-from bs4 import BeautifulSoup
 
-from day3.instructor.parsers import (
-    parse_dates, parse_agency, parse_budget, parse_requirements, parse_attachments,
-)
+from day3.instructor.crawl_state import CrawlState, get_crawl_state
+from day3.instructor.html_doc import HtmlDoc
+from day3.instructor.http_pool import get_pool
 
-REQUEST_TIMEOUT = int(os.getenv("RAG_REQUEST_TIMEOUT", "15"))
-USER_AGENT = os.getenv("RAG_USER_AGENT", "Mozilla/5.0 (Day3-NIPA-Instructor)")
+from day3.instructor.parsers import parse_attachments, extract_fields
 
 NIPA_LIST_URL = os.getenv("NIPA_LIST_URL", "https://www.nipa.kr/home/2-2")
 NIPA_MAX_ITEMS = int(os.getenv("NIPA_MAX_ITEMS", "30"))
@@ -16,7 +15,11 @@ NIPA_PER_ITEM_BYTES = int(os.getenv("NIPA_PER_ITEM_BYTES", "1200"))
 # 부족 시 필터 완화 임계
 RELAX_AFTER = int(os.getenv("D3_RELAX_AFTER", "3"))
 
-DETAIL_PAT = re.compile(r"^https?://www\.nipa\.kr/home/2-2/\d+/?$")
+@lru_cache(maxsize=8)
+def _detail_pat(list_url: str) -> "re.Pattern":
+    """목록 URL(…/home/2-2) 바로 아래 숫자 경로가 상세 페이지 (로컬 픽스처 서버도 같은 규칙)"""
+    u = urllib.parse.urlparse(list_url)
+    return re.compile(r"^https?://" + re.escape(u.netloc) + re.escape(u.path.rstrip("/")) + r"/(\d+)/?$")
 
 WL_DOMAINS = [d.strip().lower() for d in os.getenv(
     "GOV_WEB_WHITELIST",
@@ -46,33 +49,14 @@ def _domain(url: str) -> str:
         return ""
 
 def _get_html(url: str) -> str:
-    r = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=REQUEST_TIMEOUT)
-    r.raise_for_status()
-    return r.text
-
-def _extract_main_text(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-    for t in soup(["script","style","noscript","header","footer","nav","aside"]):
-        t.decompose()
-    selectors = ["div.view-cont","div.board-view","article","div#contents","div#content","section#content","main",".contents"]
-    texts=[]
-    for sel in selectors:
-        node = soup.select_one(sel)
-        if node:
-            txt = re.sub(r"\s+"," ", node.get_text(" ", strip=True)).strip()
-            if txt: texts.append(txt)
-    if not texts:
-        return re.sub(r"\s+"," ", soup.get_text(" ", strip=True)).strip()
-    texts.sort(key=len, reverse=True)
-    return texts[0]
-
-def _extract_title(html: str, fallback_url: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-    for sel in ["div.view-tit h2","h2.tit","div.board-view h2","article h2","h1","h2","title"]:
-        node = soup.select_one(sel)
-        if node and node.get_text(strip=True):
-            return node.get_text(strip=True)
-    return fallback_url
+    # 공유 keep-alive 세션 + 호스트별 동시성/요청률 제한 (http_pool)
+    return get_pool().get_text(url)
+
+def _extract_main_text(doc: HtmlDoc) -> str:
+    return doc.main_text()
+
+def _extract_title(doc: HtmlDoc, fallback_url: str) -> str:
+    return doc.title(fallback_url)
 
 def _has_notice_words(text: str) -> bool:
     blob = (text or "").lower()
@@ -114,114 +98,203 @@ def _notice_filter_stage(title: str, text: str, attachments: List[Dict],
         return True, "stage3_ok"
     return False, "stage3_fail"
 
-# ------------------------- NIPA -------------------------
-def map_nipa_links_by_keywords(list_url: str, keywords: List[str], max_pages: int) -> List[str]:
-    links: Set[str] = set()
-    kw_list = [k for k in (keywords or []) if k] or [""]
-    for kw in kw_list:
-        kw_enc = urllib.parse.quote(kw)
-        for page in range(1, max_pages+1):
-            url = f"{list_url}?srchKey=title&srchText={kw_enc}&page={page}"
-            try:
-                html = _get_html(url)
-                soup = BeautifulSoup(html, "html.parser")
-                kept=0
-                for a in soup.find_all("a", href=True):
-                    absu = _abs_url(list_url, a["href"])
-                    if DETAIL_PAT.match(absu) and absu not in links:
-                        links.add(absu); kept += 1
-                print(f"[NIPA][map] kw='{kw}' page={page} kept={kept} total={len(links)}")
-                time.sleep(0.2)
-            except Exception as e:
-                print(f"[NIPA][map][ERROR] kw='{kw}' page={page} -> {e}")
-    return sorted(links)
-
-def _scrape_detail_nipa(url: str, body_limit: int, stage: int, query_keywords: List[str]) -> Optional[Dict]:
+# ------------------------- Parsed page (1회 다운로드 + 1회 파싱) -------------------------
+class ParsedPage:
+    """
+    상세 페이지 파싱 결과. 필터 단계 1→2→3은 모두 이 레코드로 판정하고 HTML은 들고 있지 않는다.
+    날짜/기관/예산/자격은 extract_fields 1회 스캔 결과. 크롤 상태(RECORD 컬럼만 보관)에서 되살린
+    페이지는 기관/예산/자격을 fields()에서 처음 필요할 때 스캔한다.
+    """
+    RECORD = ("url", "title", "text", "attachments", "announce_date", "close_date")  # crawl_state page 컬럼
+    __slots__ = RECORD + ("agency", "budget", "requirements", "_scanned")
+
+    def __init__(self, url: str, title: str, text: str, attachments: List[Dict],
+                 announce_date: Optional[str], close_date: Optional[str],
+                 fields: Optional[Dict[str, Optional[str]]] = None):
+        self.url, self.title, self.text, self.attachments = url, title, text, attachments
+        self.announce_date, self.close_date = announce_date, close_date
+        self._scanned = fields is not None
+        fields = fields or {}
+        self.agency, self.budget, self.requirements = fields.get("agency"), fields.get("budget"), fields.get("requirements")
+
+    def fields(self) -> Dict[str, Optional[str]]:
+        """{agency, budget, requirements}"""
+        if not self._scanned:
+            f = extract_fields(self.text)
+            self.agency, self.budget, self.requirements = f["agency"], f["budget"], f["requirements"]
+            self._scanned = True
+        return {"agency": self.agency, "budget": self.budget, "requirements": self.requirements}
+
+def _parse_page(url: str, tag: str = "") -> Optional[ParsedPage]:
     try:
         html = _get_html(url)
     except Exception as e:
-        print(f"[NIPA][detail][ERROR] get_html: {e}")
+        if tag:
+            print(f"[{tag}][detail][ERROR] get_html: {e}")
         return None
-    title = _extract_title(html, url)
-    text  = _extract_main_text(html)
-    attachments = parse_attachments([], base_html=html)
-
+    doc = HtmlDoc(html)  # 제목/첨부/본문이 트리 하나를 공유
+    title = _extract_title(doc, url)
+    attachments = parse_attachments([], doc=doc)
+    text = _extract_main_text(doc)
+    fields = extract_fields(text)  # 날짜/기관/예산/자격: 라벨 스캔 1회
+    return ParsedPage(url, title, text, attachments, fields["announce_date"], fields["close_date"], fields)
+
+def _parse_pages(urls: List[str], tag: str = "") -> List[Optional[ParsedPage]]:
+    """urls 순서대로, 공유 풀에서 동시에 받아 파싱 (실패는 None)"""
+    return get_pool().map(lambda u: _parse_page(u, tag), urls)
+
+def _stage_item(page: ParsedPage, body_limit: int, stage: int, query_keywords: List[str],
+                source: str, tag: str = "") -> Optional[Dict]:
+    """stage 필터 통과 시 결과 dict (기관/예산/자격은 _parse_page에서 날짜와 함께 스캔한 값)"""
+    title, text, attachments = page.title, page.text, page.attachments
     ok, reason = _notice_filter_stage(title, text, attachments, stage, query_keywords)
     if not ok:
-        print(f"[NIPA][filter] stage{stage} drop: {title[:40]}… — {reason}")
+        if tag:
+            print(f"[{tag}][filter] stage{stage} drop: {title[:40]}… — {reason}")
         return None
 
-    announce_date, close_date = parse_dates(text)
     snippet = text[:body_limit] if text else title
     content_type = "attachment" if (len(attachments) >= 3 or len(text) < 300) else "text"
-
+    fields = page.fields()
     return {
-        "title": title, "url": url, "snippet": snippet,
-        "date": announce_date or None, "source": "gov-nipa",
-        "announce_date": announce_date, "close_date": close_date,
-        "agency": parse_agency(text), "budget": parse_budget(text),
-        "requirements": parse_requirements(text),
+        "title": title, "url": page.url, "snippet": snippet,
+        "date": page.announce_date or None, "source": source,
+        "announce_date": page.announce_date, "close_date": page.close_date,
+        "agency": fields["agency"], "budget": fields["budget"],
+        "requirements": fields["requirements"],
         "attachments": attachments, "content_type": content_type,
         "text_len": len(text), "attach_cnt": len(attachments)
     }
 
+# ------------------------- NIPA -------------------------
+def _list_page_url(list_url: str, kw: str, page: int) -> str:
+    return f"{list_url}?srchKey=title&srchText={urllib.parse.quote(kw)}&page={page}"
+
+def _list_links(html: str, list_url: str) -> List[Tuple[int, str]]:
+    """목록 페이지의 상세 링크 (id, url), 페이지 순서"""
+    pat = _detail_pat(list_url)
+    out: List[Tuple[int, str]] = []
+    for href, _ in HtmlDoc(html).links():
+        absu = _abs_url(list_url, href)
+        m = pat.match(absu)
+        if m:
+            out.append((int(m.group(1)), absu))
+    return out
+
+def map_nipa_links_by_keywords(list_url: str, keywords: List[str], max_pages: int) -> List[str]:
+    links: Set[str] = set()
+    kw_list = [k for k in (keywords or []) if k] or [""]
+    jobs = [(kw, page) for kw in kw_list for page in range(1, max_pages+1)]
+    urls = [_list_page_url(list_url, kw, page) for kw, page in jobs]
+    # 목록 페이지는 동시에 받고(항상 재검증: ttl=0), 링크 수집은 입력 순서대로
+    for (kw, page), html in zip(jobs, get_pool().fetch_many(urls, ttl=0)):
+        if isinstance(html, Exception):
+            print(f"[NIPA][map][ERROR] kw='{kw}' page={page} -> {html}")
+            continue
+        kept=0
+        for _, absu in _list_links(html, list_url):
+            if absu not in links:
+                links.add(absu); kept += 1
+        print(f"[NIPA][map] kw='{kw}' page={page} kept={kept} total={len(links)}")
+    return sorted(links)
+
+def _scan_new_links(list_url: str, kw: str, max_pages: int, watermark: int) -> List[Tuple[int, str]]:
+    """
+    목록(최신순)을 1쪽부터 훑어 워터마크보다 새 (id, url)을 모은다.
+    새 링크 뒤에 워터마크 이하 id가 나온 쪽(경계를 넘음)이나 새 링크가 없는 쪽에서 멈춘다.
+    맨 위에 고정된 옛 공고는 새 링크보다 앞에 있으므로 멈춤 조건에 걸리지 않는다.
+    """
+    found: Dict[int, str] = {}
+    for page in range(1, max_pages+1):
+        try:
+            html = get_pool().get_text(_list_page_url(list_url, kw, page), ttl=0)
+        except Exception as e:
+            print(f"[NIPA][map][ERROR] kw='{kw}' page={page} -> {e}")
+            break
+        links = _list_links(html, list_url)
+        new = [(nid, u) for nid, u in links if nid > watermark]
+        found.update(new)
+        print(f"[NIPA][map] kw='{kw}' page={page} new={len(new)} watermark={watermark}")
+        first_new = next((i for i, (nid, _) in enumerate(links) if nid > watermark), None)
+        if first_new is None or any(nid <= watermark for nid, _ in links[first_new + 1:]):
+            break
+    return sorted(found.items(), reverse=True)
+
+def _page_record(p: ParsedPage) -> Dict:
+    return {k: getattr(p, k) for k in ParsedPage.RECORD}
+
+def _incremental_pages(list_url: str, keywords: List[str], max_pages: int, state: CrawlState) -> List[ParsedPage]:
+    """
+    워터마크보다 새 공고만 받아 파싱해 저장하고, 키워드별 최신 NIPA_MAX_ITEMS개를 저장된 레코드와 합친다.
+    상세를 못 받은 id가 있으면 워터마크를 그 앞에서 멈춰 다음 실행에 다시 시도한다.
+    """
+    kw_list = [k for k in (keywords or []) if k] or [""]
+    marks = {kw: state.watermark(list_url, kw) for kw in kw_list}
+    scans = dict(zip(kw_list, get_pool().map(lambda kw: _scan_new_links(list_url, kw, max_pages, marks[kw]), kw_list)))
+
+    new_urls = list(dict.fromkeys(u for links in scans.values() for _, u in links))
+    known = state.get_pages(new_urls)  # 다른 키워드로 이미 받은 공고
+    todo = [u for u in new_urls if u not in known]
+    parsed = {p.url: p for p in _parse_pages(todo, "NIPA") if p is not None}
+    state.put_pages([_page_record(p) for p in parsed.values()])
+
+    for kw, links in scans.items():
+        ok = [(nid, u) for nid, u in links if u in parsed or u in known]
+        failed = [nid for nid, u in links if u not in parsed and u not in known]
+        state.add_links(list_url, kw, ok)
+        mark = min(failed) - 1 if failed else max([nid for nid, _ in ok], default=marks[kw])
+        if mark > marks[kw]:
+            state.set_watermark(list_url, kw, mark)
+
+    cand: Dict[str, int] = {}
+    for kw in kw_list:
+        for nid, u in state.links(list_url, kw, NIPA_MAX_ITEMS):
+            cand[u] = nid
+    urls = sorted(cand, key=cand.get, reverse=True)[:NIPA_MAX_ITEMS]
+    stored = state.get_pages([u for u in urls if u not in parsed])
+    pages = [parsed.get(u) or (ParsedPage(**stored[u]) if u in stored else None) for u in urls]
+    print(f"[NIPA][incremental] new={len(new_urls)} fetched={len(parsed)} failed={len(todo) - len(parsed)} "
+          f"from_store={len(stored)} candidates={len(urls)}")
+    return [p for p in pages if p is not None]
+
 def fetch_nipa_list_by_query(keywords: List[str], list_url: str = NIPA_LIST_URL,
-                             max_pages: int = 1, body_limit: int = NIPA_PER_ITEM_BYTES) -> List[Dict]:
-    """Progressive: stage1 → stage2 → stage3"""
-    detail_urls = map_nipa_links_by_keywords(list_url, keywords, max_pages=max_pages)
+                             max_pages: int = 1, body_limit: int = NIPA_PER_ITEM_BYTES,
+                             incremental: bool = True) -> List[Dict]:
+    """
+    Progressive: stage1 → stage2 → stage3 (상세 페이지는 한 번만 받아 파싱, 세 단계 모두 같은 레코드로 판정)
+    incremental(기본, D3_INCREMENTAL=1): crawl_state 워터마크보다 새 공고만 받고 저장된 레코드와 합친다.
+    """
+    state = get_crawl_state() if incremental else None
+    if state is not None:
+        pages = _incremental_pages(list_url, keywords, max_pages, state)
+    else:
+        detail_urls = map_nipa_links_by_keywords(list_url, keywords, max_pages=max_pages)[:NIPA_MAX_ITEMS]
+        pages = [p for p in _parse_pages(detail_urls, "NIPA") if p is not None]
     items: List[Dict] = []
 
+    def _stage(stage: int):
+        for p in pages:
+            if any(x["url"] == p.url for x in items): continue
+            yield _stage_item(p, body_limit, stage, keywords, "gov-nipa", tag="NIPA")
+
     # Stage 1
-    for u in detail_urls[:NIPA_MAX_ITEMS]:
-        it = _scrape_detail_nipa(u, body_limit, stage=1, query_keywords=keywords)
-        if it: items.append(it)
-        time.sleep(0.1)
+    items.extend(it for it in _stage(1) if it)
     if len(items) >= RELAX_AFTER:
         return items
 
     # Stage 2
-    for u in detail_urls[:NIPA_MAX_ITEMS]:
-        it = _scrape_detail_nipa(u, body_limit, stage=2, query_keywords=keywords)
-        if it and (u not in [x["url"] for x in items]): items.append(it)
+    for it in _stage(2):
+        if it: items.append(it)
         if len(items) >= RELAX_AFTER: break
-        time.sleep(0.08)
     if len(items) >= RELAX_AFTER:
         return items
 
     # Stage 3
-    for u in detail_urls[:NIPA_MAX_ITEMS]:
-        it = _scrape_detail_nipa(u, body_limit, stage=3, query_keywords=keywords)
-        if it and (u not in [x["url"] for x in items]): items.append(it)
-        time.sleep(0.06)
+    for it in _stage(3):
+        if it: items.append(it)
     return items
 
 # ------------------------- WEB (Day1 검색 활용) -------------------------
-def _scrape_detail_web(url: str, body_limit: int, stage: int, query_keywords: List[str]) -> Optional[Dict]:
-    try:
-        html = _get_html(url)
-    except Exception:
-        return None
-    title = _extract_title(html, url)
-    text  = _extract_main_text(html)
-    attachments = parse_attachments([], base_html=html)
-
-    ok, reason = _notice_filter_stage(title, text, attachments, stage, query_keywords)
-    if not ok:
-        return None
-
-    announce_date, close_date = parse_dates(text)
-    snippet = text[:body_limit]
-    content_type = "attachment" if (len(attachments) >= 3 or len(text) < 300) else "text"
-    return {
-        "title": title, "url": url, "snippet": snippet,
-        "date": announce_date or None, "source": _domain(url) or "web",
-        "announce_date": announce_date, "close_date": close_date,
-        "agency": parse_agency(text), "budget": parse_budget(text),
-        "requirements": parse_requirements(text),
-        "attachments": attachments, "content_type": content_type,
-        "text_len": len(text), "attach_cnt": len(attachments)
-    }
-
 def search_web_notices(query: str, top_n: int = 6, body_limit: int = NIPA_PER_ITEM_BYTES) -> List[Dict]:
     """
     도메인별 쿼리로 확보율 상승:
@@ -249,30 +322,31 @@ def search_web_notices(query: str, top_n: int = 6, body_limit: int = NIPA_PER_IT
             if not url or dom not in WL_DOMAINS: continue
             if url in seen: continue
             seen.add(url); cand_urls.append(url)
-        time.sleep(0.05)
 
+    pages = [p for p in _parse_pages(cand_urls) if p is not None]
     items: List[Dict] = []
+
+    def _stage(stage: int):
+        for p in pages:
+            if any(x["url"] == p.url for x in items): continue
+            yield _stage_item(p, body_limit, stage, [query], _domain(p.url) or "web")
+
     # stage 1
-    for u in cand_urls:
-        it = _scrape_detail_web(u, body_limit, stage=1, query_keywords=[query])
+    for it in _stage(1):
         if it: items.append(it)
         if len(items) >= top_n: break
     if len(items) >= RELAX_AFTER:
         return items[:top_n]
 
     # stage 2
-    for u in cand_urls:
-        if any(x["url"] == u for x in items): continue
-        it = _scrape_detail_web(u, body_limit, stage=2, query_keywords=[query])
+    for it in _stage(2):
         if it: items.append(it)
         if len(items) >= top_n: break
     if len(items) >= RELAX_AFTER:
         return items[:top_n]
 
     # stage 3
-    for u in cand_urls:
-        if any(x["url"] == u for x in items): continue
-        it = _scrape_detail_web(u, body_limit, stage=3, query_keywords=[query])
+    for it in _stage(3):
         if it: items.append(it)
         if len(items) >= top_n: break
 
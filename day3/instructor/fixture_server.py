@@ -0,0 +1,134 @@
+"""
+NIPA 사업공고 로컬 픽스처 서버 (크롤러 테스트/벤치용, 외부 네트워크 없음).
+
+  GET /home/2-2?...&page=N   → 목록 페이지 (최신순, N쪽 상세 링크 D3_FIXTURE_PER_PAGE개)
+  GET /home/2-2/{id}         → 상세 페이지 (id % 3: 사업공고 / 입찰공고 / 행사 결과)
+
+페이지 본문은 data/fixtures/day3/*.html 템플릿({{ID}}, {{ROWS}} 치환).
+응답마다 D3_FIXTURE_LATENCY_MS 만큼 지연시켜 실제 사이트 왕복을 흉내 내고,
+요청 수와 최대 동시 처리 수를 기록한다(호스트별 동시성 제한 확인용).
+응답에는 ETag(본문 md5)가 붙고 If-None-Match가 맞으면 304 (http_cache 재검증 확인용).
+
+  python -m day3.instructor.fixture_server --port 8765
+  NIPA_LIST_URL=http://127.0.0.1:8765/home/2-2 python -m day3.instructor.main
+"""
+import os, re, time, hashlib, argparse, threading, urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Tuple
+
+FIXTURE_DIR = os.getenv("D3_FIXTURE_DIR", "data/fixtures/day3")
+LATENCY_MS = float(os.getenv("D3_FIXTURE_LATENCY_MS", "150"))
+PER_PAGE = int(os.getenv("D3_FIXTURE_PER_PAGE", "15"))
+TOTAL = int(os.getenv("D3_FIXTURE_TOTAL", "60"))  # 공고 id 1000 … 1000+TOTAL-1 (state.total을 늘리면 새 공고 게시)
+LIST_PATH = "/home/2-2"
+DETAIL_TEMPLATES = ("nipa_detail_notice.html", "nipa_detail_bid.html", "nipa_detail_news.html")
+
+_DETAIL = re.compile(r"^" + re.escape(LIST_PATH) + r"/(\d+)/?$")
+
+def _load(name: str) -> str:
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+class FixtureState:
+    def __init__(self, latency_ms: float, per_page: int, total: int = TOTAL):
+        self.latency = latency_ms / 1000.0
+        self.per_page = per_page
+        self.total = total
+        self.list_tpl = _load("nipa_list.html")
+        self.detail_tpls = [_load(n) for n in DETAIL_TEMPLATES]
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.inflight = 0
+        self.peak = 0
+
+    def list_page(self, page: int) -> str:
+        top = 1000 + self.total - 1 - (page - 1) * self.per_page
+        rows = "\n".join(
+            f'      <tr><td>{i}</td><td><a href="{LIST_PATH}/{i}">공고 {i}</a></td><td>2025-09-01</td></tr>'
+            for i in range(top, max(top - self.per_page, 999), -1))
+        return self.list_tpl.replace("{{ROWS}}", rows)
+
+    def detail_page(self, nid: int) -> str:
+        return self.detail_tpls[nid % len(self.detail_tpls)].replace("{{ID}}", str(nid))
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        st: FixtureState = self.server.state
+        with st.lock:
+            st.requests += 1
+            st.inflight += 1
+            st.peak = max(st.peak, st.inflight)
+        try:
+            if st.latency > 0:
+                time.sleep(st.latency)
+            u = urllib.parse.urlparse(self.path)
+            m = _DETAIL.match(u.path)
+            if m:
+                self._send(200, st.detail_page(int(m.group(1))))
+            elif u.path.rstrip("/") == LIST_PATH:
+                q = urllib.parse.parse_qs(u.query)
+                try:
+                    page = max(1, int((q.get("page") or ["1"])[0]))
+                except ValueError:
+                    page = 1
+                self._send(200, st.list_page(page))
+            else:
+                self._send(404, "<html><body>not found</body></html>")
+        finally:
+            with st.lock:
+                st.inflight -= 1
+
+    def _send(self, code: int, body: str):
+        data = body.encode("utf-8")
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        if code == 200 and self.headers.get("If-None-Match") == etag:
+            st: FixtureState = self.server.state
+            with st.lock:
+                st.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(code)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if code == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def serve(port: int = 0, latency_ms: float = LATENCY_MS, per_page: int = PER_PAGE) -> Tuple[ThreadingHTTPServer, str]:
+    """백그라운드 스레드로 서버 시작 → (server, 목록 URL). 끝나면 server.shutdown()"""
+    srv = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    srv.daemon_threads = True
+    srv.state = FixtureState(latency_ms, per_page)
+    threading.Thread(target=srv.serve_forever, daemon=True, name="d3-fixture").start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}{LIST_PATH}"
+
+def stats(srv: ThreadingHTTPServer) -> Dict[str, int]:
+    st: FixtureState = srv.state
+    with st.lock:
+        return {"requests": st.requests, "not_modified": st.not_modified, "peak_concurrency": st.peak}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency-ms", type=float, default=LATENCY_MS)
+    args = ap.parse_args()
+    srv, url = serve(args.port, args.latency_ms)
+    print(f"[fixture] serving {url} (latency {args.latency_ms:.0f}ms)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
+
+if __name__ == "__main__":
+    main()
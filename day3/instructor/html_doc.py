@@ -0,0 +1,108 @@
+"""
+상세/목록 페이지 HTML을 한 번만 파싱해 제목·본문·링크 추출이 같은 트리를 공유한다.
+
+  D3_HTML_PARSER  auto(기본) | selectolax | lxml | html.parser
+                  auto = selectolax → lxml(BeautifulSoup) → html.parser 순으로 설치된 것
+
+HtmlDoc(html).title(fallback) / .main_text() / .links() → [(href, 링크 텍스트)]
+본문 추출은 script/nav/footer 등을 지우므로 제목·링크는 그 전에 읽어 둔다(결과는 파서와 무관하게 같다).
+"""
+import os, re, importlib.util
+from typing import List, Optional, Tuple
+
+HTML_PARSER = os.getenv("D3_HTML_PARSER", "auto")
+
+TITLE_SELECTORS = ["div.view-tit h2", "h2.tit", "div.board-view h2", "article h2", "h1", "h2", "title"]
+MAIN_SELECTORS = ["div.view-cont", "div.board-view", "article", "div#contents", "div#content",
+                  "section#content", "main", ".contents"]
+NOISE_TAGS = ["script", "style", "noscript", "header", "footer", "nav", "aside"]
+
+_WS = re.compile(r"\s+")
+_MODULES = {"selectolax": "selectolax", "lxml": "lxml", "html.parser": "bs4"}
+
+def available_parsers() -> List[str]:
+    return [p for p, mod in _MODULES.items() if importlib.util.find_spec(mod) is not None]
+
+def resolve_parser(name: Optional[str] = None) -> str:
+    name = (name or HTML_PARSER).lower()
+    avail = available_parsers()
+    if name == "auto":
+        for p in ("selectolax", "lxml", "html.parser"):
+            if p in avail:
+                return p
+        raise RuntimeError("no HTML parser installed (selectolax / lxml / beautifulsoup4)")
+    if name not in _MODULES:
+        raise ValueError(f"unknown HTML parser: {name}")
+    if name not in avail:
+        raise RuntimeError(f"HTML parser not installed: {name}")
+    return name
+
+class HtmlDoc:
+    def __init__(self, html: str, parser: Optional[str] = None):
+        self.parser = resolve_parser(parser)
+        if self.parser == "selectolax":
+            from selectolax.lexbor import LexborHTMLParser
+            self._tree = LexborHTMLParser(html or "")
+        else:
+            from bs4 import BeautifulSoup
+            self._tree = BeautifulSoup(html or "", self.parser)
+        self._title: Optional[str] = None
+        self._links: Optional[List[Tuple[str, str]]] = None
+        self._text: Optional[str] = None
+
+    # ---- backend primitives ----
+    def _select_one(self, sel: str):
+        if self.parser == "selectolax":
+            return self._tree.css_first(sel)
+        return self._tree.select_one(sel)
+
+    def _node_text(self, node, sep: str = "") -> str:
+        if self.parser == "selectolax":
+            return node.text(separator=sep, strip=True)
+        return node.get_text(sep, strip=True)
+
+    # ---- extractors ----
+    def title(self, fallback: str = "") -> str:
+        if self._title is None:
+            self._title = ""
+            for sel in TITLE_SELECTORS:
+                node = self._select_one(sel)
+                if node is not None:
+                    t = self._node_text(node)
+                    if t:
+                        self._title = t
+                        break
+        return self._title or fallback
+
+    def links(self) -> List[Tuple[str, str]]:
+        if self._links is None:
+            if self.parser == "selectolax":
+                self._links = [(a.attributes.get("href") or "", a.text(strip=True))
+                               for a in self._tree.css("a[href]")]
+            else:
+                self._links = [(a["href"], a.get_text(strip=True)) for a in self._tree.find_all("a", href=True)]
+        return self._links
+
+    def main_text(self) -> str:
+        if self._text is None:
+            self.title(); self.links()  # 노이즈 태그를 지우기 전에
+            if self.parser == "selectolax":
+                for t in NOISE_TAGS:
+                    for n in self._tree.css(t):
+                        n.decompose()
+            else:
+                for n in self._tree(NOISE_TAGS):
+                    n.decompose()
+            texts = []
+            for sel in MAIN_SELECTORS:
+                node = self._select_one(sel)
+                if node is not None:
+                    txt = _WS.sub(" ", self._node_text(node, " ")).strip()
+                    if txt:
+                        texts.append(txt)
+            if texts:
+                self._text = max(texts, key=len)
+            else:
+                root = self._tree.body if self.parser == "selectolax" else self._tree
+                self._text = _WS.sub(" ", self._node_text(root, " ")).strip() if root is not None else ""
+        return self._text
@@ -0,0 +1,132 @@
+"""
+Day3 동시 HTTP 수집기: 공유 keep-alive 세션 + 호스트별 동시성 제한 + 토큰 버킷 예의(politeness).
+
+- requests.Session 하나를 모든 스레드가 공유 (urllib3 커넥션 풀 재사용, 호스트당 D3_POOL_SIZE 연결)
+- 호스트별 동시 요청 수 ≤ D3_HOST_CONCURRENCY (세마포어)
+- 호스트별 요청률 ≤ D3_HOST_RPS, 순간 최대 D3_HOST_BURST (토큰 버킷) → 고정 time.sleep 대체
+- fetch_many(urls)는 스레드 풀(D3_FETCH_WORKERS)로 돌리고 입력 순서대로 결과를 돌려준다
+- 응답은 day1 http_cache를 거친다: 캐시 적중(TTL 안/replay)은 호스트 제한·토큰을 쓰지 않는다
+"""
+import os, time, threading, urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from day1.instructor.http_cache import cached_get
+
+REQUEST_TIMEOUT = int(os.getenv("RAG_REQUEST_TIMEOUT", "15"))
+USER_AGENT = os.getenv("RAG_USER_AGENT", "Mozilla/5.0 (Day3-NIPA-Instructor)")
+FETCH_WORKERS = int(os.getenv("D3_FETCH_WORKERS", "8"))
+HOST_CONCURRENCY = int(os.getenv("D3_HOST_CONCURRENCY", "4"))
+HOST_RPS = float(os.getenv("D3_HOST_RPS", "8"))
+HOST_BURST = int(os.getenv("D3_HOST_BURST", "4"))
+POOL_SIZE = int(os.getenv("D3_POOL_SIZE", "16"))
+
+class TokenBucket:
+    """rate개/초로 채워지고 최대 burst개까지 쌓이는 토큰. acquire()는 토큰이 생길 때까지 대기"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 1e-6)
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.t = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.t) * self.rate)
+                self.t = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                wait = (1.0 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class HostLimiter:
+    def __init__(self, concurrency: int, rps: float, burst: int):
+        self.sem = threading.BoundedSemaphore(max(1, concurrency))
+        self.bucket = TokenBucket(rps, burst)
+
+class HttpPool:
+    def __init__(self, workers: int = FETCH_WORKERS, host_concurrency: int = HOST_CONCURRENCY,
+                 host_rps: float = HOST_RPS, host_burst: int = HOST_BURST, timeout: int = REQUEST_TIMEOUT):
+        self.workers = max(1, workers)
+        self.host_concurrency, self.host_rps, self.host_burst = host_concurrency, host_rps, host_burst
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=max(POOL_SIZE, self.workers))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._hosts: Dict[str, HostLimiter] = {}
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0}
+
+    def _limiter(self, url: str) -> HostLimiter:
+        host = urllib.parse.urlparse(url).netloc.lower()
+        with self._lock:
+            lim = self._hosts.get(host)
+            if lim is None:
+                lim = self._hosts[host] = HostLimiter(self.host_concurrency, self.host_rps, self.host_burst)
+            return lim
+
+    def _net_get(self, url: str, headers: Dict[str, str], timeout: float) -> requests.Response:
+        lim = self._limiter(url)
+        lim.bucket.acquire()
+        with lim.sem:
+            with self._lock:
+                self.stats["requests"] += 1
+            return self.session.get(url, headers=headers, timeout=timeout)
+
+    def get(self, url: str, headers: Optional[Dict] = None, ttl: Optional[float] = None) -> requests.Response:
+        """ttl: http_cache 신선도(초) 덮어쓰기. 0이면 항상 재검증 (목록 페이지처럼 자주 바뀌는 곳)"""
+        return cached_get(url, headers=headers, timeout=self.timeout, fetch=self._net_get, ttl=ttl)
+
+    def get_text(self, url: str, ttl: Optional[float] = None) -> str:
+        r = self.get(url, ttl=ttl)
+        r.raise_for_status()
+        return r.text
+
+    def fetch_many(self, urls: List[str], ttl: Optional[float] = None) -> List[Union[str, Exception]]:
+        """입력 순서대로 본문 또는 예외 객체"""
+        def _one(u: str) -> Union[str, Exception]:
+            try:
+                return self.get_text(u, ttl=ttl)
+            except Exception as e:
+                with self._lock:
+                    self.stats["errors"] += 1
+                return e
+        if len(urls) <= 1:
+            return [_one(u) for u in urls]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(urls)), thread_name_prefix="d3-fetch") as ex:
+            return list(ex.map(_one, urls))
+
+    def map(self, fn, items: List) -> List:
+        """fn(item)을 같은 워커 수로 병렬 실행 (fn 안에서 get/get_text 사용), 입력 순서 유지"""
+        if len(items) <= 1:
+            return [fn(x) for x in items]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(items)), thread_name_prefix="d3-fetch") as ex:
+            return list(ex.map(fn, items))
+
+_POOL: Optional[HttpPool] = None
+_POOL_LOCK = threading.Lock()
+
+def get_pool() -> HttpPool:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = HttpPool()
+        return _POOL
+
+def reset_pool(**kw) -> HttpPool:
+    """공유 풀 교체 (설정 변경/벤치용). 이전 세션은 닫는다"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.session.close()
+        _POOL = HttpPool(**kw)
+        return _POOL
@@ -13,6 +13,7 @@ from day3.instructor.parsers import compute_days_left
 from day2.instructor.rag_store import FaissStore
 
 EXCLUDE_EXPIRED = (os.getenv("D3_EXCLUDE_EXPIRED","1") == "1")
+RANK_TOP = int(os.getenv("D3_RANK_TOP", "12"))  # 점수 사본을 만드는 상위 개수 (표 크기)
 
 STOP = {"그리고","또는","및","관련","대한","에서","으로","하는","에","의","을","를","은","는","이","가",
         "좀","알려줘","찾아줘","사업","공고","모집","지원","사업공고","최신","최근"}
@@ -35,6 +36,7 @@ def to_rag_chunks(items, kind="government"):
         "page": 1,
         "kind": kind,
         "title": it.get("title",""),
+        "date": it.get("announce_date") or it.get("date"),
     } for it in items]
 
 def render_table(items, title="TABLE"):
@@ -69,18 +71,24 @@ def main():
         pool = [it for it in pool if (compute_days_left(it.get("close_date")) is None) or (compute_days_left(it.get("close_date")) >= 0)]
         print(f"[FILTER] remove expired: {before} -> {len(pool)}")
 
-    ranked = rank_notices(query, pool, keywords, w_deadline=0.6, w_sim=0.25, w_kw=0.15)
+    # 업서트할 스토어를 랭킹에도 넘겨 이미 저장된 공고 벡터는 다시 임베딩하지 않는다
+    upsert_rag = os.getenv("D3_UPSERT_RAG","1") == "1"
+    store = FaissStore() if upsert_rag else None
+    ranked = rank_notices(query, pool, keywords, w_deadline=0.6, w_sim=0.25, w_kw=0.15,
+                          store=store, top_k=RANK_TOP)
 
-    # NIPA top3 + Web top2 정책
-    nipa_only = [it for it in ranked if it.get("source") == "gov-nipa"]
-    web_only  = [it for it in ranked if it.get("source") != "gov-nipa"]
+    # NIPA top3 + Web top2 정책 (상위 RANK_TOP 안에서 모자라면 그다음 순위를 필요한 만큼만 꺼낸다)
+    nipa_only, web_only = [], []
+    for it in ranked.iter_all():
+        (nipa_only if it.get("source") == "gov-nipa" else web_only).append(it)
+        if len(nipa_only) >= want_nipa and len(web_only) >= want_web: break
 
     final = nipa_only[:want_nipa] + web_only[:want_web]
     # 부족분은 ranked에서 보충
     if len(final) < want_nipa + want_web:
         need = (want_nipa + want_web) - len(final)
         used = {id(it) for it in final}
-        for it in ranked:
+        for it in ranked.iter_all():
             if id(it) in used: continue
             final.append(it)
             if len(final) >= want_nipa + want_web: break
@@ -88,8 +96,7 @@ def main():
     digest_md = render_digest(final, keywords)
 
     # (옵션) RAG 업서트
-    if os.getenv("D3_UPSERT_RAG","1") == "1":
-        store = FaissStore()
+    if upsert_rag:
         ntotal, added = store.upsert(to_rag_chunks(final))
         print(f"[RAG] upsert → ntotal={ntotal}, added={added}")
 
@@ -99,7 +106,7 @@ def main():
     with open(md_path, "w", encoding="utf-8") as f:
         f.write(f"# Day3 Snapshot — {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
         f.write(f"- Query: {query}\n- Policy: NIPA top {want_nipa} + Web top {want_web}\n\n")
-        f.write(render_table(ranked[:12], "Ranked (Top-12)") + "\n\n")
+        f.write(render_table(ranked[:RANK_TOP], f"Ranked (Top-{RANK_TOP})") + "\n\n")
         f.write("## Digest\n" + digest_md + "\n")
     print(f"[Saved] {md_path}")
 
@@ -1,9 +1,10 @@
 import os, re
 from typing import Optional, Tuple, List, Dict
-from bs4 import BeautifulSoup
 from datetime import datetime, timezone
 import zoneinfo
 
+from day3.instructor.html_doc import HtmlDoc
+
 MIN_YEAR = int(os.getenv("NIPA_MIN_YEAR", "2024"))
 TZ = zoneinfo.ZoneInfo(os.getenv("TZ", "Asia/Seoul"))
 
@@ -31,13 +32,39 @@ def _find_dates(text: str) -> List[str]:
             out.append(_norm_date(y, mo, d))
     return out
 
-def parse_dates(text: str) -> Tuple[Optional[str], Optional[str]]:
-    if not text:
-        return None, None
+# ---------------- 라벨 위치: 본문 1회 스캔 ----------------
+REQ_KEYS     = ["지원대상","신청자격","참여자격","요건","제출서류","평가기준","사업내용","지원내용"]
+_ALL_LABELS  = list(dict.fromkeys(ANN_LABELS + CLOSE_LABELS + RANGE_LABELS + AGENCY_KEYS + BUDGET_KEYS + REQ_KEYS))
+# 모든 라벨을 한 정규식(긴 것 우선 alternation)으로 스캔. "접수마감" 안의 "마감"처럼
+# 매치 구간 안에서 시작하는 겹친 라벨은 그 구간만 startswith로 확인한다
+_LABEL_SCAN  = re.compile("|".join(re.escape(l) for l in sorted(_ALL_LABELS, key=len, reverse=True)))
+_LABEL_SET   = set(_ALL_LABELS)
+# 라벨 L이 매치됐을 때 그 구간에서 시작하는 라벨들: (offset, label, L 안에 완전히 들어가는지)
+# 완전히 들어가면 확인 없이 기록, 구간 밖으로 넘어가면("접수마감"+"일" → "마감일") startswith로 확인
+_OVERLAPS: Dict[str, List[Tuple[int, str, bool]]] = {}
+for _L in _ALL_LABELS:
+    _OVERLAPS[_L] = [(off, X, _L.startswith(X, off)) for off in range(len(_L)) for X in _ALL_LABELS
+                     if _L.startswith(X, off) or X.startswith(_L[off:])]
+
+_MONEY_PAT   = re.compile(r"([\d][\d,\.]{0,12})\s*(억원|억|만원|만|원|천만원|백만원)")
+_CLAUSE_END  = re.compile(r"[。\.\n\r;|]")
+_MULTI_WS    = re.compile(r"\s{2,}")
+
+def label_positions(text: str) -> Dict[str, List[int]]:
+    """라벨 → 본문 내 시작 위치(오름차순). 라벨 목록 전체를 정규식 한 번으로 스캔"""
+    pos: Dict[str, List[int]] = {}
+    for m in _LABEL_SCAN.finditer(text):
+        i = m.start()
+        for off, lab, inside in _OVERLAPS[m.group()]:
+            if inside or text.startswith(lab, i + off):
+                pos.setdefault(lab, []).append(i + off)
+    return pos
+
+def _dates_from(text: str, pos: Dict[str, List[int]]) -> Tuple[Optional[str], Optional[str]]:
     # (1) 기간 표현 우선
     for lab in RANGE_LABELS:
-        for m in re.finditer(re.escape(lab), text):
-            s, e = max(0, m.start()-180), min(len(text), m.end()+180)
+        for i in pos.get(lab, ()):
+            s, e = max(0, i-180), min(len(text), i+len(lab)+180)
             seg = text[s:e]
             rm = RANGE_PAT.search(seg)
             if rm:
@@ -53,8 +80,8 @@ def parse_dates(text: str) -> Tuple[Optional[str], Optional[str]]:
     def _best_near(labels: List[str]) -> Optional[str]:
         best=None
         for lab in labels:
-            for m in re.finditer(re.escape(lab), text):
-                s, e = max(0, m.start()-160), min(len(text), m.end()+160)
+            for i in pos.get(lab, ()):
+                s, e = max(0, i-160), min(len(text), i+len(lab)+160)
                 ds = _find_dates(text[s:e])
                 if ds:
                     dmax = max(ds)
@@ -65,6 +92,52 @@ def parse_dates(text: str) -> Tuple[Optional[str], Optional[str]]:
     close    = _best_near(CLOSE_LABELS)
     return _post_fix_dates(announce, close)
 
+def _first_after_from(text: str, pos: Dict[str, List[int]], keys: List[str], maxlen: int) -> Optional[str]:
+    best=None
+    for k in keys:
+        for i in pos.get(k, ()):
+            s, e = i+len(k), min(len(text), i+len(k)+maxlen)
+            seg = text[s:e].strip(" :：-—\n\r\t")
+            seg = _CLAUSE_END.split(seg)[0]
+            seg = _MULTI_WS.sub(" ", seg).strip()
+            if seg:
+                best = seg if (best is None or len(seg) > len(best)) else best
+    return best
+
+def _budget_from(text: str, pos: Dict[str, List[int]]) -> Optional[str]:
+    m = _MONEY_PAT.search(text)
+    if m: return f"{m.group(1)}{m.group(2)}"
+    return _first_after_from(text, pos, BUDGET_KEYS, maxlen=60)
+
+def _requirements_from(text: str, pos: Dict[str, List[int]], window: int = 160) -> Optional[str]:
+    best=None
+    for k in REQ_KEYS:
+        for i in pos.get(k, ()):
+            s, e = max(0, i-window), min(len(text), i+len(k)+window)
+            seg = _MULTI_WS.sub(" ", text[s:e]).strip()
+            hit = f"{k}: {seg[:300]}"
+            if best is None or len(hit) > len(best): best = hit  # 가장 긴 것, 같으면 먼저 나온 것
+    return best[:400] if best else None
+
+def extract_fields(text: str) -> Dict[str, Optional[str]]:
+    """
+    공고 본문 → {announce_date, close_date, agency, budget, requirements}.
+    라벨 위치를 한 번만 스캔해 공유한다 (parse_dates/agency/budget/requirements 를 따로 부른 것과 같은 결과).
+    """
+    if not text:
+        return {"announce_date": None, "close_date": None, "agency": None, "budget": None, "requirements": None}
+    pos = label_positions(text)
+    announce, close = _dates_from(text, pos)
+    return {"announce_date": announce, "close_date": close,
+            "agency": _first_after_from(text, pos, AGENCY_KEYS, maxlen=80),
+            "budget": _budget_from(text, pos),
+            "requirements": _requirements_from(text, pos)}
+
+def parse_dates(text: str) -> Tuple[Optional[str], Optional[str]]:
+    if not text:
+        return None, None
+    return _dates_from(text, label_positions(text))
+
 def _post_fix_dates(announce: Optional[str], close: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
     # 공고일/마감일 뒤집힘 보정
     if announce and close and announce > close:
@@ -73,43 +146,30 @@ def _post_fix_dates(announce: Optional[str], close: Optional[str]) -> Tuple[Opti
     return announce, close
 
 def _first_after_label(text: str, keys: List[str], maxlen: int = 80) -> Optional[str]:
-    best=None
+    pos = label_positions(text)
     for k in keys:
-        for m in re.finditer(re.escape(k), text):
-            s, e = m.end(), min(len(text), m.end()+maxlen)
-            seg = text[s:e].strip(" :：-—\n\r\t")
-            seg = re.split(r"[。\.\n\r;|]", seg)[0]
-            seg = re.sub(r"\s{2,}", " ", seg).strip()
-            if seg:
-                best = seg if (best is None or len(seg) > len(best)) else best
-    return best
+        if k not in pos and k not in _LABEL_SET:  # 목록 밖 라벨은 따로 찾는다
+            pos[k] = [m.start() for m in re.finditer(re.escape(k), text)]
+    return _first_after_from(text, pos, keys, maxlen)
 
 def parse_agency(text: str) -> Optional[str]:
     return _first_after_label(text, AGENCY_KEYS, maxlen=80)
 
 def parse_budget(text: str) -> Optional[str]:
-    m = re.search(r"([\d][\d,\.]{0,12})\s*(억원|억|만원|만|원|천만원|백만원)", text)
+    m = _MONEY_PAT.search(text)
     if m: return f"{m.group(1)}{m.group(2)}"
     return _first_after_label(text, BUDGET_KEYS, maxlen=60)
 
 def parse_requirements(text: str, window: int = 160) -> Optional[str]:
-    keys = ["지원대상","신청자격","참여자격","요건","제출서류","평가기준","사업내용","지원내용"]
-    hits=[]
-    for k in keys:
-        for m in re.finditer(re.escape(k), text):
-            s, e = max(0, m.start()-window), min(len(text), m.end()+window)
-            seg = re.sub(r"\s{2,}", " ", text[s:e]).strip()
-            hits.append(f"{k}: {seg[:300]}")
-    if not hits: return None
-    hits.sort(key=len, reverse=True)
-    return hits[0][:400]
-
-def parse_attachments(links: List[Dict], base_html: str = "") -> List[Dict]:
+    return _requirements_from(text, label_positions(text), window)
+
+def parse_attachments(links: List[Dict], base_html: str = "", doc=None) -> List[Dict]:
+    """doc(html_doc.HtmlDoc)을 주면 이미 파싱된 트리의 링크를 쓴다 (base_html 재파싱 없음)"""
     out=[]
-    if base_html:
-        soup = BeautifulSoup(base_html, "html.parser")
-        for a in soup.find_all("a", href=True):
-            href = a["href"]; name = a.get_text(strip=True) or ""
+    if doc is None and base_html:
+        doc = HtmlDoc(base_html)
+    if doc is not None:
+        for href, name in doc.links():
             low = href.lower()
             if low.endswith(ATTACH_EXT):
                 out.append({"name": name or href.split("/")[-1], "url": href})
@@ -1,71 +1,199 @@
 import os, numpy as np, re
-from typing import List, Dict
-from litellm import embedding
-from day3.instructor.parsers import compute_days_left
+from datetime import datetime
+from typing import List, Dict, Tuple, Optional, Iterator
+from day3.instructor.parsers import compute_days_left, TZ
+from day2.instructor.rag_store import embed_texts
+from day2.instructor import rerank as rerank_mod
 
 EMB_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 
 GENERIC_TITLE = {"주요사업","사업안내","사업 안내"}
+KW_STOP = {"사업","공고","모집","지원","안내","찾아줘","최신","최근"}
 
-def _embed_one(t: str) -> np.ndarray:
-    r = embedding(model=EMB_MODEL, input=t or "")
-    v = np.array(r["data"][0]["embedding"], dtype="float32")
-    v = v / (np.linalg.norm(v) + 1e-9)
-    return v
-
-def _embed_many(texts: List[str]) -> np.ndarray:
-    vecs=[_embed_one(t) for t in texts]
-    return np.stack(vecs, axis=0)
-
-def _keyword_score(item: Dict, keywords: List[str]) -> float:
-    STOP = {"사업","공고","모집","지원","안내","찾아줘","최신","최근"}
-    blob = f"{item.get('title','')} {item.get('summary') or item.get('snippet','')}".lower()
-    atts = " ".join([(a.get("name") or "") for a in (item.get("attachments") or [])]).lower()
-    text = blob + " " + atts
-    ks = [k for k in keywords or [] if k and k not in STOP]
-    if not ks: return 0.0
-    s=0.0
+def _notice_text(it: Dict) -> str:
+    """임베딩 텍스트 = day3 main.to_rag_chunks의 text (그래서 FaissStore 벡터를 그대로 재사용할 수 있다)"""
+    return (it.get("title","") + "\n" + (it.get("summary") or it.get("snippet",""))).strip()
+
+def _notice_id(it: Dict) -> str:
+    """to_rag_chunks와 같은 id 규칙"""
+    return it.get("id") or (it.get("url","")+"|"+it.get("title",""))
+
+def _embed_items(query: str, items: List[Dict], store=None) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    (질의 벡터, 항목 벡터 행렬, 스토어 재사용 수). 모두 L2 정규화.
+    store(FaissStore)에 같은 id·같은 텍스트로 저장된 공고는 그 벡터를 쓰고,
+    나머지는 질의와 함께 embed_texts 한 번(토큰 예산 배치 + 임베딩 캐시)으로 보낸다.
+    """
+    texts = [_notice_text(it) for it in items]
+    ids = [_notice_id(it) for it in items]
+    known: Dict[str, np.ndarray] = {}
+    if store is not None:
+        want = dict(zip(ids, texts))
+        try:
+            known = store.get_vectors(list(want), texts=want) if want else {}
+        except Exception as e:
+            print(f"[RANK] store vectors unavailable: {e}")
+    todo = [i for i, cid in enumerate(ids) if cid not in known]
+    V = embed_texts([query] + [texts[i] for i in todo])
+    q = V[0]
+    if known and len(next(iter(known.values()))) != V.shape[1]:
+        known, todo = {}, list(range(len(items)))  # 다른 차원(모델)으로 만든 인덱스 → 전부 임베딩
+        V = embed_texts([query] + texts)
+        q = V[0]
+    X = np.empty((len(items), V.shape[1]), dtype="float32")
+    if todo:
+        X[todo] = V[1:]
+    for i, cid in enumerate(ids):
+        v = known.get(cid)
+        if v is not None:
+            X[i] = v
+    return q, X, len(known)
+
+def _days_left(items: List[Dict]) -> np.ndarray:
+    """마감까지 남은 일수(float32, 없거나 못 읽으면 NaN). compute_days_left와 같은 값을 한 번에 계산"""
+    raw = [it.get("close_date") or "NaT" for it in items]
+    try:
+        d = np.array(raw, dtype="datetime64[D]")
+    except ValueError:  # ISO 날짜가 아닌 값이 섞임 → 항목별로
+        return np.array([np.nan if (v := compute_days_left(it.get("close_date"))) is None else v
+                         for it in items], dtype="float32")
+    today = np.datetime64(datetime.now(TZ).date(), "D")
+    out = (d - today).astype("float32")
+    out[np.isnat(d)] = np.nan
+    return out
+
+def _deadline_scores(dl: np.ndarray) -> np.ndarray:
+    """NaN → 0.15, 지났거나 30일 이상 → 0, 그 외 (30 - d)/30 (0일 → 1.0)"""
+    with np.errstate(invalid="ignore"):
+        s = np.where((dl < 0) | (dl >= 30), 0.0, (30 - dl) / 30.0)
+    return np.where(np.isnan(dl), 0.15, s).astype("float32")
+
+def _keyword_scores(items: List[Dict], keywords: List[str]) -> np.ndarray:
+    """
+    항목마다: 키워드가 단어로(\\b) 있으면 1, 부분 문자열로만 있으면 0.5 → 평균(최대 1).
+    항목 텍스트를 한 문자열로 이어 붙여 키워드마다 정규식 1회로 훑고, 매치 위치를 항목 번호로 바꾼다.
+    """
+    ks = [k for k in keywords or [] if k and k not in KW_STOP]
+    n = len(items)
+    if not ks or not n:
+        return np.zeros(n, dtype="float32")
+    docs = []
+    for it in items:
+        blob = f"{it.get('title','')} {it.get('summary') or it.get('snippet','')}".lower()
+        atts = " ".join([(a.get("name") or "") for a in (it.get("attachments") or [])]).lower()
+        docs.append(blob + " " + atts)
+    sep = "\x00"  # 단어 경계(\b)가 항목을 넘지 않도록 비단어 문자로 구분
+    corpus = sep.join(docs)
+    starts = np.cumsum([0] + [len(d) + 1 for d in docs[:-1]])
+    score = np.zeros(n, dtype="float32")
     for k in ks:
-        if re.search(rf"\b{re.escape(k)}\b", text): s += 1.0
-        elif k in text: s += 0.5
-    return min(1.0, s/len(ks))
+        word = np.zeros(n, dtype=bool)
+        sub = np.zeros(n, dtype=bool)
+        for pat, hit in ((rf"\b{re.escape(k)}\b", word), (re.escape(k), sub)):
+            offs = [m.start() for m in re.finditer(pat, corpus)]
+            if offs:
+                hit[np.searchsorted(starts, offs, side="right") - 1] = True
+        score += np.where(word, 1.0, np.where(sub, 0.5, 0.0))
+    return np.minimum(1.0, score / len(ks)).astype("float32")
+
+def _top_order(total: np.ndarray, k: int) -> np.ndarray:
+    """점수 내림차순(동점은 입력 순) 상위 k개의 위치. argpartition으로 후보만 골라 정렬 → O(n + k log k)"""
+    n = len(total)
+    if k >= n:
+        return np.argsort(-total, kind="stable")
+    neg = -total
+    kth = np.partition(neg, k - 1)[k - 1]
+    cand = np.flatnonzero(neg <= kth)  # 경계 동점까지 포함해야 전체 정렬의 앞 k개와 같다
+    return cand[np.argsort(neg[cand], kind="stable")][:k]
+
+class RankedNotices(list):
+    """
+    rank_notices 결과. 리스트에는 상위 top_k개(점수를 붙인 사본)만 들어 있고,
+    나머지는 점수 배열로만 갖고 있다가 tail()/iter_all()을 부를 때 정렬·복사한다 (디버그 표, 출처별 정책 보충용).
+    """
+    def __init__(self, items: List[Dict], scores: Dict[str, np.ndarray], top: np.ndarray,
+                 after: Optional[np.ndarray] = None):
+        self._items = items
+        self._scores = scores
+        self._top = top
+        self._after = after if after is not None else np.zeros(0, dtype=np.int64)  # 재정렬됐지만 top_k 밖인 순서
+        self._tail: Optional[List[Dict]] = None
+        super().__init__(self._copy(i) for i in top)
+
+    def _copy(self, idx: int) -> Dict:
+        it = dict(self._items[idx])
+        for k, arr in self._scores.items():
+            if not np.isnan(arr[idx]):
+                it[k] = float(arr[idx])
+        return it
+
+    @property
+    def total(self) -> int:
+        """점수를 매긴 전체 항목 수"""
+        return len(self._items)
+
+    def tail(self) -> Iterator[Dict]:
+        """top_k 밖의 항목을 점수순으로 (처음 부를 때 정렬, 사본은 꺼낸 만큼만 만들고 재사용)"""
+        if self._tail is None:
+            rest = np.ones(len(self._items), dtype=bool)
+            rest[self._top] = False
+            rest[self._after] = False
+            idx = np.flatnonzero(rest)
+            self._rest = np.concatenate([self._after, idx[np.argsort(-self._scores["score"][idx], kind="stable")]])
+            self._tail = []
+        for j in range(len(self._rest)):
+            if j == len(self._tail):
+                self._tail.append(self._copy(self._rest[j]))
+            yield self._tail[j]
+
+    def iter_all(self) -> Iterator[Dict]:
+        yield from self
+        yield from self.tail()
 
 def rank_notices(query: str, items: List[Dict], keywords: List[str],
-                 w_deadline: float = 0.6, w_sim: float = 0.25, w_kw: float = 0.15) -> List[Dict]:
-    if not items: return []
+                 w_deadline: float = 0.6, w_sim: float = 0.25, w_kw: float = 0.15,
+                 store=None, top_k: Optional[int] = None, rerank: Optional[bool] = None) -> RankedNotices:
+    """
+    store(day2 FaissStore, 선택): 이미 업서트된 공고 id의 벡터를 재사용한다.
+    임베딩은 실행당 embed_texts 1회, 나머지 점수는 NumPy 벡터 연산.
+    top_k: 상위 k개만 골라 복사한다 (None이면 전부). 나머지는 RankedNotices.tail()로.
+    rerank: None이면 설정된 재정렬기("notice", day2 rerank 참조)가 있을 때 사용, False면 끔.
+      가중합 상위 top_k × RERANK_DEPTH개를 다시 채점해 앞세운다 (score는 그대로, score_rerank 추가).
+    """
+    if not items: return RankedNotices([], {}, np.zeros(0, dtype=np.int64))
     # 의미유사도
-    Q = _embed_one(query)
-    texts = [(it.get("title","")+" "+(it.get("summary") or it.get("snippet",""))).strip() for it in items]
-    X = _embed_many(texts)
-    sim = (X @ Q)
+    Q, X, reused = _embed_items(query, items, store)
+    sim = X @ Q
+    if store is not None:
+        print(f"[RANK] vectors: reused={reused} embedded={len(items) - reused}")
 
     # 마감 임박
-    dl = np.array([compute_days_left(it.get("close_date")) for it in items], dtype="float32")
-    dl_norm = np.zeros_like(dl)
-    for i, d in enumerate(dl):
-        if np.isnan(d): dl_norm[i] = 0.15
-        else:
-            if d < 0: dl_norm[i] = 0.0
-            elif d >= 30: dl_norm[i] = 0.0
-            else: dl_norm[i] = (30 - d) / 30.0  # 0일→1.0
+    dl_norm = _deadline_scores(_days_left(items))
 
     # 키워드
-    kw = np.array([_keyword_score(it, keywords) for it in items], dtype="float32")
+    kw = _keyword_scores(items, keywords)
 
     total = w_deadline*dl_norm + w_sim*sim + w_kw*kw
 
     # 메뉴성 제목 패널티
-    for i, it in enumerate(items):
-        if it.get("title","").strip() in GENERIC_TITLE and not it.get("attachments"):
-            total[i] *= 0.6
-
-    order = np.argsort(-total)
-    ranked=[]
-    for idx in order:
-        it = dict(items[idx])
-        it["score_deadline"] = float(dl_norm[idx])
-        it["score_sim"] = float(sim[idx])
-        it["score_kw"] = float(kw[idx])
-        it["score"] = float(total[idx])
-        ranked.append(it)
-    return ranked
+    generic = np.array([it.get("title","").strip() in GENERIC_TITLE and not it.get("attachments") for it in items])
+    total = np.where(generic, total * 0.6, total)
+
+    k = len(items) if top_k is None else max(0, top_k)
+    scores = {"score_deadline": dl_norm, "score_sim": sim, "score_kw": kw, "score": total}
+    rr = rerank_mod.get_reranker("notice") if rerank is not False else None
+    if rr is None or k == 0:
+        return RankedNotices(items, scores, _top_order(total, k))
+
+    cand = _top_order(total, min(len(items), k * rerank_mod.DEPTH))
+    cands = [{"idx": int(i), "title": items[i].get("title", ""), "text": _notice_text(items[i]),
+              "score_deadline": float(dl_norm[i]), "score_sim": float(sim[i]), "score_kw": float(kw[i]),
+              "score": float(total[i]), "has_attach": float(bool(items[i].get("attachments")))} for i in cand]
+    reranked = rr.rerank(query, cands)
+    order = np.array([c["idx"] for c in reranked], dtype=np.int64)
+    rs = np.full(len(items), np.nan, dtype="float32")
+    for c in reranked:
+        if "score_rerank" in c:
+            rs[c["idx"]] = c["score_rerank"]
+    scores["score_rerank"] = rs
+    return RankedNotices(items, scores, order[:k], after=order[k:])
@@ -8,6 +8,7 @@ from day4.instructor.router import route
 from day4.instructor.tools_bridge import run_research, run_rag, run_government, run_stock
 from day4.instructor.formatter import format_research_output, format_government_output
 from day4.instructor.writer import compose_report
+from day4.instructor.plan_executor import run_plan
 
 def _save_md(md: str, out_path: str = "data/processed/day4_final_snapshot.md"):
     os.makedirs("data/processed", exist_ok=True)
@@ -37,7 +38,7 @@ def run_router_app(query: str, debug: bool = True) -> str:
     def exec_step(tool: str, params: dict):
         if tool == "day2.rag":
             if debug: print(f"[{time.time()-t0:6.2f}s] run_rag 실행")
-            return ("rag", run_rag(query, k=int(params.get("k", 5))))
+            return ("rag", run_rag(query, k=int(params.get("k", 5)), kind=params.get("kind")))
         if tool == "day1.research":
             if debug: print(f"[{time.time()-t0:6.2f}s] run_research 실행")
             return ("research", run_research(
@@ -58,9 +59,24 @@ def run_router_app(query: str, debug: bool = True) -> str:
             return ("stock", run_stock(params.get("q") or query))
         return (None, None)
 
-    for s in steps:
-        k, v = exec_step(s.get("tool"), s.get("params") or {})
-        if k: results[k] = v
+    # 독립 스텝은 동시에, depends_on이 있으면 그 스텝이 끝난 뒤에 (plan_executor 참조)
+    outs, step_trace = run_plan(
+        steps, lambda s: exec_step(s.get("tool"), s["params"]),
+        log=(lambda msg: print(f"[{time.time()-t0:6.2f}s] {msg}")) if debug else None,
+    )
+    for tr in step_trace:  # 같은 종류가 여러 번이면 플랜에서 뒤쪽 스텝 결과 (예전과 같음)
+        if tr["status"] != "ok":
+            continue
+        k, v = outs[tr["id"]]
+        if k:
+            results[k] = v
+            if isinstance(v, dict) and isinstance(v.get("trace"), dict):
+                v["trace"]["elapsed_s"] = tr["elapsed_s"]
+    decision["trace"] = {"steps": step_trace}
+    if debug and step_trace:
+        print(f"[{time.time()-t0:6.2f}s] 스텝 소요: " + ", ".join(
+            f"{tr['id']}({tr['tool']})={tr['status']}"
+            + (f" {tr['elapsed_s']:.2f}s" if tr["elapsed_s"] is not None else "") for tr in step_trace))
 
     # 최종 포맷
     final_output = decision.get("final_output") or ("government_proposal" if results.get("government") else "research_report")
@@ -0,0 +1,158 @@
+"""
+플랜 실행기: 라우터 플랜의 스텝을 의존 관계(DAG)대로, 서로 독립인 스텝은 동시에 실행한다.
+
+  D4_PLAN_WORKERS   동시에 실행할 스텝 수 (기본 4, 1이면 플랜 순서대로 하나씩 = 예전 동작)
+  D4_STEP_TIMEOUT   스텝별 제한 시간(초, 기본 120). 스텝에 "timeout"이 있으면 그 값
+                    (숫자가 아니거나 0 이하면 무시하고 기본값, 플랜 제한 시간보다 길면 그 값으로 자름)
+  D4_PLAN_TIMEOUT   플랜 전체 제한 시간(초, 기본 300)
+
+스텝 스키마: {"id"?, "tool", "params"?, "depends_on"?: [id, ...], "timeout"?: 초}
+  id 생략 시 "s1", "s2" … (플랜 순서), depends_on 생략 시 의존 없음
+  모르는 id나 순환에 걸린 의존은 그 스텝을 건너뛴다(skipped).
+
+run_step(step)은 각자 데몬 스레드에서 돈다. 시간을 넘긴 스텝은 timeout으로 기록하고 결과를 버리며
+(파이썬 스레드는 강제로 멈출 수 없으므로 스레드는 끝날 때까지 두되 슬롯은 바로 반납),
+그 스텝에 의존하던 아직 시작 전 스텝은 취소(skipped)된다. 플랜 전체 시간이 지나면 남은 스텝을 모두 취소한다.
+
+반환 trace: 스텝마다 {id, tool, depends_on, status(ok|error|timeout|skipped), start_s, elapsed_s, error?}
+"""
+import os, math, time, queue, threading
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+PLAN_WORKERS = int(os.getenv("D4_PLAN_WORKERS", "4"))
+STEP_TIMEOUT = float(os.getenv("D4_STEP_TIMEOUT", "120"))
+PLAN_TIMEOUT = float(os.getenv("D4_PLAN_TIMEOUT", "300"))
+
+def _step_timeout(value: Any, default: float, limit: float) -> float:
+    """플랜의 "timeout" 값 → 초. 없거나 숫자가 아니거나 0 이하/무한이면 default, limit 초과는 limit"""
+    try:
+        t = float(value)
+    except (TypeError, ValueError):
+        return default
+    if not math.isfinite(t) or t <= 0:
+        return default
+    return min(t, limit)
+
+def normalize_steps(steps: List[Dict], step_timeout: float = STEP_TIMEOUT,
+                    plan_timeout: float = PLAN_TIMEOUT) -> List[Dict]:
+    """id 채우기(중복 id는 뒤에 #순번) + depends_on을 리스트로 (문자열 하나도 허용) + timeout 검증(초)"""
+    out, seen = [], set()
+    for i, s in enumerate(steps or [], 1):
+        deps = s.get("depends_on") or []
+        if isinstance(deps, str):
+            deps = [deps]
+        sid = str(s.get("id") or f"s{i}")
+        if sid in seen:
+            sid = f"{sid}#{i}"
+        seen.add(sid)
+        out.append(dict(s, id=sid, depends_on=[str(d) for d in deps], params=s.get("params") or {},
+                        timeout=_step_timeout(s.get("timeout"), step_timeout, plan_timeout)))
+    return out
+
+def run_plan(steps: List[Dict], run_step: Callable[[Dict], Any],
+             workers: int = PLAN_WORKERS, step_timeout: float = STEP_TIMEOUT,
+             plan_timeout: float = PLAN_TIMEOUT,
+             log: Optional[Callable[[str], None]] = None) -> Tuple[Dict[str, Any], List[Dict]]:
+    """반환: ({스텝 id: run_step 결과(ok인 것만)}, trace(플랜 순서))"""
+    steps = normalize_steps(steps, step_timeout, plan_timeout)
+    ids = {s["id"] for s in steps}
+    trace = {s["id"]: {"id": s["id"], "tool": s.get("tool"), "depends_on": s["depends_on"],
+                       "status": "pending", "start_s": None, "elapsed_s": None} for s in steps}
+    results: Dict[str, Any] = {}
+    done_q: "queue.Queue[Tuple[str, str, Any, float]]" = queue.Queue()
+    running: Dict[str, float] = {}  # id → 마감 시각
+    t0 = time.perf_counter()
+    workers = max(1, workers)
+
+    def _log(msg: str) -> None:
+        if log: log(msg)
+
+    def _finish(sid: str, status: str, elapsed: Optional[float] = None, error: Optional[str] = None) -> None:
+        tr = trace[sid]
+        tr["status"] = status
+        if elapsed is not None:
+            tr["elapsed_s"] = round(elapsed, 3)
+        if error:
+            tr["error"] = error
+
+    for s in steps:
+        bad = [d for d in s["depends_on"] if d not in ids or d == s["id"]]
+        if bad:
+            _finish(s["id"], "skipped", error=f"unknown dependency: {', '.join(bad)}")
+
+    def _worker(step: Dict) -> None:
+        ts = time.perf_counter()
+        try:
+            out = run_step(step)
+            done_q.put((step["id"], "ok", out, time.perf_counter() - ts))
+        except Exception as e:
+            done_q.put((step["id"], "error", f"{type(e).__name__}: {e}", time.perf_counter() - ts))
+
+    def _start(step: Dict) -> None:
+        now = time.perf_counter()
+        trace[step["id"]].update(status="running", start_s=round(now - t0, 3))
+        running[step["id"]] = now + step["timeout"]
+        _log(f"step {step['id']} ({step.get('tool')}) 시작")
+        threading.Thread(target=_worker, args=(step,), daemon=True, name=f"d4-step-{step['id']}").start()
+
+    while True:
+        # 실패/시간초과/취소된 스텝에 의존하는 대기 스텝은 취소
+        changed = True
+        while changed:
+            changed = False
+            for s in steps:
+                tr = trace[s["id"]]
+                if tr["status"] != "pending":
+                    continue
+                failed = [d for d in s["depends_on"] if trace[d]["status"] in ("error", "timeout", "skipped")]
+                if failed:
+                    _finish(s["id"], "skipped", error=f"dependency not ok: {', '.join(failed)}")
+                    _log(f"step {s['id']} 취소 (의존 실패: {', '.join(failed)})")
+                    changed = True
+
+        if time.perf_counter() - t0 > plan_timeout:
+            for s in steps:
+                if trace[s["id"]]["status"] == "pending":
+                    _finish(s["id"], "skipped", error="plan timeout")
+            for sid in list(running):
+                _finish(sid, "timeout", elapsed=time.perf_counter() - t0 - trace[sid]["start_s"], error="plan timeout")
+                running.pop(sid)
+            _log(f"플랜 제한 시간 {plan_timeout:.0f}s 초과 → 남은 스텝 취소")
+            break
+
+        # 의존이 모두 ok인 스텝을 플랜 순서대로 빈 슬롯만큼 시작
+        for s in steps:
+            if len(running) >= workers:
+                break
+            if trace[s["id"]]["status"] == "pending" and all(trace[d]["status"] == "ok" for d in s["depends_on"]):
+                _start(s)
+
+        if not running:
+            for s in steps:  # 남은 pending = 순환 의존
+                if trace[s["id"]]["status"] == "pending":
+                    _finish(s["id"], "skipped", error="dependency cycle")
+            break
+
+        now = time.perf_counter()
+        wait = max(0.0, min(min(running.values()), t0 + plan_timeout) - now)
+        try:
+            sid, status, out, elapsed = done_q.get(timeout=wait)
+        except queue.Empty:
+            now = time.perf_counter()
+            for sid, deadline in list(running.items()):
+                if now >= deadline:
+                    running.pop(sid)
+                    _finish(sid, "timeout", elapsed=now - t0 - trace[sid]["start_s"], error="step timeout")
+                    _log(f"step {sid} 제한 시간 초과 → 결과 버림")
+            continue
+        if sid not in running:  # 이미 timeout 처리된 스텝이 늦게 끝남
+            continue
+        running.pop(sid)
+        if status == "ok":
+            results[sid] = out
+            _finish(sid, "ok", elapsed)
+        else:
+            _finish(sid, "error", elapsed, error=out)
+        _log(f"step {sid} {status} ({elapsed:.2f}s)")
+
+    return results, [trace[s["id"]] for s in steps]
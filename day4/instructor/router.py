@@ -70,8 +70,9 @@ def route(query: str) -> dict:
             "confidence": 0.95,
             "reasons": ["finance-intent: stock+web only"],
             "plan": [
-                {"tool": "day1.stock", "params": {"q": q}},
-                {"tool": "day1.research", "params": {"top_n": 5, "summarize_top": 2}},
+                # 서로 독립 → plan_executor가 동시에 실행
+                {"id": "stock", "tool": "day1.stock", "params": {"q": q}},
+                {"id": "research", "tool": "day1.research", "params": {"top_n": 5, "summarize_top": 2}},
             ],
             "final_output": "research_report",
             "route": "PLANNER_ONLY",
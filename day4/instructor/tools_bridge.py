@@ -1,7 +1,7 @@
 """
 Day1/Day2/Day3 모듈을 하나의 공통 인터페이스로 감싸는 브릿지 + 주가 스냅샷.
 - run_research(query) -> {report_md, citations, top_results, rag_schema_contexts, trace}
-- run_rag(query,k)    -> {answer_md, contexts, citations, trace}
+- run_rag(query,k,kind) -> {answer_md, contexts, citations, trace}
 - run_government(...) -> {digest_md, notices, trace}
 - get_stock_snapshot(query_or_symbol) -> {symbol, price, change, change_pct, ...} or {error:...}
 """
@@ -96,11 +96,13 @@ def run_research(query: str, top_n: int = 5, summarize_top: int = 2) -> Dict[str
 from day2.instructor.rag_store import FaissStore
 from day2.instructor.agents import answer_with_context  # non-stream
 
-def run_rag(query: str, k: int = 5) -> Dict[str, Any]:
+def run_rag(query: str, k: int = 5, kind: Optional[str] = None) -> Dict[str, Any]:
+    """kind="government" 등으로 주면 해당 종류 청크만 검색(FAISS 내부 필터)."""
     index_dir = os.getenv("D2_INDEX_DIR", "data/processed/day2/faiss")
     store = FaissStore.load_or_new(index_dir=index_dir)
 
-    ctx = store.search(query, k=k) if store.ntotal() > 0 else []
+    where = {"kind": kind} if kind else None
+    ctx = store.search(query, k=k, where=where) if store.ntotal() > 0 else []
     answer = answer_with_context(query, ctx) if ctx else "_no local context_"
 
     citations = []
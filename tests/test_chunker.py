@@ -0,0 +1,30 @@
+import io
+
+from day2.instructor.chunker import iter_chunks
+from day2.instructor.embedder import count_tokens
+
+MAX, MIN = 100, 40
+
+def _chunks(text):
+    return [t for _, t in iter_chunks(io.StringIO(text), max_tokens=MAX, min_tokens=MIN)]
+
+def _sentences(n, word="규정"):
+    return " ".join(f"{word} 문장 {i}번은 의료 인공지능 허가 절차를 설명합니다." for i in range(n))
+
+def test_heading_is_not_left_alone_before_long_paragraph():
+    run_on = ", ".join(f"본문 항목 {i} 의료 인공지능 허가" for i in range(40))  # 문장 끝 없이 예산 초과
+    text = _sentences(6, "앞") + "\n\nⅠ. 들어가며\n" + run_on + ".\n"
+    chunks = _chunks(text)
+    assert all(count_tokens(c) >= MIN for c in chunks)
+    head = next(c for c in chunks if "Ⅰ. 들어가며" in c)
+    assert "본문 항목 0 " in head
+
+def test_short_tail_is_merged_into_previous_chunk():
+    text = _sentences(4) + "\n\n" + "마지막 안내 문장입니다. " * 3
+    chunks = _chunks(text)
+    assert chunks[-1].endswith("마지막 안내 문장입니다.") and not chunks[-1].startswith("마지막")
+    assert all(count_tokens(c) >= MIN for c in chunks)
+    assert all(count_tokens(c) <= MAX + MIN for c in chunks)
+
+def test_short_document_is_one_chunk():
+    assert _chunks("짧은 공지.\n") == ["짧은 공지."]
@@ -0,0 +1,49 @@
+import pytest
+
+from day2.instructor import embedder
+from day2.instructor.embedder import EmbeddingExecutor
+
+class ApiError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+class CountingBackend:
+    def __init__(self, fail=None):
+        self.fail = fail  # texts → 예외 (없으면 성공)
+        self.calls = 0
+        self.ok = embedder.fake_backend(8)
+
+    def __call__(self, texts):
+        self.calls += 1
+        e = self.fail(texts) if self.fail else None
+        if e is not None:
+            raise e
+        return self.ok(texts)
+
+def _texts(n):
+    return [f"문서 {i}" for i in range(n)]
+
+def test_auth_error_is_raised_without_splitting():
+    be = CountingBackend(lambda texts: ApiError(401))
+    ex = EmbeddingExecutor(be, concurrency=1, max_items=256, retries=3, backoff_base=0.001)
+    with pytest.raises(ApiError):
+        ex.embed(_texts(256))
+    assert be.calls == 1
+    assert ex.stats()["splits"] == 0
+
+def test_exhausted_rate_limit_is_raised_without_splitting():
+    be = CountingBackend(lambda texts: ApiError(429))
+    ex = EmbeddingExecutor(be, concurrency=1, max_items=16, retries=2, backoff_base=0.001)
+    with pytest.raises(ApiError):
+        ex.embed(_texts(16))
+    assert be.calls == 3  # 첫 시도 + 재시도 2회
+    assert ex.stats() == {"requests": 3, "retries_429": 2, "splits": 0, "texts": 16}
+
+def test_input_error_splits_batch():
+    # 요청당 4개를 넘으면 400 (토큰 초과 같은 입력 탓 실패) → 나눠 보내면 성공
+    be = CountingBackend(lambda texts: ApiError(400) if len(texts) > 4 else None)
+    ex = EmbeddingExecutor(be, concurrency=1, max_items=16, retries=0)
+    texts = _texts(16)
+    assert ex.embed(texts) == embedder.fake_backend(8)(texts)
+    assert ex.stats()["splits"] == 3
@@ -0,0 +1,56 @@
+from day3.instructor import fetchers
+
+LIST_URL = "https://www.nipa.kr/home/2-2"
+
+def _page(ids):
+    rows = "".join(f'<tr><td><a href="/home/2-2/{i}">공고 {i}</a></td></tr>' for i in ids)
+    return f"<html><body><table>{rows}</table></body></html>"
+
+class _Pool:
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+
+    def get_text(self, url, ttl=None):
+        page = int(url.rsplit("page=", 1)[1])
+        self.fetched.append(page)
+        return _page(self.pages.get(page, []))
+
+def test_scan_new_links_skips_pinned_old_rows(monkeypatch):
+    pages = {1: [50, 51, 130, 129, 128], 2: [50, 51, 127, 126, 125], 3: [50, 51, 124, 123, 119]}
+    pool = _Pool(pages)
+    monkeypatch.setattr(fetchers, "get_pool", lambda: pool)
+    got = fetchers._scan_new_links(LIST_URL, "", max_pages=5, watermark=120)
+    assert [nid for nid, _ in got] == [130, 129, 128, 127, 126, 125, 124, 123]
+    assert pool.fetched == [1, 2, 3]
+
+def test_scan_new_links_stops_at_page_without_new(monkeypatch):
+    pool = _Pool({1: [50, 130, 129], 2: [128, 127], 3: [126]})
+    monkeypatch.setattr(fetchers, "get_pool", lambda: pool)
+    assert fetchers._scan_new_links(LIST_URL, "", max_pages=5, watermark=130) == []
+    assert pool.fetched == [1]
+
+def test_parse_page_scans_fields_once(monkeypatch):
+    html = ("<html><head><title>2025 클라우드 바우처 공고</title></head><body><main>"
+            "<p>주관기관: 한국지능정보사회진흥원</p><p>접수기간: 2025.09.01 ~ 2025.09.08</p>"
+            "<p>지원규모 3억원, 지원대상: 중소기업</p>"
+            + "<p>클라우드 서비스 도입을 지원합니다.</p>" * 30 + "</main></body></html>")
+    pool = _Pool({})
+    pool.get_text = lambda url, ttl=None: html
+    monkeypatch.setattr(fetchers, "get_pool", lambda: pool)
+    calls = []
+    real = fetchers.extract_fields
+    monkeypatch.setattr(fetchers, "extract_fields", lambda text: calls.append(text) or real(text))
+
+    page = fetchers._parse_page("https://www.nipa.kr/home/2-2/1")
+    item = fetchers._stage_item(page, 300, 3, ["클라우드"], "NIPA")
+    want = real(page.text)
+    assert len(calls) == 1
+    assert (page.announce_date, page.close_date) == (want["announce_date"], want["close_date"]) == ("2025-09-01", "2025-09-08")
+    assert {k: item[k] for k in ("agency", "budget", "requirements")} == {
+        k: want[k] for k in ("agency", "budget", "requirements")}
+
+    # 크롤 상태에서 되살린 페이지(날짜만 보관)는 처음 필요할 때 한 번 스캔
+    stored = fetchers.ParsedPage(**fetchers._page_record(page))
+    assert stored.fields() == page.fields()
+    assert len(calls) == 2
@@ -0,0 +1,98 @@
+import os
+
+import pytest
+import requests
+
+from day1.instructor import http_cache
+from day3.instructor import fixture_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    c = http_cache.HttpCache(str(tmp_path / "http.sqlite"))
+    monkeypatch.setattr(http_cache, "ENABLED", True)
+    monkeypatch.setattr(http_cache, "MODE", "rw")
+    monkeypatch.setattr(http_cache, "_CACHE", c)
+    return c
+
+@pytest.fixture
+def server(cache, monkeypatch):
+    monkeypatch.setattr(fixture_server, "FIXTURE_DIR", os.path.join(ROOT, "data", "fixtures", "day3"))
+    srv, list_url = fixture_server.serve(0, latency_ms=0, per_page=15)
+    yield srv, list_url
+    srv.shutdown()
+    srv.server_close()
+
+def _resp(code, body=b"", headers=None):
+    r = requests.Response()
+    r.status_code = code
+    r._content = body
+    r.encoding = "utf-8"
+    r.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    return r
+
+def test_ttl_hit_skips_network(server, cache):
+    srv, list_url = server
+    url = f"{list_url}/1000"
+    first = http_cache.cached_get(url, ttl=3600)
+    again = http_cache.cached_get(url, ttl=3600)
+    assert again.text == first.text and getattr(again, "from_cache", False)
+    assert fixture_server.stats(srv)["requests"] == 1
+    st = cache.stats()
+    assert (st["misses"], st["hits"], st["revalidated"]) == (1, 1, 0)
+
+def test_expired_entry_revalidates_with_etag(server, cache):
+    srv, list_url = server
+    url = f"{list_url}/1001"
+    first = http_cache.cached_get(url, ttl=0)
+    fetched = cache.lookup(url)["fetched"]
+    again = http_cache.cached_get(url, ttl=0)  # TTL 지남 → If-None-Match → 304
+    assert again.text == first.text
+    st = fixture_server.stats(srv)
+    assert (st["requests"], st["not_modified"]) == (2, 1)
+    assert cache.stats()["revalidated"] == 1
+    assert cache.lookup(url)["fetched"] > fetched  # touch로 받은 시각 갱신
+
+def test_expired_entry_revalidates_with_last_modified(cache):
+    lm = "Mon, 01 Sep 2025 00:00:00 GMT"
+    seen = []
+
+    def fetch(url, headers, timeout):
+        seen.append(dict(headers))
+        if headers.get("If-Modified-Since") == lm:
+            return _resp(304)
+        return _resp(200, "공고 본문".encode("utf-8"), {"Content-Type": "text/html", "Last-Modified": lm})
+
+    url = "https://example.com/notice/1"
+    first = http_cache.cached_get(url, fetch=fetch, ttl=0)
+    again = http_cache.cached_get(url, fetch=fetch, ttl=0)
+    assert again.text == first.text == "공고 본문"
+    assert "If-Modified-Since" not in seen[0] and seen[1]["If-Modified-Since"] == lm
+    assert "If-None-Match" not in seen[1]
+    assert cache.stats()["revalidated"] == 1
+
+def test_replay_mode_serves_cache_and_raises_on_miss(server, cache, monkeypatch):
+    srv, list_url = server
+    cached = http_cache.cached_get(f"{list_url}/1002")
+    monkeypatch.setattr(http_cache, "MODE", "replay")
+    hit = http_cache.cached_get(f"{list_url}/1002", ttl=0)  # replay는 TTL과 무관하게 캐시만
+    assert hit.text == cached.text
+    with pytest.raises(http_cache.OfflineMiss):
+        http_cache.cached_get(f"{list_url}/1003")
+    assert fixture_server.stats(srv)["requests"] == 1
+
+def test_evicts_least_recently_used_first(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(http_cache.time, "time", lambda: clock[0])
+    c = http_cache.HttpCache(str(tmp_path / "http.sqlite"), max_bytes=350)
+    for i in range(3):
+        c.store(f"https://example.com/{i}", _resp(200, b"x" * 100))
+        clock[0] += 10
+    c.lookup("https://example.com/0")  # 0을 최근 사용으로
+    clock[0] += 10
+    c.store("https://example.com/3", _resp(200, b"x" * 100))  # 400 > 350 → 315 이하까지 제거
+    assert c.lookup("https://example.com/1") is None
+    for i in (0, 2, 3):
+        assert c.lookup(f"https://example.com/{i}") is not None
+    assert c.stats()["rows"] == 3 and c.stats()["bytes"] == 300
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from day1.instructor import http_cache
+from day3.instructor import fixture_server
+from day3.instructor.http_pool import HttpPool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(fixture_server, "FIXTURE_DIR", os.path.join(ROOT, "data", "fixtures", "day3"))
+    monkeypatch.setattr(http_cache, "ENABLED", True)
+    monkeypatch.setattr(http_cache, "MODE", "rw")
+    monkeypatch.setattr(http_cache, "_CACHE", http_cache.HttpCache(str(tmp_path / "http.sqlite")))
+    srv, list_url = fixture_server.serve(0, latency_ms=50, per_page=15)  # 0 = 빈 포트
+    yield srv, list_url
+    srv.shutdown()
+    srv.server_close()
+
+def test_pool_respects_host_limit_and_revalidates(server):
+    srv, list_url = server
+    urls = [f"{list_url}/{i}" for i in range(1000, 1024)]
+    pool = HttpPool(workers=8, host_concurrency=3, host_rps=1000, host_burst=100)
+    try:
+        first = pool.fetch_many(urls, ttl=0)
+        st = fixture_server.stats(srv)
+        assert all(isinstance(b, str) and b for b in first)
+        assert st["requests"] == len(urls)
+        assert 2 <= st["peak_concurrency"] <= 3
+
+        again = pool.fetch_many(urls, ttl=0)  # ttl=0 → 전부 조건부 요청 → 304
+        st = fixture_server.stats(srv)
+        assert again == first
+        assert st["requests"] == 2 * len(urls)
+        assert st["not_modified"] == len(urls)
+        assert st["peak_concurrency"] <= 3
+        assert http_cache.get_cache().stats()["revalidated"] == len(urls)
+    finally:
+        pool.session.close()
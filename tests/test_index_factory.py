@@ -0,0 +1,28 @@
+import faiss
+import numpy as np
+import pytest
+
+from day2.instructor import index_factory
+from day2.instructor.index_factory import build_index, min_train
+
+def _vectors(n, dim=32, seed=0):
+    X = np.random.default_rng(seed).standard_normal((n, dim)).astype("float32")
+    return X / np.linalg.norm(X, axis=1, keepdims=True)
+
+def test_min_train_covers_pq_codebooks():
+    index = faiss.index_factory(32, "IVF16,PQ8", faiss.METRIC_INNER_PRODUCT)
+    assert min_train(index) >= 39 * 256
+
+@pytest.mark.parametrize("n, spec, kind", [
+    (3000, "ivfpq", faiss.IndexIVFFlat),   # PQ 학습 표본 부족 → 같은 nlist의 IVF-Flat
+    (400, "ivfpq", faiss.IndexFlat),       # RAG_MIN_TRAIN 미만 → Flat
+    (10000, "ivfpq", faiss.IndexIVFPQ),
+])
+def test_build_index_trains_without_faiss_warning(capfd, monkeypatch, n, spec, kind):
+    monkeypatch.setattr(index_factory, "MIN_TRAIN", 500)
+    X = _vectors(n)
+    index = build_index(X, spec)
+    err = capfd.readouterr().err
+    assert "please provide at least" not in err
+    assert isinstance(faiss.downcast_index(index), kind)
+    assert index.ntotal == n
@@ -0,0 +1,44 @@
+import os
+import random
+
+import pytest
+
+from day3.instructor import bench, fixture_server, parsers
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _separate(text):
+    """라벨 스캔을 호출마다 따로 하는 parse_* 함수들"""
+    a, c = parsers.parse_dates(text)
+    return {"announce_date": a, "close_date": c, "agency": parsers.parse_agency(text),
+            "budget": parsers.parse_budget(text), "requirements": parsers.parse_requirements(text)}
+
+def _fuzz_texts(n, seed=20250901):
+    rnd = random.Random(seed)
+    labels = parsers._ALL_LABELS + ["접수마감일", "신청마감일", "마감일자", "공고일자", "기간 중"]
+    def date():
+        y, m, d = rnd.choice((2023, 2024, 2025, 2026)), rnd.randint(1, 12), rnd.randint(1, 28)
+        return rnd.choice((f"{y}.{m}.{d}", f"{y}-{m:02d}-{d:02d}", f"{y}년 {m}월 {d}일", f"{y}/{m}/{d}"))
+    pieces = [lambda: rnd.choice(labels), date, lambda: f"{date()} ~ {date()}",
+              lambda: f"{rnd.randint(1, 9999):,}{rnd.choice(('억원', '만원', '원', '백만원'))}",
+              lambda: rnd.choice((": ", " - ", ". ", "\n", "  ", " | ", "; ")),
+              lambda: rnd.choice(("한국지능정보사회진흥원", "중소기업", "클라우드 바우처", "AI 데이터", "참여 기업"))]
+    return ["".join(rnd.choice(pieces)() for _ in range(rnd.randint(0, 40))) for _ in range(n)]
+
+@pytest.fixture(scope="module")
+def corpus():
+    old = fixture_server.FIXTURE_DIR
+    fixture_server.FIXTURE_DIR = os.path.join(ROOT, "data", "fixtures", "day3")
+    try:
+        return bench._notice_corpus()
+    finally:
+        fixture_server.FIXTURE_DIR = old
+
+def test_extract_fields_matches_legacy_on_fixtures(corpus):
+    assert corpus
+    for text in corpus:
+        assert parsers.extract_fields(text) == bench._legacy_fields(text) == _separate(text)
+
+def test_extract_fields_matches_legacy_on_fuzzed_texts():
+    for text in _fuzz_texts(3000):
+        assert parsers.extract_fields(text) == bench._legacy_fields(text) == _separate(text), text
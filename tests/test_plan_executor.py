@@ -0,0 +1,115 @@
+import threading
+import time
+
+from day4.instructor.plan_executor import run_plan
+
+def _runner(durations, fail=(), log=None):
+    """tool 이름별 소요 시간(초)만큼 잠드는 가짜 run_step. fail에 든 tool은 예외"""
+    release = threading.Event()  # 시간 초과로 버려진 스텝 스레드를 테스트 끝에 깨운다
+
+    def run_step(step):
+        tool = step["tool"]
+        if log is not None:
+            log.append(("start", step["id"], time.perf_counter()))
+        release.wait(durations.get(tool, 0.0))
+        if log is not None:
+            log.append(("end", step["id"], time.perf_counter()))
+        if tool in fail:
+            raise RuntimeError(f"{tool} failed")
+        return f"{tool}:{step['params'].get('q', '')}"
+    return run_step, release
+
+def _status(trace):
+    return {t["id"]: t["status"] for t in trace}
+
+def test_independent_steps_run_in_parallel():
+    run_step, release = _runner({"a": 0.3, "b": 0.3, "c": 0.3})
+    steps = [{"tool": "a"}, {"tool": "b"}, {"tool": "c", "params": {"q": "x"}}]
+    t0 = time.perf_counter()
+    results, trace = run_plan(steps, run_step, workers=3)
+    assert time.perf_counter() - t0 < 0.6
+    assert results == {"s1": "a:", "s2": "b:", "s3": "c:x"}
+    assert all(t["start_s"] < 0.1 for t in trace)
+    release.set()
+
+def test_sequential_mode_with_one_worker():
+    run_step, release = _runner({"a": 0.1, "b": 0.1})
+    t0 = time.perf_counter()
+    _, trace = run_plan([{"tool": "a"}, {"tool": "b"}], run_step, workers=1)
+    assert time.perf_counter() - t0 >= 0.2
+    assert trace[1]["start_s"] >= trace[0]["elapsed_s"]
+
+def test_depends_on_orders_steps():
+    log = []
+    run_step, release = _runner({"stock": 0.15, "research": 0.15, "report": 0.0}, log=log)
+    steps = [{"id": "report", "tool": "report", "depends_on": ["stock", "research"]},
+             {"id": "stock", "tool": "stock"},
+             {"id": "research", "tool": "research", "depends_on": "stock"}]
+    results, trace = run_plan(steps, run_step, workers=4)
+    assert set(results) == {"report", "stock", "research"}
+    t = {(kind, sid): ts for kind, sid, ts in log}
+    assert t[("start", "research")] >= t[("end", "stock")]
+    assert t[("start", "report")] >= t[("end", "research")]
+    assert [x["id"] for x in trace] == ["report", "stock", "research"]  # trace는 플랜 순서
+
+def test_step_timeout_skips_dependents():
+    run_step, release = _runner({"slow": 5.0, "fast": 0.05})
+    steps = [{"id": "slow", "tool": "slow", "timeout": 0.1},
+             {"id": "after", "tool": "fast", "depends_on": ["slow"]},
+             {"id": "other", "tool": "fast"}]
+    t0 = time.perf_counter()
+    results, trace = run_plan(steps, run_step, workers=4)
+    assert time.perf_counter() - t0 < 1.0
+    st = {t["id"]: t for t in trace}
+    assert st["slow"]["status"] == "timeout" and st["slow"]["error"] == "step timeout"
+    assert st["after"]["status"] == "skipped" and "slow" in st["after"]["error"]
+    assert st["other"]["status"] == "ok"
+    assert set(results) == {"other"}
+    release.set()
+
+def test_invalid_step_timeout_uses_default():
+    run_step, release = _runner({"a": 0.05, "b": 0.05})
+    steps = [{"tool": "a", "timeout": "soon"}, {"tool": "b", "timeout": 0}]
+    results, trace = run_plan(steps, run_step, step_timeout=2.0)
+    assert _status(trace) == {"s1": "ok", "s2": "ok"}
+
+def test_plan_timeout_cancels_running_and_pending():
+    run_step, release = _runner({"slow": 5.0, "next": 0.0})
+    steps = [{"id": "slow", "tool": "slow"}, {"id": "next", "tool": "next", "depends_on": ["slow"]}]
+    t0 = time.perf_counter()
+    results, trace = run_plan(steps, run_step, plan_timeout=0.2)
+    assert time.perf_counter() - t0 < 1.0
+    st = {t["id"]: t for t in trace}
+    assert st["slow"]["status"] == "timeout" and st["slow"]["error"] == "plan timeout"
+    assert st["next"]["status"] == "skipped"
+    assert results == {}
+    release.set()
+
+def test_failed_step_skips_dependents():
+    run_step, release = _runner({}, fail={"bad"})
+    steps = [{"id": "bad", "tool": "bad"}, {"id": "child", "tool": "x", "depends_on": ["bad"]},
+             {"id": "grandchild", "tool": "x", "depends_on": ["child"]}]
+    results, trace = run_plan(steps, run_step)
+    st = {t["id"]: t for t in trace}
+    assert st["bad"]["status"] == "error" and "bad failed" in st["bad"]["error"]
+    assert st["child"]["status"] == "skipped" and st["grandchild"]["status"] == "skipped"
+    assert results == {}
+
+def test_cycle_and_unknown_dependency_are_skipped():
+    run_step, release = _runner({})
+    steps = [{"id": "a", "tool": "x", "depends_on": ["b"]}, {"id": "b", "tool": "x", "depends_on": ["a"]},
+             {"id": "c", "tool": "x", "depends_on": ["nope"]}, {"id": "d", "tool": "x"}]
+    results, trace = run_plan(steps, run_step)
+    st = {t["id"]: t for t in trace}
+    assert st["a"]["error"] == st["b"]["error"] == "dependency cycle"
+    assert st["c"]["status"] == "skipped" and st["c"]["error"] == "unknown dependency: nope"
+    assert st["d"]["status"] == "ok"
+    assert set(results) == {"d"}
+
+def test_trace_records_step_timings():
+    run_step, release = _runner({"a": 0.1, "b": 0.2})
+    _, trace = run_plan([{"tool": "a"}, {"tool": "b", "depends_on": ["s1"]}], run_step)
+    a, b = trace
+    assert 0.08 <= a["elapsed_s"] < 0.3 and 0.18 <= b["elapsed_s"] < 0.4
+    assert a["start_s"] < 0.05 and b["start_s"] >= a["elapsed_s"] - 0.01
+    assert {"id", "tool", "depends_on", "status", "start_s", "elapsed_s"} <= set(a)
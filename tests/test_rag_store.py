@@ -0,0 +1,201 @@
+import json
+import os
+
+import pytest
+
+from day2.instructor import embedder, emb_cache, dedup, rag_store
+from day2.instructor.rag_store import FaissStore, _RESIDENT
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    embedder.use_backend(embedder.fake_backend(32))
+    monkeypatch.setattr(emb_cache, "ENABLED", False)
+    monkeypatch.setattr(dedup, "DEDUP_ENABLED", True)
+    monkeypatch.setattr(rag_store, "COMPACT_BG", False)
+    yield FaissStore(str(tmp_path))
+    embedder.use_backend(None)
+    _RESIDENT.clear()
+
+@pytest.fixture
+def plain_store(tmp_path, monkeypatch):
+    """중복 억제/자동 compaction 없이 쓰기 경로만 보는 스토어"""
+    embedder.use_backend(embedder.fake_backend(32))
+    monkeypatch.setattr(emb_cache, "ENABLED", False)
+    monkeypatch.setattr(dedup, "DEDUP_ENABLED", False)
+    monkeypatch.setattr(rag_store, "COMPACT_SEGMENTS", 10**6)
+    monkeypatch.setattr(rag_store, "COMPACT_DEAD", 2.0)
+    monkeypatch.setattr(rag_store, "COMPACT_BG", False)
+    yield FaissStore(str(tmp_path))
+    embedder.use_backend(None)
+    _RESIDENT.clear()
+
+TEXT = "2025년 AI 바우처 지원사업 공고. 신청 기간은 9월 30일까지이며 중소기업이 대상입니다. " * 3
+
+def _ids(hits):
+    return [h["id"] for h in hits]
+
+def test_delete_original_promotes_duplicate(store):
+    store.upsert([{"id": "orig", "text": TEXT, "source": "a"},
+                  {"id": "other", "text": "전혀 다른 문서: 주가 데이터 요약", "source": "b"}])
+    store.upsert([{"id": "copy1", "text": TEXT + " ", "source": "mirror1"},
+                  {"id": "copy2", "text": TEXT + "  ", "source": "mirror2"}])
+    snap = store._snapshot()
+    assert snap.get_meta("copy1").get("dup_of") == "orig"
+    assert "copy1" not in snap.pos
+
+    assert store.delete(["orig"]) == 1
+    hits = store.search(TEXT, k=3)
+    assert "orig" not in _ids(hits)
+    assert _ids(hits)[0] in ("copy1", "copy2")
+
+    snap = store._snapshot()
+    promoted = _ids(hits)[0]
+    rest = ({"copy1", "copy2"} - {promoted}).pop()
+    assert promoted in snap.pos
+    assert snap.get_meta(rest).get("dup_of") == promoted
+
+    # compaction 뒤에도 그대로 검색된다
+    store.compact()
+    _RESIDENT.clear()
+    assert _ids(store.search(TEXT, k=3))[0] == promoted
+
+def _files(store):
+    return sorted(f for f in os.listdir(store.dir) if not f.startswith("dedup."))
+
+def test_identical_reupsert_writes_nothing(store):
+    # day3 to_rag_chunks 모양: date=None, 두 번째 청크는 title/kind 없음
+    chunks = [{"id": "n1", "text": "공고 1\n요약", "source": "https://x/1", "page": 1,
+               "kind": "government", "title": "공고 1", "date": None},
+              {"id": "n2", "text": "공고 2\n요약", "source": "https://x/2", "page": 1, "date": ""}]
+    store.upsert([{"id": "seed", "text": "다른 문서", "source": "s"}])
+    store.upsert([dict(c) for c in chunks])
+    before = _files(store)
+    assert store.upsert([dict(c) for c in chunks]) == (3, 0)
+    assert store.upsert([dict(c) for c in chunks]) == (3, 0)
+    assert _files(store) == before
+
+def test_empty_upsert_returns_live_count(store):
+    store.upsert([{"id": f"c{i}", "text": f"문서 {i} 내용", "source": "s"} for i in range(4)])
+    store.upsert([{"id": "c0", "text": "문서 0 새 내용", "source": "s"}])  # 옛 벡터 위치는 톰스톤
+    store.delete(["c1"])
+    assert store.upsert([]) == (store.ntotal(), 0) == (3, 0)
+
+# ---------- 쓰기 경로: 세그먼트 / 매니페스트 / compaction ----------
+def _manifest(store):
+    with open(store.manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _chunk(cid, text, kind="doc"):
+    return {"id": cid, "text": text, "source": f"src/{cid}", "kind": kind, "title": cid}
+
+BASE = [_chunk("a", "알파 문서 본문"), _chunk("b", "베타 문서 본문"), _chunk("c", "감마 문서 본문", kind="notice")]
+
+def test_upsert_appends_segment_and_replaces_manifest(plain_store):
+    s = plain_store
+    s.upsert(BASE)
+    m1 = _manifest(s)
+    assert m1["segments"] == [] and m1["base"]["index"]
+
+    assert s.upsert([_chunk("d", "델타 문서 본문")]) == (4, 1)
+    m2 = _manifest(s)
+    assert m2["version"] == m1["version"] + 1
+    assert m2["base"] == m1["base"]  # base는 그대로, 새 파일만 추가
+    (seg,) = m2["segments"]
+    assert seg["n"] == 1
+    for key in ("vec", "meta", "lex"):
+        assert os.path.exists(os.path.join(s.dir, seg[key]))
+    assert not [f for f in _files(s) if f.endswith(".tmp")]
+    assert _ids(s.search("델타 문서 본문", k=1)) == ["d"]
+
+def test_crash_before_manifest_replace_keeps_consistent_snapshot(plain_store, monkeypatch):
+    s = plain_store
+    s.upsert(BASE)
+    before = _manifest(s)
+    real = rag_store._atomic_write_json
+
+    def crash(path, obj):
+        if path == s.manifest_path:
+            raise OSError("simulated crash before manifest replace")
+        real(path, obj)
+
+    monkeypatch.setattr(rag_store, "_atomic_write_json", crash)
+    with pytest.raises(OSError):
+        s.upsert([_chunk("d", "델타 문서 본문"), _chunk("a", "알파 문서 새 본문")])
+    monkeypatch.setattr(rag_store, "_atomic_write_json", real)
+
+    assert _manifest(s) == before
+    assert any(f.startswith("seg-") for f in _files(s))  # 참조되지 않는 고아 파일만 남음
+    for reader in (s, FaissStore(s.dir, resident=False)):
+        assert reader.ntotal() == 3
+        assert "d" not in _ids(reader.search("델타 문서 본문", k=5))
+        assert reader.search("알파 문서 본문", k=1)[0]["text"] == "알파 문서 본문"
+    _RESIDENT.clear()
+    assert FaissStore(s.dir).ntotal() == 3
+
+    # 재시도는 같은 세그먼트 이름을 다시 써서 정상 커밋
+    assert s.upsert([_chunk("d", "델타 문서 본문")]) == (4, 1)
+    assert len(_manifest(s)["segments"]) == 1
+
+def test_compact_merges_segments_and_removes_unreferenced_files(plain_store):
+    s = plain_store
+    s.upsert(BASE)
+    s.upsert([_chunk("d", "델타 문서 본문")])
+    s.upsert([_chunk("a", "알파 문서 새 본문")])
+    s.delete(["b"])
+    with open(os.path.join(s.dir, "seg-000099.meta"), "wb") as f:
+        f.write(b"orphan from a crashed write")
+    old_files = set(_files(s))
+
+    assert s.compact() == 3
+    m = _manifest(s)
+    assert m["segments"] == []
+    keep = {n for n in m["base"].values() if n}
+    ours = {f for f in _files(s) if f.startswith(("base-", "seg-"))}
+    assert ours == keep
+    assert not (old_files & keep)  # 새 세대 파일만 남았다
+
+    _RESIDENT.clear()
+    fresh = FaissStore(s.dir)
+    assert fresh.ntotal() == 3
+    assert "b" not in _ids(fresh.search("베타 문서 본문", k=5))
+    assert fresh.search("알파 문서 새 본문", k=1)[0]["id"] == "a"
+
+# ---------- 삭제 / 톰스톤 / 텍스트 변경 ----------
+MODES = ("vector", "hybrid", "lexical")
+
+def test_text_change_tombstones_old_vector(plain_store):
+    s = plain_store
+    s.upsert(BASE)
+    assert s.upsert([_chunk("a", "알파 문서 새 본문")]) == (3, 1)
+    snap = s._snapshot()
+    assert int(snap.dead.sum()) == 1 and snap.ntotal == 4
+    hits = s.search("알파 문서 새 본문", k=5)
+    assert hits[0]["id"] == "a" and hits[0]["text"] == "알파 문서 새 본문"
+    assert _ids(hits).count("a") == 1
+    # 옛 벡터는 검색되지 않는다 (옛 텍스트로 찾아도 정확히 일치하는 벡터가 없음)
+    assert all(h["score"] < 0.99 for h in s.search("알파 문서 본문", k=5, mode="vector"))
+    # 같은 텍스트 재업서트는 임베딩/톰스톤 없음
+    assert s.upsert([_chunk("a", "알파 문서 새 본문")]) == (3, 0)
+    assert int(s._snapshot().dead.sum()) == 1
+
+@pytest.mark.parametrize("mode", MODES)
+def test_deleted_rows_are_excluded_from_search(plain_store, mode):
+    s = plain_store
+    s.upsert(BASE)
+    s.upsert([_chunk("d", "델타 공고 본문", kind="notice")])
+    assert s.delete(["c", "d", "missing"]) == 2
+    assert s.ntotal() == 2
+    for q in ("감마 문서 본문", "델타 공고 본문"):
+        assert not {"c", "d"} & set(_ids(s.search(q, k=10, mode=mode)))
+        assert s.search(q, k=10, mode=mode, where={"kind": "notice"}) == []
+    assert set(_ids(s.search("문서 본문", k=10, mode=mode, where={"kind": "doc"}))) <= {"a", "b"}
+
+def test_delete_where_and_reinsert(plain_store):
+    s = plain_store
+    s.upsert(BASE + [_chunk("d", "델타 공고 본문", kind="notice")])
+    assert s.delete_where({"kind": "notice"}) == 2
+    assert s.ntotal() == 2
+    assert s.delete_where({"kind": "notice"}) == 0
+    # 삭제된 id를 다시 넣으면 살아난다
+    assert s.upsert([_chunk("c", "감마 문서 본문", kind="notice")]) == (3, 1)
+    assert _ids(s.search("감마 문서 본문", k=1, where={"kind": "notice"})) == ["c"]
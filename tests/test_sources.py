@@ -0,0 +1,118 @@
+import os
+
+import pytest
+
+from day2.instructor import embedder, emb_cache, dedup, ingest, pipeline, rag_store, sources
+from day2.instructor.rag_store import FaissStore, _RESIDENT
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    embedder.use_backend(embedder.fake_backend(32))
+    monkeypatch.setattr(emb_cache, "ENABLED", False)
+    monkeypatch.setattr(dedup, "DEDUP_ENABLED", False)
+    monkeypatch.setattr(rag_store, "COMPACT_BG", False)
+    monkeypatch.setattr(ingest, "CHUNKER", "chars")  # 청크 수 = 글자 수 / 100
+    yield FaissStore(str(tmp_path / "index"))
+    embedder.use_backend(None)
+    _RESIDENT.clear()
+
+def _write(path, title, n):
+    """제목 줄 + 100자 문단 n개 (.txt 제목 = 첫 줄 → 청크 id = md5(title::j))"""
+    body = "".join(f"{i:02d}" + f"{title} 본문 문단 {i}. ".ljust(97, "가") + "\n" for i in range(n))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(title.ljust(99) + "\n" + body)
+    return str(path)
+
+def _sync(store, paths):
+    return sources.sync_sources(paths, store, kind="doc", chunk_size=100, overlap=0)
+
+def _manifest(store):
+    return sources.load_manifest(os.path.join(store.dir, sources.SOURCES_NAME))
+
+def test_unchanged_rerun_is_noop(store, tmp_path, monkeypatch):
+    a = _write(tmp_path / "a.txt", "문서 A", 3)
+    b = _write(tmp_path / "b.txt", "문서 B", 2)
+    first = _sync(store, [a, b])
+    assert (first["new"], first["ntotal"]) == (2, 7)
+    before = _manifest(store)
+
+    def boom(path):
+        raise AssertionError(f"re-read {path}")
+    monkeypatch.setattr(pipeline, "read_document", boom)
+    monkeypatch.setattr(sources, "file_sha256", boom)  # stat이 같으면 해시도 읽지 않는다
+    again = _sync(store, [a, b])
+    assert (again["unchanged"], again["new"], again["changed"], again["retired_chunks"]) == (2, 0, 0, 0)
+    assert "pipeline" not in again
+    assert _manifest(store) == before
+
+def test_touched_file_with_same_content_only_updates_stat(store, tmp_path, monkeypatch):
+    a = _write(tmp_path / "a.txt", "문서 A", 2)
+    _sync(store, [a])
+    st = os.stat(a)
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    monkeypatch.setattr(pipeline, "read_document", lambda p: pytest.fail(f"re-read {p}"))
+    out = _sync(store, [a])
+    assert (out["unchanged"], out["changed"]) == (1, 0)
+    assert _manifest(store)[os.path.normpath(a)]["mtime_ns"] == st.st_mtime_ns + 10**9
+
+def test_changed_file_retires_old_chunk_ids(store, tmp_path):
+    a = _write(tmp_path / "a.txt", "문서 A", 4)
+    b = _write(tmp_path / "b.txt", "문서 B", 2)
+    _sync(store, [a, b])
+    old_ids = _manifest(store)[os.path.normpath(a)]["ids"]
+    assert len(old_ids) == 5
+
+    _write(tmp_path / "a.txt", "문서 A", 1)
+    out = _sync(store, [a, b])
+    assert (out["changed"], out["unchanged"], out["retired_chunks"]) == (1, 1, 3)
+    new_ids = _manifest(store)[os.path.normpath(a)]["ids"]
+    assert new_ids == old_ids[:2]
+    assert sorted(store.ids_by_source("doc")[a]) == sorted(new_ids)
+    assert out["ntotal"] == 2 + 3
+
+def test_removed_source_retires_its_chunks(store, tmp_path):
+    a = _write(tmp_path / "a.txt", "문서 A", 2)
+    b = _write(tmp_path / "b.txt", "문서 B", 2)
+    _sync(store, [a, b])
+    os.remove(b)
+    out = _sync(store, [a, b])  # 목록에 남아 있어도 파일이 없으면 제거로 본다
+    assert (out["removed"], out["retired_chunks"], out["ntotal"]) == (1, 3, 3)
+    assert list(_manifest(store)) == [os.path.normpath(a)]
+    assert b not in store.ids_by_source("doc")
+
+def test_failed_source_keeps_previous_entry(store, tmp_path, monkeypatch):
+    a = _write(tmp_path / "a.txt", "문서 A", 2)
+    b = _write(tmp_path / "b.txt", "문서 B", 2)
+    _sync(store, [a, b])
+    before = _manifest(store)
+
+    _write(tmp_path / "a.txt", "문서 A", 4)
+    real = pipeline.read_document
+
+    def flaky(path):
+        if path == a:
+            raise ValueError("broken file")
+        return real(path)
+    monkeypatch.setattr(pipeline, "read_document", flaky)
+    out = _sync(store, [a, b])
+    assert (out["changed"], out["failed"], out["retired_chunks"]) == (1, 1, 0)
+    assert _manifest(store) == before  # 새 지문을 기록하지 않음 → 다음 실행에 다시 읽는다
+    assert sorted(store.ids_by_source("doc")[a]) == sorted(before[os.path.normpath(a)]["ids"])
+
+    monkeypatch.setattr(pipeline, "read_document", real)
+    retry = _sync(store, [a, b])
+    assert (retry["changed"], retry["failed"]) == (1, 0)
+    assert len(_manifest(store)[os.path.normpath(a)]["ids"]) == 5
+
+def test_first_run_seeds_manifest_from_index(store, tmp_path):
+    a = _write(tmp_path / "a.txt", "문서 A", 3)
+    b = _write(tmp_path / "b.txt", "문서 B", 2)
+    _sync(store, [a, b])
+    os.remove(os.path.join(store.dir, sources.SOURCES_NAME))
+
+    _write(tmp_path / "a.txt", "문서 A", 1)
+    os.remove(b)
+    out = _sync(store, [a])  # 지문이 없으므로 a는 다시 읽고, 사라진 b의 청크는 정리
+    assert (out["changed"], out["removed"], out["retired_chunks"]) == (1, 1, 2 + 3)
+    assert out["ntotal"] == 2
+    assert list(_manifest(store)) == [os.path.normpath(a)]